@@ -12,13 +12,25 @@ except ImportError:
 
 from functools import partial
 import json
+import os
 import maya.cmds as cmds
 import maya.OpenMayaUI as omui
-import maya.api.OpenMaya as om
-import modelChecker.modelChecker_commands as mcc
+import modelChecker.modelChecker_cache as mcca
+import modelChecker.modelChecker_engine as mce
+import modelChecker.modelChecker_names as mcn
+import modelChecker.modelChecker_plan as mcpl
+import modelChecker.modelChecker_profile as mcp
+import modelChecker.modelChecker_report as mcr
+import modelChecker.modelChecker_scene as mcs
+import modelChecker.modelChecker_dirty as mcd
 import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_registry as mcreg
 from modelChecker.__version__ import __version__
 
+# Live validation waits for edits to settle for LIVE_DEBOUNCE ms, then
+# re-checks dirty nodes until the time budget is spent.
+LIVE_DEBOUNCE = 500
+
 def getMainWindow():
     mainWindowPtr = omui.MQtUtil.mainWindow()
     mainWindow = wrapInstance(int(mainWindowPtr), QtWidgets.QWidget)
@@ -51,12 +63,14 @@ class UI(QtWidgets.QMainWindow):
             cls.qmwInstance.raise_()
             cls.qmwInstance.activateWindow()
 
-    def __init__(self, parent=getMainWindow()):
-        super(UI, self).__init__(parent)
+    def __init__(self, parent=None):
+        super(UI, self).__init__(parent or getMainWindow())
+        mcreg.loadPlugins()
 
         self.setObjectName("ModelCheckerUI")
         self.setWindowTitle("Model Checker {}".format(self.version))
         self.diagnostics = {}
+        self.resultCache = None
         self.currentContextUUID = "Global"
         self.contexts = {
             "Selection": {
@@ -71,6 +85,10 @@ class UI(QtWidgets.QMainWindow):
             },
         }
         self.contextRowItems = {}
+        self.dirtyTracker = mcd.DirtyTracker(self.scheduleLiveValidation)
+        self.liveTimer = QtCore.QTimer(self)
+        self.liveTimer.setSingleShot(True)
+        self.liveTimer.timeout.connect(self.liveValidate)
 
         mainWidget = QtWidgets.QWidget(self)
         self.setCentralWidget(mainWidget)
@@ -187,9 +205,9 @@ class UI(QtWidgets.QMainWindow):
             uuid = self.contextTable.item(row, 0).text()
             self.currentContextUUID = uuid
             if uuid != "Global" and uuid != "Selection":
-                nodeName = cmds.ls(uuid, uuid=True)
+                nodeName = mcn.names.name(uuid)
                 if nodeName:
-                    self.contextTable.item(row, 1).setText(nodeName[0])
+                    self.contextTable.item(row, 1).setText(nodeName)
                 else:
                     self.contextTable.item(row, 1).setText("Root node seems to be missing!")
             self.createReport(uuid)
@@ -264,21 +282,58 @@ class UI(QtWidgets.QMainWindow):
 
         self.contextTable.setColumnHidden(0, True)
         self.contextTable.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
-        self.reportOutputUI = QtWidgets.QTextEdit()
-        self.reportOutputUI.setReadOnly(True)
+        self.reportModel = mcr.ReportModel(self)
+        self.reportOutputUI = QtWidgets.QTreeView()
+        self.reportOutputUI.setModel(self.reportModel)
+        self.reportOutputUI.setUniformRowHeights(True)
+        self.reportOutputUI.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.reportOutputUI.setMinimumWidth(600)
+        self.reportOutputUI.header().setStretchLastSection(False)
+        self.reportOutputUI.header().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        self.reportOutputUI.header().setSectionResizeMode(mcr.TIMING_COLUMN, QtWidgets.QHeaderView.ResizeToContents)
 
         self.runCurrentButton = QtWidgets.QPushButton("Run Current")
         self.runAllCheckedButton = QtWidgets.QPushButton("Run Checks on Selected / All")
         self.consolidatedCheck = QtWidgets.QCheckBox()
+        self.liveCheck = QtWidgets.QCheckBox()
+        self.liveBudget = QtWidgets.QSpinBox()
+        self.liveBudget.setRange(10, 10000)
+        self.liveBudget.setValue(200)
+        self.liveBudget.setSuffix(" ms")
+        self.profileCheck = QtWidgets.QCheckBox()
+        self.cacheCheck = QtWidgets.QCheckBox()
+        self.meshLimit = QtWidgets.QSpinBox()
+        self.checkLimit = QtWidgets.QSpinBox()
+        for limit in (self.meshLimit, self.checkLimit):
+            limit.setRange(0, 1000000)
+            limit.setSpecialValueText("All")
+        self.failFastCheck = QtWidgets.QCheckBox()
 
         clearButton = QtWidgets.QPushButton("Clear")
         clearButton.setMaximumWidth(150)
         
         settingsLayout = QtWidgets.QHBoxLayout()
         settingsLayout.addWidget(QtWidgets.QLabel("Consolidated display: "))
-        settingsLayout.addStretch()
         settingsLayout.addWidget(self.consolidatedCheck)
+        settingsLayout.addStretch()
+        settingsLayout.addWidget(QtWidgets.QLabel("Live validation: "))
+        settingsLayout.addWidget(self.liveCheck)
+        settingsLayout.addWidget(self.liveBudget)
+        settingsLayout.addStretch()
+        settingsLayout.addWidget(QtWidgets.QLabel("Profile checks: "))
+        settingsLayout.addWidget(self.profileCheck)
+        settingsLayout.addStretch()
+        settingsLayout.addWidget(QtWidgets.QLabel("Cache results: "))
+        settingsLayout.addWidget(self.cacheCheck)
+
+        limitsLayout = QtWidgets.QHBoxLayout()
+        limitsLayout.addWidget(QtWidgets.QLabel("Issues per mesh: "))
+        limitsLayout.addWidget(self.meshLimit)
+        limitsLayout.addWidget(QtWidgets.QLabel("Issues per check: "))
+        limitsLayout.addWidget(self.checkLimit)
+        limitsLayout.addStretch()
+        limitsLayout.addWidget(QtWidgets.QLabel("Stop at first failure: "))
+        limitsLayout.addWidget(self.failFastCheck)
         
         runLayout = QtWidgets.QHBoxLayout()
         runLayout.addWidget(QtWidgets.QLabel("Report: "))
@@ -289,6 +344,7 @@ class UI(QtWidgets.QMainWindow):
         splitter.addWidget(self.reportOutputUI)
         splitter.setSizes([0, 1])
         report.addLayout(settingsLayout)
+        report.addLayout(limitsLayout)
         report.addWidget(splitter)
         report.addLayout(runLayout)
         self.runAllCheckedButton.clicked.connect(self.sanityCheckChecked)
@@ -383,6 +439,11 @@ class UI(QtWidgets.QMainWindow):
 
     def closeEvent(self, event):
         self.saveSettings()
+        self.liveTimer.stop()
+        self.dirtyTracker.unwatch()
+        mcn.names.unwatch()
+        mcn.names.clear()
+        mcs.scene.unwatch()
         super(UI, self).closeEvent(event)
 
     def getCategories(self, commands):
@@ -423,11 +484,15 @@ class UI(QtWidgets.QMainWindow):
         context["diagnostics"] = {}
         context["diagnostics"]["nodes"] = 0
         context["diagnostics"]["tests"] = 0
+        context["profile"] = {}
+        context["cache"] = {}
+        context["truncated"] = set()
+        context["aborted"] = False
         self.clearRowFromItem(context['tableItem'])
         for command in self.commandsList.keys():
             self.errorNodesButton[command].setEnabled(False)
             self.commandLabel[command].setStyleSheet('background-color: none;')
-        self.reportOutputUI.clear()
+        self.reportModel.clear()
 
 
     def checkCategory(self, category):
@@ -444,145 +509,111 @@ class UI(QtWidgets.QMainWindow):
             self.commandCheckBox[category].setChecked(checked)
 
     def filterGetAllNodes(self):
-        allNodes = cmds.ls(transforms=True, long=True)
-        allUsuableNodes = []
-        for node in allNodes:
-            if node not in {'|front', '|persp', '|top', '|side'}:
-                uuid = cmds.ls(node, uuid=True)[0]
-                allUsuableNodes.append(uuid)
-        return allUsuableNodes
-    
+        return mce.allNodes()
+
     def oneOfs(self, command):
         nodes = self.contexts[self.currentContextUUID]['nodes']
         diagnostics = self.contexts[self.currentContextUUID]['diagnostics']
         newDiagnostics = self.commandToRun([command], nodes)
         diagnostics[command] = newDiagnostics[command]
+        self.contexts[self.currentContextUUID].setdefault('profile', {}).update(newDiagnostics.profile)
+        self.contexts[self.currentContextUUID]['cache'] = newDiagnostics.cache
+        truncated = self.contexts[self.currentContextUUID].setdefault('truncated', set())
+        truncated.discard(command)
+        truncated.update(newDiagnostics.truncated)
+        self.printProfile(newDiagnostics.profile, newDiagnostics.plan)
         self.createReport(self.currentContextUUID)
 
     def commandToRun(self, commands, nodes):
-        diagnostics = {}
-        SLMesh = om.MSelectionList()
-        nodes = [node for node in nodes if cmds.ls(node, uuid=True)] 
-        longNodeNames = [cmds.ls(node, uuid=True)[0] for node in nodes]
-        for node in longNodeNames:
-            nodeName = cmds.ls(node)
-            shapes = cmds.listRelatives(nodeName, shapes=True, typ="mesh")
-            if shapes:
-                SLMesh.add(node)
-        for command in commands:
-            type, errors = getattr(
-                mcc, command)(nodes, SLMesh)
-            diagnostics[command] = {"type": type, "uuids": errors}
-        SLMesh.clear()
-        return diagnostics
+        self.startResults(self.currentContextUUID)
+        return mce.run(commands, nodes, {
+            "progress": partial(self.reportProgress, self.currentContextUUID),
+            "results": partial(self.reportResults, self.currentContextUUID),
+            "profile": self.profileCheck.isChecked(),
+            "workers": "auto",
+            "cache": self.getResultCache(),
+            "maxPerMesh": self.meshLimit.value() or None,
+            "maxPerCheck": self.checkLimit.value() or None,
+            "failFast": self.failFastCheck.isChecked(),
+        })
+
+    def getResultCache(self):
+        # Opened on first use, next to the Maya preferences.
+        if not self.cacheCheck.isChecked():
+            return None
+        if self.resultCache is None:
+            path = os.path.join(cmds.internalVar(userPrefDir=True), "modelChecker_cache.sqlite")
+            self.resultCache = mcca.ResultCache(path)
+        return self.resultCache
+
+    def printProfile(self, profile, plan=None):
+        if self.profileCheck.isChecked() and profile:
+            print(mcp.formatProfile(profile))
+            if plan:
+                print(mcpl.formatPlan(plan, profile))
+
+    def reportProgress(self, contextUUID, command, done, total):
+        context = self.contexts[contextUUID]
+        context['progress'] = "{}/{}".format(done, total)
+        self.updateRunningRow(contextUUID)
 
-    def parseErrors(self, errors):
-        uuids = errors['uuids']
-        type =  errors['type']
-
-        if type == 'nodes':
-            nodes = []
-            for node in errors['uuids']:
-                curNode = cmds.ls(node)
-                if curNode:
-                    nodes.append(curNode[0])
-            return nodes
-        
-        outputErrors = []
-        typeMapping = {
-            "uv": ".map[{}]",
-            "vertex": ".vtx[{}]",
-            "edge": ".e[{}]",
-            "polygon": ".f[{}]",
-         }
-        
-        for uuid in uuids:
-            nodeName = cmds.ls(uuid)
-            if nodeName:
-                for component in uuids[uuid]:
-                    outputErrors.append(nodeName[0] + typeMapping[type].format(component))
-        return outputErrors
+    def startResults(self, contextUUID):
+        # Results stream into the report while the checks run, createReport
+        # replaces them with the full report once the run is done.
+        context = self.contexts[contextUUID]
+        context['progress'] = ""
+        context['streamedIssues'] = 0
+        if contextUUID == self.currentContextUUID:
+            self.reportModel.startRun(context['name'])
 
+    def reportResults(self, contextUUID, command, type, batch):
+        context = self.contexts[contextUUID]
+        issues = [(uuid, max(len(ids), 1)) for uuid, ids in batch]
+        context['streamedIssues'] += sum(count for _, count in issues)
+        if contextUUID == self.currentContextUUID:
+            self.reportModel.addResults(command, self.commandsList[command]['label'], issues)
+        self.updateRunningRow(contextUUID)
+
+    def updateRunningRow(self, contextUUID):
+        context = self.contexts[contextUUID]
+        item = context['tableItem']
+        text = "Running... {}".format(context.get('progress', ""))
+        if context.get('streamedIssues'):
+            text += " ({} issues)".format(context['streamedIssues'])
+        self.contextTable.item(item.row(), 3).setText(text)
+        QtWidgets.QApplication.processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
+
+    def parseErrors(self, errors):
+        return mce.parseErrors(errors)
 
     def createReport(self, uuid):
         context = self.contexts[uuid]
         diagnostics = context['diagnostics']
-        nodes = context['nodes']
-        name = context['name']
-        self.reportOutputUI.clear()
-        lastFailed = None
-        consolidated = self.consolidatedCheck.isChecked()
-        html = "<h2>{}</h2>".format(name)
-
-        if consolidated or not nodes:
-            plural = '' if len(nodes) == 1 else 's'
-            html += "&#10752; Node{} checked: {}<br><br>".format(plural, len(nodes))
-        else:
-            html += "&#10752; Nodes checked:<br>"
-            for node in nodes:
-                html += "&#9492;&#9472; {}<br>".format(cmds.ls(node)[0])
-            html += "<br><br>"
-            
-
-        if len(diagnostics) == 0:
-            html += "{} - No tests run in this context.".format(self.contexts[self.currentContextUUID]['name'])
-            self.reportOutputUI.setHtml(html)
-            return
+        labels = [(command, self.commandsList[command]['label']) for command in sorted(self.commandsList.keys())]
+        self.reportModel.setReport(context['name'], context['nodes'], diagnostics, labels,
+                                   context.get('profile', {}), self.consolidatedCheck.isChecked(),
+                                   context.get('cache', {}), context.get('truncated', ()),
+                                   context.get('aborted', False))
 
         for error in sorted(self.commandsList.keys()):
             if error not in diagnostics:
                 self.errorNodesButton[error].setEnabled(False)
                 self.commandLabel[error].setStyleSheet('background-color: none;')
                 continue
-            
-            parsedErrors = self.parseErrors(diagnostics[error])
-            failed = len(parsedErrors) != 0
-            if failed:
+
+            if self.reportModel.failed(error):
                 self.errorNodesButton[error].setEnabled(True)
                 self.errorNodesButton[error].clicked.connect(partial(self.selectErrorNodes, diagnostics[error]))
                 self.commandLabel[error].setStyleSheet('background-color: #664444;')
             else:
                 self.errorNodesButton[error].setEnabled(False)
                 self.commandLabel[error].setStyleSheet('background-color: #446644;')
-            label = self.commandsList[error]['label']
-            failed = len(parsedErrors) != 0
-            if lastFailed != failed and lastFailed is not None or (failed is True and lastFailed is True):
-                html += "<br>"
-            lastFailed = failed
-            if failed:
-                html += "&#10752; {}<font color=#9c4f4f> [ FAILED ]</font><br>".format(label)
-            else:
-                html += "{}<font color=#64a65a> [ SUCCESS ]</font><br>".format(label)
-            
-            if failed:
-                if consolidated and len(parsedErrors) > 0:
-                    store = {}
-                    for node in parsedErrors:
-                        name = node.split(".")[0]
-                        store[name] = store.get(name, 0) + 1
-
-                    for node in store:
-                        word = "issues" if store[node] > 1 else "issue"
-                        html += "&#9492;&#9472; {} - <font color=#9c4f4f>{} {}</font><br>".format(node, store[node], word)
-                else:
-                    for node in parsedErrors:
-                        html += "&#9492;&#9472; {}<br>".format(node)
-                        
-        self.reportOutputUI.insertHtml(html)
 
     def changeConsolidated(self):
         self.createReport(self.currentContextUUID)
 
     def selectHierachy(self, nodes):
-        hierachy = set()
-        for node in nodes:
-            nodeName = cmds.ls(node, uuid=True, long=True)[0]
-            children = cmds.listRelatives(nodeName, typ="transform", allDescendents=True, fullPath=True)
-            if children:
-                uuids = [cmds.ls(child, uuid=True)[0] for child in children]
-                hierachy.update(uuids)                
-            hierachy.add(node)
-        return list(hierachy)
+        return mce.hierarchy(nodes)
 
     def sanityCheckChecked(self):
         if cmds.ls(selection=True, typ="transform", long=True):
@@ -638,7 +669,7 @@ class UI(QtWidgets.QMainWindow):
             else:
                 nodes = self.contexts[contextUUID]['nodes']
             
-            nodes = [uuid for uuid in nodes if cmds.ls(uuid, uuid=True)]
+            nodes = mce.existingNodes(nodes)
 
             if not nodes:
                 cmds.warning("No nodes to check")
@@ -646,16 +677,59 @@ class UI(QtWidgets.QMainWindow):
             
             row = self.contexts[contextUUID]['tableItem'].row()
             self.contextTable.item(row, 3).setText("Running...")
-            diagnostics = self.commandToRun(checkedCommands, nodes)
-            self.contexts[contextUUID]['nodes'] = nodes
-            self.contexts[contextUUID]['diagnostics'] = diagnostics
             self.currentContextUUID = contextUUID
+            self.recheck(contextUUID, checkedCommands, nodes)
             self.setRowFromItem(self.contexts[contextUUID]['tableItem'])
 
         self.setRowFromUUID(self.currentContextUUID)
 
+    def recheck(self, contextUUID, commands, nodes, budget=None):
+        context = self.contexts[contextUUID]
+        dirty = self.dirtyTracker.takeDirty(nodes)
+        self.startResults(contextUUID)
+        options = {
+            "progress": partial(self.reportProgress, contextUUID),
+            "results": partial(self.reportResults, contextUUID),
+            "budget": budget,
+            "profile": self.profileCheck.isChecked(),
+            "workers": "auto",
+            "cache": self.getResultCache(),
+            "maxPerMesh": self.meshLimit.value() or None,
+            "maxPerCheck": self.checkLimit.value() or None,
+            "failFast": self.failFastCheck.isChecked(),
+        }
+        diagnostics, pending = mce.recheck(
+            context['diagnostics'], context['nodes'], commands, nodes, dirty, options)
+        self.dirtyTracker.dirty.update(pending)
+        self.dirtyTracker.watch(nodes)
+        context['nodes'] = nodes
+        context['diagnostics'] = diagnostics
+        context['profile'] = diagnostics.profile
+        context['cache'] = diagnostics.cache
+        context['truncated'] = diagnostics.truncated
+        context['aborted'] = diagnostics.aborted
+        self.printProfile(diagnostics.profile, diagnostics.plan)
+        return diagnostics
+
+    def scheduleLiveValidation(self, *args):
+        if self.liveCheck.isChecked():
+            self.liveTimer.start(LIVE_DEBOUNCE)
+
+    def liveValidate(self):
+        contextUUID = self.currentContextUUID
+        context = self.contexts[contextUUID]
+        commands = [command for command in context['diagnostics'] if command in self.commandsList]
+        if not commands or not self.dirtyTracker.dirty:
+            return
+        nodes = mce.existingNodes(context['nodes'])
+        self.recheck(contextUUID, commands, nodes, self.liveBudget.value() / 1000.0)
+        self.setRowFromItem(context['tableItem'])
+        self.createReport(contextUUID)
+        if self.dirtyTracker.dirty.intersection(nodes):
+            self.scheduleLiveValidation()
+
     def selectErrorNodes(self, errors):
-        cmds.select(self.parseErrors(errors))
+        mce.selectErrors(errors)
     
     def countErrors(self, diagnostics):
         count = 0
@@ -667,6 +741,13 @@ class UI(QtWidgets.QMainWindow):
     def saveSettings(self):
         settings = {}
         settings['consolidated'] = self.consolidatedCheck.isChecked()
+        settings['live'] = self.liveCheck.isChecked()
+        settings['liveBudget'] = self.liveBudget.value()
+        settings['profile'] = self.profileCheck.isChecked()
+        settings['cache'] = self.cacheCheck.isChecked()
+        settings['meshLimit'] = self.meshLimit.value()
+        settings['checkLimit'] = self.checkLimit.value()
+        settings['failFast'] = self.failFastCheck.isChecked()
         settings['commands'] = {}
         for name in self.commandsList:
             settings['commands'][name] = self.commandCheckBox[name].isChecked()
@@ -677,9 +758,18 @@ class UI(QtWidgets.QMainWindow):
         if settings:
             settings = json.loads(settings)
             self.consolidatedCheck.setChecked(settings['consolidated'])
+            self.liveCheck.setChecked(settings.get('live', False))
+            self.liveBudget.setValue(settings.get('liveBudget', 200))
+            self.profileCheck.setChecked(settings.get('profile', False))
+            self.cacheCheck.setChecked(settings.get('cache', False))
+            self.meshLimit.setValue(settings.get('meshLimit', 0))
+            self.checkLimit.setValue(settings.get('checkLimit', 0))
+            self.failFastCheck.setChecked(settings.get('failFast', False))
             if 'commands' in settings:
                 for name in settings['commands']:
-                    self.commandCheckBox[name].setChecked(settings['commands'][name])
+                    # Studio checks saved in another session may be gone.
+                    if name in self.commandCheckBox:
+                        self.commandCheckBox[name].setChecked(settings['commands'][name])
                     
     def selectFailed(self):
         diagnostics  = self.contexts[self.currentContextUUID]['diagnostics']
@@ -0,0 +1,78 @@
+from contextlib import contextmanager
+
+# Backend
+#     The checks reach Maya only through the cmds and om proxies below. They
+#     forward every attribute to the modules of the selected backend:
+#         "maya"    -> maya.cmds, maya.api.OpenMaya
+#         "standin" -> modelChecker_standin, an in-memory scene on NumPy
+#     Without a call to use(), "maya" is selected on first access when it can
+#     be imported and "standin" otherwise.
+
+
+def _loadMaya():
+    import maya.cmds as cmds
+    import maya.api.OpenMaya as om
+    return {"cmds": cmds, "om": om}
+
+
+def _loadStandIn():
+    import modelChecker.modelChecker_standin as standin
+    return {"cmds": standin.cmds, "om": standin}
+
+
+LOADERS = {
+    "maya": _loadMaya,
+    "standin": _loadStandIn,
+}
+
+name = None
+_modules = {}
+
+# Called before the backend changes, so that indexes can drop callbacks and
+# cached nodes that belong to the previous one.
+beforeSwitch = []
+
+
+def use(backend):
+    global name
+    if backend not in LOADERS:
+        raise ValueError("Unknown backend: {}".format(backend))
+    modules = LOADERS[backend]()
+    if name is not None and backend != name:
+        for callback in beforeSwitch:
+            callback()
+    _modules.clear()
+    _modules.update(modules)
+    name = backend
+
+
+def module(kind):
+    if not _modules:
+        try:
+            use("maya")
+        except ImportError:
+            use("standin")
+    return _modules[kind]
+
+
+@contextmanager
+def wrapped(kind, wrapper):
+    # Routes the calls of one proxy through wrapper(module) for the block.
+    original = module(kind)
+    _modules[kind] = wrapper(original)
+    try:
+        yield _modules[kind]
+    finally:
+        _modules[kind] = original
+
+
+class _Proxy(object):
+    def __init__(self, kind):
+        self._kind = kind
+
+    def __getattr__(self, attribute):
+        return getattr(module(self._kind), attribute)
+
+
+cmds = _Proxy("cmds")
+om = _Proxy("om")
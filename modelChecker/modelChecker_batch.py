@@ -0,0 +1,201 @@
+import argparse
+import glob
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_registry as mcreg
+
+# Batch
+#     Validates many scene files with a pool of persistent worker processes.
+#     Every worker builds its scene loader once and then keeps taking files
+#     from the job queue. One JSON line is written per file as soon as it is
+#     done. A worker that dies on a file is replaced and the file is reported
+#     as an error.
+#
+#     mayapy -m modelChecker.modelChecker_batch --checks triangles,ngons \
+#         --workers 8 --output nightly.jsonl "/assets/**/*.ma"
+#
+#     A loader is any class with check(path, checks) -> {command: {...}} and
+#     optional initialize() / uninitialize() methods, given as "module:Class".
+
+DEFAULT_LOADER = "modelChecker.modelChecker_batch:MayaSceneLoader"
+POLL_INTERVAL = 1.0
+
+
+class MayaSceneLoader(object):
+    def initialize(self):
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+
+    def uninitialize(self):
+        import maya.standalone
+        maya.standalone.uninitialize()
+
+    def check(self, path, checks):
+        import maya.cmds as cmds
+        import modelChecker.modelChecker_engine as mce
+        import modelChecker.modelChecker_names as mcn
+        import modelChecker.modelChecker_scene as mcs
+        cmds.file(path, open=True, force=True, ignoreVersion=True, prompt=False)
+        mcn.names.clear()
+        mcs.scene.invalidate()
+        diagnostics = mce.run(checks)
+        report = {}
+        for command, errors in diagnostics.items():
+            report[command] = {"type": errors["type"], "errors": mce.parseErrors(errors)}
+        return report
+
+
+def importLoader(spec):
+    moduleName, className = spec.split(":")
+    return getattr(importlib.import_module(moduleName), className)
+
+
+def _worker(loaderSpec, checks, paths, jobs, results, current):
+    # current holds the index of the file being checked, in shared memory so
+    # the scheduler still knows it if the worker dies without a word.
+    pid = os.getpid()
+    try:
+        loader = importLoader(loaderSpec)()
+        if hasattr(loader, "initialize"):
+            loader.initialize()
+    except Exception:
+        results.put(("failed", pid, traceback.format_exc()))
+        return
+    while True:
+        index = jobs.get()
+        if index is None:
+            break
+        current.value = index
+        path = paths[index]
+        start = time.time()
+        record = {"file": path, "worker": pid}
+        try:
+            record["diagnostics"] = loader.check(path, checks)
+            record["status"] = "ok"
+        except Exception:
+            record["status"] = "error"
+            record["error"] = traceback.format_exc()
+        record["seconds"] = round(time.time() - start, 3)
+        results.put(("done", index, record))
+        current.value = -1
+    if hasattr(loader, "uninitialize"):
+        loader.uninitialize()
+
+
+def runBatch(paths, checks, output, workers=None, loader=DEFAULT_LOADER):
+    # Returns the number of files that could not be checked.
+    workers = min(workers or multiprocessing.cpu_count(), len(paths))
+    jobs = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    processes = []
+
+    def spawn():
+        current = multiprocessing.Value('i', -1)
+        process = multiprocessing.Process(
+            target=_worker, args=(loader, checks, paths, jobs, results, current))
+        process.daemon = True
+        process.start()
+        processes.append((process, current))
+
+    def write(record):
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+
+    for index in range(len(paths)):
+        jobs.put(index)
+    for _ in range(workers):
+        jobs.put(None)
+        spawn()
+
+    remaining = set(range(len(paths)))
+    failures = 0
+    while remaining and processes:
+        try:
+            kind, index, payload = results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            for process, current in list(processes):
+                if process.is_alive():
+                    continue
+                processes.remove((process, current))
+                if current.value in remaining:
+                    remaining.discard(current.value)
+                    failures += 1
+                    write({
+                        "file": paths[current.value],
+                        "worker": process.pid,
+                        "status": "error",
+                        "error": "Worker exited with code {}".format(process.exitcode),
+                    })
+                    # The dead worker never took its sentinel, the replacement will.
+                    spawn()
+            continue
+        if kind == "done":
+            remaining.discard(index)
+            write(payload)
+            if payload["status"] != "ok":
+                failures += 1
+        elif kind == "failed":
+            sys.stderr.write("A worker could not start:\n{}".format(payload))
+
+    for index in sorted(remaining):
+        write({"file": paths[index], "status": "error", "error": "No worker left to check this file"})
+    for process, _ in processes:
+        process.join()
+    return failures + len(remaining)
+
+
+def expandPaths(patterns, fileList=None):
+    paths = []
+    if fileList:
+        with open(fileList) as f:
+            paths.extend(line.strip() for line in f if line.strip())
+    for pattern in patterns:
+        if sys.version_info[0] > 2:
+            matches = glob.glob(pattern, recursive=True)
+        else:
+            matches = glob.glob(pattern)
+        paths.extend(sorted(matches) if matches else [pattern])
+    return paths
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Run modelChecker checks on many scene files.")
+    parser.add_argument("paths", nargs="*", help="Scene files or glob patterns")
+    parser.add_argument("--file-list", help="Text file with one scene path per line")
+    parser.add_argument("--checks", help="Comma separated checks, all checks by default")
+    parser.add_argument("--workers", type=int, help="Worker processes, one per core by default")
+    parser.add_argument("--output", help="JSON Lines output file, stdout by default")
+    parser.add_argument("--loader", default=DEFAULT_LOADER, help="Scene loader as module:Class")
+    args = parser.parse_args(args)
+
+    paths = expandPaths(args.paths, args.file_list)
+    if not paths:
+        parser.error("No scene files given")
+    mcreg.loadPlugins()
+    checks = args.checks.split(",") if args.checks else sorted(mcl.mcCommandsList)
+    unknown = [check for check in checks if check not in mcl.mcCommandsList]
+    if unknown:
+        parser.error("Unknown checks: {}".format(", ".join(unknown)))
+
+    if args.output:
+        with open(args.output, "w") as output:
+            failures = runBatch(paths, checks, output, args.workers, args.loader)
+    else:
+        failures = runBatch(paths, checks, sys.stdout, args.workers, args.loader)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+from array import array
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import modelChecker.modelChecker_backend as mcb
+import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_registry as mcreg
+
+# Benchmark
+#     Builds a synthetic scene, runs every check on it and reports throughput
+#     in checked elements per second and the peak memory Python allocated
+#     while the check ran. The mesh is a grid of quads with planted defects:
+#         triangles, ngons         -> loose faces next to the grid
+#         lamina                   -> loose faces repeated with the same vertices
+#         zeroAreaFaces            -> loose faces with all corners on one point
+#         noneManifoldEdges        -> fins on interior edges of the grid
+#         openEdges                -> holes cut into the grid
+#         uvRange                  -> loose faces with UVs past u = 10
+#         onBorder, crossBorder    -> loose faces on and across a UV tile border
+#     Every other UV lies inside the 0-1 tile, away from its border.
+#     mesh.defects holds the failing components each of these checks has to
+#     report, a check reporting another count is a wrong result.
+#
+#     mayapy -m modelChecker.modelChecker_benchmark --faces 1000000 \
+#         --baseline baseline.json
+#     python -m modelChecker.modelChecker_benchmark --backend standin
+#
+#     The "standin" backend runs the same checks on the in-memory scene of
+#     modelChecker_standin.
+#
+#     With --baseline, a check whose throughput dropped, or whose peak memory
+#     grew, by more than --tolerance is reported as a regression. The exit
+#     code is 1 on a regression or a wrong result. --save writes the results
+#     as the next baseline.
+
+DEFAULT_FACES = 1000000
+DEFAULT_NODES = 1000
+DEFAULT_DEFECTS = 100
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_REPEAT = 3
+
+# Elements a check is measured against, by result type.
+ELEMENTS = {
+    "nodes": "nodes",
+    "polygon": "faces",
+    "edge": "edges",
+    "vertex": "vertices",
+    "uv": "uvs",
+}
+
+
+class SyntheticMesh(object):
+    # Flat buffers in the layout of modelChecker_mesh.MeshSnapshot.
+    def __init__(self):
+        self.points = array('d')
+        self.polygonCounts = array('i')
+        self.polygonConnects = array('i')
+        self.us = array('d')
+        self.vs = array('d')
+        self.uvCounts = array('i')
+        self.uvIds = array('i')
+        self.defects = {}
+
+    @property
+    def numVertices(self):
+        return len(self.points) // 3
+
+    @property
+    def numEdges(self):
+        edges = set()
+        offset = 0
+        connects = self.polygonConnects
+        for count in self.polygonCounts:
+            for i in range(count):
+                a, b = connects[offset + i], connects[offset + (i + 1) % count]
+                edges.add((a, b) if a < b else (b, a))
+            offset += count
+        return len(edges)
+
+    def addVertex(self, x, y, z, u, v):
+        self.points.extend((x, y, z))
+        self.us.append(u)
+        self.vs.append(v)
+        return self.numVertices - 1
+
+    def addFace(self, vertices):
+        # Every vertex carries the UV of the same index.
+        self.polygonCounts.append(len(vertices))
+        self.polygonConnects.extend(vertices)
+        self.uvCounts.append(len(vertices))
+        self.uvIds.extend(vertices)
+
+    def addLooseFace(self, x, uvs, collapse=False):
+        # A face with one corner per UV, on a circle below the grid.
+        vertices = []
+        for i, (u, v) in enumerate(uvs):
+            angle = 0.0 if collapse else 2.0 * math.pi * i / len(uvs)
+            vertices.append(self.addVertex(x + 0.4 * math.cos(angle), -1.0 + 0.4 * math.sin(angle), 0.0, u, v))
+        self.addFace(vertices)
+        return vertices
+
+
+def uvRing(sides, u, v, radius=0.01):
+    # Turned half a step so that no UV lands on the row or column of the centre.
+    angles = [2.0 * math.pi * (i + 0.5) / sides for i in range(sides)]
+    return [(u + radius * math.cos(angle), v + radius * math.sin(angle)) for angle in angles]
+
+
+def syntheticMesh(faces=DEFAULT_FACES, defects=DEFAULT_DEFECTS):
+    mesh = SyntheticMesh()
+    size = max(int(faces ** 0.5), 4)
+    step = 0.9 / size
+    for row in range(size + 1):
+        for column in range(size + 1):
+            mesh.addVertex(column, row, 0.0, 0.05 + column * step, 0.05 + row * step)
+
+    def corners(column, row):
+        first = row * (size + 1) + column
+        return [first, first + 1, first + size + 2, first + size + 1]
+
+    # Holes are spread over the grid and never touch its border.
+    spacing = max((size - 2) * (size - 2) // (defects + 1), 1)
+    holes = set()
+    for i in range(1, defects + 1):
+        cell = i * spacing
+        column, row = 1 + cell % (size - 2), 1 + cell // (size - 2)
+        if row < size - 1:
+            holes.add((column, row))
+    for row in range(size):
+        for column in range(size):
+            if (column, row) not in holes:
+                mesh.addFace(corners(column, row))
+
+    for i in range(defects):
+        x = size + 2.0 + i
+        mesh.addLooseFace(x, uvRing(3, 0.1, 0.1))
+        mesh.addLooseFace(x, uvRing(5, 0.2, 0.2))
+        mesh.addLooseFace(x, uvRing(4, 0.3, 0.3), collapse=True)
+        mesh.addLooseFace(x, uvRing(4, 12.5, 0.5))
+        mesh.addLooseFace(x, uvRing(4, 1.0, 0.5))
+        mesh.addLooseFace(x, [(2.0, 0.5), (2.01, 0.5), (2.01, 0.51), (2.0, 0.51)])
+        mesh.addFace(list(reversed(mesh.addLooseFace(x, uvRing(4, 0.4, 0.4)))))
+    # Fins on the vertical edges of the first row, which has no holes.
+    fins = min(defects, size - 1)
+    for i in range(fins):
+        first = i + 1
+        fin = mesh.addVertex(i + 1.0, 0.5, 1.0, 0.05, 0.05)
+        mesh.addFace([first, first + size + 1, fin])
+
+    # Open edges: the grid border, hole edges not shared with another hole,
+    # the two new edges of every fin and the edges of the loose faces other
+    # than the lamina pair.
+    holeEdges = {}
+    for column, row in holes:
+        quad = corners(column, row)
+        for edge in zip(quad, quad[1:] + quad[:1]):
+            edge = tuple(sorted(edge))
+            holeEdges[edge] = holeEdges.get(edge, 0) + 1
+    openHoleEdges = sum(1 for count in holeEdges.values() if count == 1)
+
+    mesh.defects = {
+        "openEdges": 4 * size + openHoleEdges + 2 * fins + (3 + 5 + 4 + 4 + 4 + 4) * defects,
+        "triangles": defects + fins,
+        "ngons": defects,
+        "zeroAreaFaces": defects,
+        "zeroLengthEdges": 4 * defects,
+        "uvRange": 4 * defects,
+        "crossBorder": defects,
+        "onBorder": 2 * defects,
+        "lamina": 2 * defects,
+        "noneManifoldEdges": fins,
+    }
+    return mesh
+
+
+class MayaBackend(object):
+    name = "maya"
+
+    def initialize(self):
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+        mcb.use("maya")
+
+    def uninitialize(self):
+        import maya.standalone
+        maya.standalone.uninitialize()
+
+    def build(self, mesh, nodes):
+        # Returns the UUIDs of every transform in the new scene.
+        import maya.cmds as cmds
+        import maya.api.OpenMaya as om
+        import modelChecker.modelChecker_names as mcn
+        import modelChecker.modelChecker_scene as mcs
+        cmds.file(new=True, force=True)
+        points = om.MPointArray()
+        coordinates = mesh.points
+        for i in range(0, len(coordinates), 3):
+            points.append(om.MPoint(coordinates[i], coordinates[i + 1], coordinates[i + 2]))
+        fnMesh = om.MFnMesh()
+        transform = fnMesh.create(
+            points, mesh.polygonCounts, mesh.polygonConnects, mesh.us, mesh.vs)
+        fnMesh.assignUVs(mesh.uvCounts, mesh.uvIds)
+        om.MFnDependencyNode(transform).setName("benchmarkMesh")
+        cmds.sets(fnMesh.fullPathName(), edit=True, forceElement="initialShadingGroup")
+        for i in range(nodes):
+            cmds.createNode("transform", name="benchmarkGroup{}".format(i))
+        mcn.names.clear()
+        mcs.scene.invalidate()
+        return mcs.scene.ensure().transforms()
+
+
+class StandInBackend(object):
+    name = "standin"
+
+    def initialize(self):
+        mcb.use("standin")
+
+    def build(self, mesh, nodes):
+        import modelChecker.modelChecker_scene as mcs
+        import modelChecker.modelChecker_standin as standin
+        standin.scene.new()
+        standin.scene.createMesh(
+            mesh.points, mesh.polygonCounts, mesh.polygonConnects,
+            mesh.us, mesh.vs, mesh.uvCounts, mesh.uvIds, name="benchmarkMesh")
+        for i in range(nodes):
+            standin.scene.createNode("transform", "benchmarkGroup{}".format(i))
+        return mcs.scene.ensure().transforms()
+
+
+BACKENDS = {
+    MayaBackend.name: MayaBackend,
+    StandInBackend.name: StandInBackend,
+}
+
+
+def elementCounts(mesh, nodes):
+    return {
+        "nodes": nodes,
+        "faces": len(mesh.polygonCounts),
+        "edges": mesh.numEdges,
+        "vertices": mesh.numVertices,
+        "uvs": len(mesh.us),
+    }
+
+
+def measure(command, nodes, repeat):
+    # Best wall time of repeat runs and the peak of the traced allocations.
+    import modelChecker.modelChecker_engine as mce
+    best = None
+    peak = None
+    for _ in range(repeat):
+        if tracemalloc:
+            tracemalloc.start()
+        try:
+            start = time.time()
+            diagnostics = mce.run([command], nodes)
+            seconds = time.time() - start
+            if tracemalloc:
+                peak = max(peak or 0, tracemalloc.get_traced_memory()[1])
+        finally:
+            if tracemalloc:
+                tracemalloc.stop()
+        best = seconds if best is None else min(best, seconds)
+    return diagnostics[command], best, peak
+
+
+def runBenchmark(backend, checks, faces, nodes, defects, repeat, output):
+    mesh = syntheticMesh(faces, defects)
+    transforms = backend.build(mesh, nodes)
+    counts = elementCounts(mesh, len(transforms))
+    import modelChecker.modelChecker_commands as mcc
+    import modelChecker.modelChecker_engine as mce
+    results = {}
+    for command in checks:
+        errors, seconds, peak = measure(command, transforms, repeat)
+        elements = counts[ELEMENTS[errors["type"]]]
+        results[command] = {
+            "elements": elements,
+            "seconds": round(seconds, 6),
+            "throughput": round(elements / seconds, 1) if seconds else None,
+            "peakMemory": peak,
+            "failed": sum(mce.countComponents(errors).values()),
+            "expected": mesh.defects.get(command),
+        }
+        output.write("{:<24}{:>14} el/s{:>12.1f} ms{:>14} B{:>10} failed{}\n".format(
+            command,
+            int(results[command]["throughput"] or 0),
+            seconds * 1000.0,
+            peak if peak is not None else "-",
+            results[command]["failed"],
+            "" if results[command]["expected"] is None else " of {}".format(results[command]["expected"])))
+    return {
+        "meta": {
+            "backend": backend.name,
+            "implementation": mcc.implementation,
+            "workers": mcc.workers,
+            "python": platform.python_version(),
+            "faces": faces,
+            "nodes": nodes,
+            "defects": mesh.defects,
+            "elements": counts,
+        },
+        "results": results,
+    }
+
+
+def verify(report):
+    # Returns one message per check whose failures differ from the planted ones.
+    wrong = []
+    for command, result in report["results"].items():
+        expected = result.get("expected")
+        if expected is not None and result["failed"] != expected:
+            wrong.append("{}: {} failing components, {} planted".format(command, result["failed"], expected))
+    return wrong
+
+
+def compare(report, baseline, tolerance):
+    # Returns one message per regression against the baseline report.
+    regressions = []
+    for command, result in report["results"].items():
+        previous = baseline.get("results", {}).get(command)
+        if not previous:
+            continue
+        if previous.get("throughput") and result["throughput"] is not None:
+            if result["throughput"] < previous["throughput"] * (1.0 - tolerance):
+                regressions.append("{}: throughput {} el/s, baseline {} el/s".format(
+                    command, result["throughput"], previous["throughput"]))
+        if previous.get("peakMemory") and result["peakMemory"] is not None:
+            if result["peakMemory"] > previous["peakMemory"] * (1.0 + tolerance):
+                regressions.append("{}: peak memory {} B, baseline {} B".format(
+                    command, result["peakMemory"], previous["peakMemory"]))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark modelChecker checks on synthetic meshes.")
+    parser.add_argument("--checks", help="Comma separated checks, all checks by default")
+    parser.add_argument("--backend", default=MayaBackend.name, choices=sorted(BACKENDS))
+    parser.add_argument("--implementation", help="Check implementation, see modelChecker_commands")
+    parser.add_argument("--workers", help="Kernel threads, a number or auto")
+    parser.add_argument("--faces", type=int, default=DEFAULT_FACES, help="Faces in the grid mesh")
+    parser.add_argument("--nodes", type=int, default=DEFAULT_NODES, help="Extra transforms for the node checks")
+    parser.add_argument("--defects", type=int, default=DEFAULT_DEFECTS, help="Planted defects of each kind")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per check, the best is kept")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--save", help="Write the results as JSON")
+    args = parser.parse_args(args)
+
+    mcreg.loadPlugins()
+    checks = args.checks.split(",") if args.checks else sorted(mcl.mcCommandsList)
+    unknown = [check for check in checks if check not in mcl.mcCommandsList]
+    if unknown:
+        parser.error("Unknown checks: {}".format(", ".join(unknown)))
+
+    backend = BACKENDS[args.backend]()
+    if hasattr(backend, "initialize"):
+        backend.initialize()
+    try:
+        import modelChecker.modelChecker_commands as mcc
+        if args.implementation:
+            mcc.setImplementation(args.implementation)
+        if args.workers:
+            mcc.setWorkers(None if args.workers == "auto" else int(args.workers))
+        report = runBenchmark(
+            backend, checks, args.faces, args.nodes, args.defects, args.repeat, sys.stdout)
+    finally:
+        if hasattr(backend, "uninitialize"):
+            backend.uninitialize()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=4, sort_keys=True)
+    wrong = verify(report)
+    for message in wrong:
+        sys.stderr.write("Wrong result: {}\n".format(message))
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            sys.stderr.write("Regression: {}\n".format(regression))
+    return 1 if wrong or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
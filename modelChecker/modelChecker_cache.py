@@ -0,0 +1,214 @@
+import hashlib
+import os
+import sqlite3
+import struct
+import time
+from collections import defaultdict
+
+from modelChecker.modelChecker_backend import om
+import modelChecker.modelChecker_components as mcco
+import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_mesh as mcm
+from modelChecker.__version__ import __version__
+
+# Result Cache
+#     Keeps the failing ids of every (mesh content, check, check version) in
+#     an sqlite file, so meshes that did not change since they were last
+#     checked, in this session or any other, are not checked again.
+#     The content digest hashes the snapshot buffers a check reads through
+#     memoryview, without copying them. Edge ids are only stable for the same
+#     edge list, so edge checks also hash the edges. Before Python 3 the
+#     digest is SHA-1 over buffer() views, BLAKE2 is not available there.
+#     Rows remember when they were last used, and the least recently used
+#     ones are dropped once the stored runs outgrow maxBytes.
+
+MESH_DATA = ("points", "polygonCounts", "polygonConnects", "us", "vs", "uvCounts", "uvIds")
+EDGE_DATA = MESH_DATA + ("edges",)
+
+# Checks whose result only depends on the buffers listed. hardEdges reads the
+# edge smoothing and selfPenetratingUVs every UV set, they always run.
+CACHEABLE = {
+    "triangles": MESH_DATA,
+    "ngons": MESH_DATA,
+    "lamina": MESH_DATA,
+    "zeroAreaFaces": MESH_DATA,
+    "starlike": MESH_DATA,
+    "poles": MESH_DATA,
+    "missingUVs": MESH_DATA,
+    "uvRange": MESH_DATA,
+    "onBorder": MESH_DATA,
+    "crossBorder": MESH_DATA,
+    "zeroLengthEdges": EDGE_DATA,
+    "noneManifoldEdges": EDGE_DATA,
+    "openEdges": EDGE_DATA,
+}
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def defaultPath():
+    path = os.environ.get("MODELCHECKER_CACHE")
+    if path:
+        return path
+    return os.path.join(os.path.expanduser("~"), ".modelChecker", "results.sqlite")
+
+
+def checkVersion(command):
+    # Bump 'version' in modelChecker_list when a check's results change.
+    return "{}:{}".format(__version__, mcl.mcCommandsList[command].get('version', 1))
+
+
+def _newDigest():
+    if hasattr(hashlib, "blake2b"):
+        return hashlib.blake2b(digest_size=20)
+    return hashlib.sha1()
+
+
+def _rawBytes(values):
+    # The bytes of an array without a copy, buffer() before Python 3.
+    if hasattr(memoryview, "cast"):
+        return memoryview(values).cast('B')
+    return buffer(values)
+
+
+def meshDigest(snapshot, data=MESH_DATA):
+    digest = _newDigest()
+    for name in data:
+        values = getattr(snapshot, name)
+        digest.update(struct.pack("<q", len(values)))
+        digest.update(_rawBytes(values))
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    def __init__(self, path=None, maxBytes=DEFAULT_MAX_BYTES):
+        self.path = path or defaultPath()
+        self.maxBytes = maxBytes
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "digest TEXT, command TEXT, version TEXT, type TEXT, "
+            "starts BLOB, ends BLOB, size INTEGER, used REAL, "
+            "PRIMARY KEY (digest, command, version))")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS resultsUsed ON results (used)")
+        self.connection.commit()
+
+    def lookup(self, digest, command):
+        # (type, ComponentSet) or None.
+        row = self.connection.execute(
+            "SELECT type, starts, ends FROM results WHERE digest = ? AND command = ? AND version = ?",
+            (digest, command, checkVersion(command))).fetchone()
+        if row is None:
+            return None
+        return row[0], mcco.ComponentSet.fromRuns(row[1], row[2])
+
+    def touch(self, keys):
+        # keys: (digest, command) pairs that were just read.
+        now = time.time()
+        self.connection.executemany(
+            "UPDATE results SET used = ? WHERE digest = ? AND command = ? AND version = ?",
+            [(now, digest, command, checkVersion(command)) for digest, command in keys])
+        self.connection.commit()
+
+    def store(self, entries):
+        # entries: (digest, command, type, ComponentSet) of checked meshes.
+        now = time.time()
+        rows = []
+        for digest, command, type, components in entries:
+            starts, ends = components.runBytes()
+            rows.append((digest, command, checkVersion(command), type,
+                         sqlite3.Binary(starts), sqlite3.Binary(ends),
+                         len(starts) + len(ends) + len(digest) + len(command), now))
+        self.connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.evict()
+        self.connection.commit()
+
+    def evict(self):
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.maxBytes:
+            return
+        dropped = []
+        for rowid, size in self.connection.execute("SELECT rowid, size FROM results ORDER BY used"):
+            if total <= self.maxBytes:
+                break
+            dropped.append((rowid,))
+            total -= size
+        self.connection.executemany("DELETE FROM results WHERE rowid = ?", dropped)
+
+    def clear(self):
+        self.connection.execute("DELETE FROM results")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class CachePlan(object):
+    # One engine run against the cache. Answers every (mesh, check) pair the
+    # cache holds, leaves each check the meshes it still has to check, and
+    # stores what the checks found for those.
+    #     missing -> {command: MSelectionList}, checks left the same meshes
+    #                share one list, so the engine can fuse them
+    #     stats   -> {"hits": n, "misses": n}, counted per mesh and check
+    def __init__(self, cache, checks, SLMesh):
+        self.cache = cache
+        self.commands = [command for command in checks if command in CACHEABLE]
+        self.hits = dict((command, []) for command in self.commands)
+        self.digests = {}
+        self.pending = {}
+        self.found = defaultdict(dict)
+        self.stats = {"hits": 0, "misses": 0}
+        self.missing = {}
+        if not self.commands:
+            return
+        touched = []
+        paths = dict((command, []) for command in self.commands)
+        for snapshot in mcm.iterSnapshots(SLMesh):
+            digests = {}
+            pending = set()
+            for command in self.commands:
+                data = CACHEABLE[command]
+                if data not in digests:
+                    digests[data] = meshDigest(snapshot, data)
+                answer = cache.lookup(digests[data], command)
+                if answer is None:
+                    pending.add(command)
+                    paths[command].append((snapshot.uuid, snapshot.dagPath))
+                    continue
+                if answer[1]:
+                    self.hits[command].append((snapshot.uuid, answer[1]))
+                touched.append((digests[data], command))
+            if pending:
+                self.digests[snapshot.uuid] = digests
+                self.pending[snapshot.uuid] = pending
+            self.stats["hits"] += len(self.commands) - len(pending)
+            self.stats["misses"] += len(pending)
+        selections = {}
+        for command, commandPaths in paths.items():
+            key = tuple(uuid for uuid, _ in commandPaths)
+            if key not in selections:
+                selections[key] = om.MSelectionList()
+                for _, dagPath in commandPaths:
+                    selections[key].add(dagPath)
+            self.missing[command] = selections[key]
+        if touched:
+            cache.touch(touched)
+
+    def record(self, command, uuid, ids):
+        if command in self.pending.get(uuid, ()):
+            self.found[command].setdefault(uuid, mcco.ComponentSet()).extend(ids)
+
+    def store(self, types):
+        # types: {command: type} of the commands that ran to the end.
+        entries = []
+        for uuid, pending in self.pending.items():
+            digests = self.digests[uuid]
+            for command in self.commands:
+                if command in pending and command in types:
+                    components = self.found[command].get(uuid, mcco.ComponentSet())
+                    entries.append((digests[CACHEABLE[command]], command, types[command], components))
+        if entries:
+            self.cache.store(entries)
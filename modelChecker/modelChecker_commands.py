@@ -1,21 +1,355 @@
-from collections import defaultdict
-
-import maya.cmds as cmds
-import maya.api.OpenMaya as om
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from modelChecker.modelChecker_backend import cmds, om
+import modelChecker.modelChecker_components as mcco
+import modelChecker.modelChecker_mesh as mcm
+import modelChecker.modelChecker_names as mcn
+import modelChecker.modelChecker_scene as mcs
+
+HAS_NUMPY = None
+
+try:
+    import numpy as np
+    import modelChecker.modelChecker_kernels as mck
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
 
 # Returns Error Tuple
-#     "uv": {}, [UUID] : [... uvId]
-#     "vertex": {},[UUID] : [... vertexId ]
-#     "edge" : {},[UUID] : [... edgeId ]
-#     "polygon": {}, -> [UUID] : [... polygonId ]
+#     "uv": {}, [UUID] : ComponentSet(... uvId)
+#     "vertex": {},[UUID] : ComponentSet(... vertexId)
+#     "edge" : {},[UUID] : ComponentSet(... edgeId)
+#     "polygon": {}, -> [UUID] : ComponentSet(... polygonId)
 #     "nodes" : [] -> [... nodes UUIDs]
+# ComponentSet, from modelChecker_components, keeps ids as runs.
+# Component checks may return an iterator of (UUID, [... ids]) pairs instead
+# of the dict, one pair per mesh with failures, so results stream in as the
+# meshes are processed. See modelChecker_engine for how they are consumed.
 
 # Internal Utility Functions
 def _getNodeName(uuid):
-    nodeName = cmds.ls(uuid, uuid=True)
-    if nodeName:
-        return nodeName[0]
-    return None
+    return mcn.names.name(uuid)
+
+
+# Fused mesh iteration
+#     Face and edge checks are expressed as a test on a per-component measure.
+#     iterMeshChecks walks each mesh's faces once and its edges once, computes
+#     every measure the requested checks need, runs all tests on that visit and
+#     yields the failures of the mesh before moving on to the next one.
+FACE_MEASURES = {
+    "sides": lambda faceIt: faceIt.polygonVertexCount(),
+    "lamina": lambda faceIt: faceIt.isLamina(),
+    "area": lambda faceIt: faceIt.getArea(),
+    "starlike": lambda faceIt: faceIt.isStarlike(),
+    "hasUVs": lambda faceIt: faceIt.hasUVs(),
+}
+
+EDGE_MEASURES = {
+    "hard": lambda edgeIt: edgeIt.isSmooth is False and edgeIt.onBoundary() is False,
+    "length": lambda edgeIt: edgeIt.length(),
+    "connectedFaces": lambda edgeIt: edgeIt.numConnectedFaces(),
+}
+
+FACE_CHECKS = {
+    "triangles": ("sides", lambda sides: sides == 3),
+    "ngons": ("sides", lambda sides: sides > 4),
+    "lamina": ("lamina", lambda lamina: lamina is True),
+    "zeroAreaFaces": ("area", lambda area: area <= 0.00000001),
+    "starlike": ("starlike", lambda starlike: starlike is False),
+    "missingUVs": ("hasUVs", lambda hasUVs: hasUVs is False),
+}
+
+EDGE_CHECKS = {
+    "hardEdges": ("hard", lambda hard: hard),
+    "zeroLengthEdges": ("length", lambda length: length <= 0.00000001),
+    "noneManifoldEdges": ("connectedFaces", lambda faces: faces > 2),
+    "openEdges": ("connectedFaces", lambda faces: faces < 2),
+}
+
+
+# Vectorized implementation
+#     With "numpy" selected, checks listed in VECTOR_CHECKS run a kernel from
+#     modelChecker_kernels over the buffers of the mesh snapshot instead of
+#     walking components. "api" keeps every check on the Maya iterators.
+IMPLEMENTATIONS = ("api", "numpy")
+implementation = "numpy" if HAS_NUMPY else "api"
+
+VECTOR_CHECKS = {
+    "triangles": ("polygon", ("polygonCounts",), "triangles"),
+    "ngons": ("polygon", ("polygonCounts",), "ngons"),
+    "uvRange": ("uv", ("us", "vs"), "uvRange"),
+    "onBorder": ("uv", ("us", "vs", "uTruncated", "vTruncated"), "onBorder"),
+    "crossBorder": ("polygon", ("uvCounts", "uvIds", "us", "vs", "uTruncated", "vTruncated"), "crossBorder"),
+    "openEdges": ("edge", ("edgeFaceCounts",), "openEdges"),
+    "noneManifoldEdges": ("edge", ("edgeFaceCounts",), "noneManifoldEdges"),
+}
+
+# Intermediates
+#     Kernels read snapshot buffers and intermediates, named like buffers and
+#     computed by a kernel from buffers or earlier intermediates. Each one is
+#     computed once per mesh, before the first kernel that reads it, and
+#     shared by all of them.
+INTERMEDIATES = (
+    ("uTruncated", ("us",), "truncate"),
+    ("vTruncated", ("vs",), "truncate"),
+    ("edgeFaceCounts", ("polygonCounts", "polygonConnects", "edges"), "edgeFaceCounts"),
+)
+
+
+# Kernel threads
+#     Kernels release the GIL in NumPy, so with more than one worker they run
+#     on a thread pool. The calling thread still extracts every buffer, since
+#     only it may call Maya, and results come back in mesh order whatever
+#     order the threads finish in.
+workers = 1
+
+# Kernels in flight per worker before the extraction waits for the oldest.
+PENDING_PER_WORKER = 2
+
+
+# Component kind counted as visited when a kernel reads a buffer, and the
+# buffer values per component.
+DATA_KINDS = {
+    "polygonCounts": ("faces", 1),
+    "us": ("uvs", 1),
+    "uvCounts": ("faces", 1),
+    "edges": ("edges", 2),
+}
+
+
+def setImplementation(name):
+    global implementation
+    if name not in IMPLEMENTATIONS:
+        raise ValueError("Unknown implementation: {}".format(name))
+    if name == "numpy" and not HAS_NUMPY:
+        raise ImportError("The numpy implementation requires numpy")
+    implementation = name
+
+
+def setWorkers(count):
+    # None uses every core.
+    global workers
+    if count is None:
+        if hasattr(os, "sched_getaffinity"):
+            count = len(os.sched_getaffinity(0))
+        else:
+            count = getattr(os, "cpu_count", lambda: 1)() or 1
+    if count < 1:
+        raise ValueError("Workers must be at least 1")
+    workers = count if ThreadPoolExecutor is not None else 1
+
+
+@contextmanager
+def kernelWorkers(count):
+    # setWorkers for one block, "auto" uses every core, None changes nothing.
+    global workers
+    previous = workers
+    if count is not None:
+        setWorkers(None if count == "auto" else count)
+    try:
+        yield
+    finally:
+        workers = previous
+
+
+def _inOrder(tasks):
+    # tasks yields (key, function, args), made on the calling thread. Yields
+    # (key, function(*args)) in task order. A task without a function
+    # carries its result in args.
+    if workers <= 1:
+        for key, function, args in tasks:
+            yield key, function(*args) if function else args
+        return
+    with ThreadPoolExecutor(workers) as executor:
+        pending = deque()
+        for key, function, args in tasks:
+            pending.append((key, executor.submit(function, *args) if function else None, args))
+            while len(pending) > workers * PENDING_PER_WORKER:
+                key, future, args = pending.popleft()
+                yield key, future.result() if future else args
+        while pending:
+            key, future, args = pending.popleft()
+            yield key, future.result() if future else args
+
+
+def _asNumpy(buffer):
+    return np.frombuffer(buffer, dtype=buffer.typecode)
+
+
+def _walkComponents(componentIt, kind, measures, checks, limits=None):
+    # limits: {command: failures}, the walk stops once every check found as
+    # many failures as it still has room for.
+    needed = [(name, measures[name]) for name in set(measure for _, (measure, _) in checks)]
+    failed = dict((command, []) for command, _ in checks)
+    # Checks still below their limit, None when one of them has none.
+    filling = None
+    if limits and len(limits) == len(checks):
+        filling = sum(1 for limit in limits.values() if limit > 0)
+    visited = 0
+    while not componentIt.isDone():
+        values = dict((name, measure(componentIt)) for name, measure in needed)
+        index = componentIt.index()
+        for command, (measure, test) in checks:
+            if test(values[measure]):
+                failed[command].append(index)
+                if filling is not None and len(failed[command]) == limits[command]:
+                    filling -= 1
+        visited += 1
+        if filling is not None and filling <= 0:
+            break
+        componentIt.next()
+    mcm.countVisits(kind, visited * len(checks))
+    return failed
+
+
+def _meshChecks(commands):
+    vectorChecks = []
+    if implementation == "numpy":
+        vectorChecks = [(command, VECTOR_CHECKS[command]) for command in commands if command in VECTOR_CHECKS]
+        # Reading the edge list costs about as much as walking the edges, so
+        # the edge kernels only run when no other edge check walks them.
+        if any(command in EDGE_CHECKS and command not in VECTOR_CHECKS for command in commands):
+            vectorChecks = [check for check in vectorChecks if check[0] not in EDGE_CHECKS]
+    vectorized = set(command for command, _ in vectorChecks)
+    faceChecks = [(command, FACE_CHECKS[command]) for command in commands if command in FACE_CHECKS and command not in vectorized]
+    edgeChecks = [(command, EDGE_CHECKS[command]) for command in commands if command in EDGE_CHECKS and command not in vectorized]
+    return vectorChecks, faceChecks, edgeChecks
+
+
+def meshCheckTypes(commands):
+    # {command: type} of the commands the fused pass runs.
+    vectorChecks, faceChecks, edgeChecks = _meshChecks(commands)
+    types = dict((command, type) for command, (type, _, _) in vectorChecks)
+    types.update((command, "polygon") for command, _ in faceChecks)
+    types.update((command, "edge") for command, _ in edgeChecks)
+    return types
+
+
+class MeshPlan(object):
+    # What a fused pass computes for every mesh, in order:
+    #     buffers       -> snapshot buffers the kernels read
+    #     intermediates -> (name, inputs, kernel) computed once per mesh
+    #     kernels       -> (command, inputs, kernel)
+    #     walks         -> (kind, iterator, measures, checks), one component
+    #                      walk computing every measure its checks test
+    # seconds holds the time spent in each step, summed over the meshes.
+    # Kernel and intermediate times are thread time when workers run them.
+    def __init__(self, commands):
+        vectorChecks, faceChecks, edgeChecks = _meshChecks(commands)
+        self.vectorChecks = vectorChecks
+        self.walks = (
+            ("faces", om.MItMeshPolygon, FACE_MEASURES, faceChecks),
+            ("edges", om.MItMeshEdge, EDGE_MEASURES, edgeChecks),
+        )
+        self.seconds = defaultdict(float)
+        self.meshes = 0
+
+    def __bool__(self):
+        return bool(self.vectorChecks) or any(checks for _, _, _, checks in self.walks)
+
+    __nonzero__ = __bool__
+
+    def commands(self):
+        return [command for command, _ in self.vectorChecks] + [
+            command for _, _, _, checks in self.walks for command, _ in checks]
+
+    def steps(self, stopped=None):
+        # (buffers, intermediates, kernels, walks) for the checks not stopped.
+        kernels = [(command, data, kernel) for command, (_, data, kernel) in self.vectorChecks
+                   if not (stopped and stopped(command))]
+        walks = [(kind, iterator, measures, [check for check in checks if not (stopped and stopped(check[0]))])
+                 for kind, iterator, measures, checks in self.walks]
+        needed = set(name for _, data, _ in kernels for name in data)
+        intermediates = []
+        for name, data, kernel in reversed(INTERMEDIATES):
+            if name in needed:
+                intermediates.insert(0, (name, data, kernel))
+                needed.update(data)
+        produced = set(name for name, _, _ in intermediates)
+        buffers = []
+        for name in [name for _, data, _ in intermediates + kernels for name in data]:
+            if name not in produced and name not in buffers:
+                buffers.append(name)
+        return buffers, intermediates, kernels, walks
+
+
+def _runSteps(intermediates, kernels, arrays):
+    # One mesh on a kernel thread. Returns ({command: ids}, {step: seconds}).
+    arrays = dict(arrays)
+    seconds = {}
+    for name, data, kernel in intermediates:
+        start = time.time()
+        arrays[name] = getattr(mck, kernel)(*[arrays[input] for input in data])
+        seconds[name] = time.time() - start
+    failed = {}
+    for command, data, kernel in kernels:
+        start = time.time()
+        failed[command] = getattr(mck, kernel)(*[arrays[input] for input in data])
+        seconds[command] = time.time() - start
+    return failed, seconds
+
+
+def _meshTasks(plan, SLMesh, unmapped, stopped, remaining):
+    # Kernels of a mesh become one task, component walks run here and pass
+    # their result.
+    for snapshot in mcm.iterSnapshots(SLMesh):
+        plan.meshes += 1
+        buffers, intermediates, kernels, walks = plan.steps(stopped)
+        if kernels:
+            arrays = {}
+            for name in buffers:
+                start = time.time()
+                arrays[name] = _asNumpy(getattr(snapshot, name))
+                plan.seconds[name] += time.time() - start
+                if name in DATA_KINDS:
+                    kind, width = DATA_KINDS[name]
+                    mcm.countVisits(kind, len(arrays[name]) // width)
+            yield snapshot.uuid, _runSteps, (intermediates, kernels, arrays)
+        if any(command == "crossBorder" for command, _, _ in kernels):
+            unmapped[0] += snapshot.uvCounts.count(0)
+        for kind, iterator, measures, checks in walks:
+            if checks:
+                start = time.time()
+                limits = None
+                if remaining:
+                    limits = dict((command, remaining(command)) for command, _ in checks)
+                    limits = dict((command, limit) for command, limit in limits.items() if limit is not None)
+                failed = _walkComponents(iterator(snapshot.dagPath), kind, measures, checks, limits)
+                yield snapshot.uuid, None, (failed, {kind + " walk": time.time() - start})
+
+
+def iterMeshChecks(commands, SLMesh, stopped=None, plan=None, remaining=None):
+    # Yields (command, UUID, [... ids]) for every mesh a command fails on.
+    # stopped: callable(command) -> bool, checks it returns True for are
+    # left out of the meshes still to come. plan: the MeshPlan of commands,
+    # to read its step times afterwards. remaining: callable(command) -> the
+    # failures a check still keeps of one mesh, or None, component walks
+    # stop early once none of their checks keeps more.
+    plan = plan or MeshPlan(commands)
+    if not plan:
+        return
+    unmapped = [0]
+    for uuid, (failed, seconds) in _inOrder(_meshTasks(plan, SLMesh, unmapped, stopped, remaining)):
+        for step, duration in seconds.items():
+            plan.seconds[step] += duration
+        for command, ids in failed.items():
+            if len(ids):
+                yield command, uuid, ids
+    if unmapped[0]:
+        cmds.warning("Cross Border: {} faces have no UVs".format(unmapped[0]))
+
+
+def _streamMeshCheck(command, SLMesh):
+    pairs = ((uuid, ids) for _, uuid, ids in iterMeshChecks([command], SLMesh))
+    return meshCheckTypes([command])[command], pairs
 
 
 # Functions to be imported
@@ -30,8 +364,7 @@ def trailingNumbers(nodes, _):
 def duplicatedNames(nodes, _):
     nodesByShortName = defaultdict(list)
     for node in nodes:
-        nodeName = _getNodeName(node)
-        name = nodeName.rsplit('|', 1)[-1]
+        name = mcn.names.shortName(node)
         nodesByShortName[name].append(node)
     invalid = []
     for name, shortNameNodes in nodesByShortName.items():
@@ -51,110 +384,62 @@ def namespaces(nodes, _):
 
 def shapeNames(nodes, _):
     shapeNames = []
+    scene = mcs.scene.ensure()
     for node in nodes:
-        nodeName = _getNodeName(node)
-        if nodeName:
-            new = nodeName.split('|')
-            shape = cmds.listRelatives(nodeName, shapes=True)
-            if shape:
-                shapename = new[-1] + "Shape"
-                if shape[0] != shapename:
-                    shapeNames.append(node)
+        dagNode = scene.get(node)
+        if dagNode and dagNode.shapes:
+            shapename = dagNode.name + "Shape"
+            if scene.get(dagNode.shapes[0]).name != shapename:
+                shapeNames.append(node)
     return "nodes", shapeNames
 
 def triangles(_, SLMesh):
-    triangles = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        faceIt = om.MItMeshPolygon(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        while not faceIt.isDone():
-            numOfEdges = faceIt.getEdges()
-            if len(numOfEdges) == 3:
-                triangles[uuid].append(faceIt.index())
-            faceIt.next()
-        selIt.next()
-    return "polygon", triangles
+    return _streamMeshCheck("triangles", SLMesh)
 
 
 def ngons(_, SLMesh):
-    ngons = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        faceIt = om.MItMeshPolygon(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        while not faceIt.isDone():
-            numOfEdges = faceIt.getEdges()
-            if len(numOfEdges) > 4:
-                ngons[uuid].append(faceIt.index())
-            faceIt.next()
-        selIt.next()
-    return "polygon", ngons
+    return _streamMeshCheck("ngons", SLMesh)
 
 def hardEdges(_, SLMesh):
-    hardEdges = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        edgeIt = om.MItMeshEdge(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        while not edgeIt.isDone():
-            if edgeIt.isSmooth is False and edgeIt.onBoundary() is False:
-                hardEdges[uuid].append(edgeIt.index())
-            edgeIt.next()
-        selIt.next()
-    return "edge", hardEdges
+    return _streamMeshCheck("hardEdges", SLMesh)
 
 def lamina(_, SLMesh):
-    lamina = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        faceIt = om.MItMeshPolygon(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        while not faceIt.isDone():
-            laminaFaces = faceIt.isLamina()
-            if laminaFaces is True:
-                lamina[uuid].append(faceIt.index())
-            faceIt.next()
-        selIt.next()
-    return "polygon", lamina
+    return _streamMeshCheck("lamina", SLMesh)
 
 
 def zeroAreaFaces(_, SLMesh):
-    zeroAreaFaces = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        faceIt = om.MItMeshPolygon(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        while not faceIt.isDone():
-            faceArea = faceIt.getArea()
-            if faceArea <= 0.00000001:
-                zeroAreaFaces[uuid].append(faceIt.index())
-            faceIt.next()
-        selIt.next()
-    return "polygon", zeroAreaFaces
+    return _streamMeshCheck("zeroAreaFaces", SLMesh)
 
 
 def zeroLengthEdges(_, SLMesh):
-    zeroLengthEdges = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        edgeIt = om.MItMeshEdge(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        while not edgeIt.isDone():
-            if edgeIt.length() <= 0.00000001:
-                zeroLengthEdges[uuid].append(edgeIt.index())
-            edgeIt.next()
-        selIt.next()
-    return "edge", zeroLengthEdges
-
-def selfPenetratingUVs(transformNodes, _):
-    selfPenetratingUVs = defaultdict(list)
+    return _streamMeshCheck("zeroLengthEdges", SLMesh)
+
+def _uvOverlapTasks(SLMesh):
+    for snapshot in mcm.iterSnapshots(SLMesh):
+        for uvSet in snapshot.uvSetNames:
+            uvCounts, uvIds, us, vs = [_asNumpy(buffer) for buffer in snapshot.uvSet(uvSet)]
+            mcm.countVisits("faces", len(uvCounts))
+            yield snapshot.uuid, mck.uvOverlap, (uvCounts, uvIds, us, vs)
+
+def _iterUvOverlap(SLMesh):
+    # UV sets of one mesh come out one after the other.
+    current, overlapping = None, []
+    for uuid, faces in _inOrder(_uvOverlapTasks(SLMesh)):
+        if uuid != current and overlapping:
+            yield current, np.unique(np.concatenate(overlapping))
+            overlapping = []
+        current = uuid
+        if len(faces):
+            overlapping.append(faces)
+    if overlapping:
+        yield current, np.unique(np.concatenate(overlapping))
+
+def selfPenetratingUVs(transformNodes, SLMesh):
+    # Every UV set of every mesh with numpy, polyUVOverlap on the first shape
+    # otherwise.
+    if implementation == "numpy":
+        return "polygon", _iterUvOverlap(SLMesh)
+    selfPenetratingUVs = defaultdict(mcco.ComponentSet)
     for node in transformNodes:
         nodeName = _getNodeName(node)
         shapes = cmds.listRelatives(
@@ -163,138 +448,103 @@ def selfPenetratingUVs(transformNodes, _):
             type="mesh",
             noIntermediate=True)
         if shapes:
+            mcm.countVisits("meshes")
             overlapping = cmds.polyUVOverlap("{}.f[*]".format(shapes[0]), oc=True)
             if overlapping:
-                formatted = [ overlap.split("{}.f[".format(shapes[0]))[1][:-1] for overlap in overlapping ]
-                selfPenetratingUVs[node].extend(formatted)
+                for overlap in overlapping:
+                    ids = overlap.split("{}.f[".format(shapes[0]))[1][:-1].split(":")
+                    selfPenetratingUVs[node].extend(range(int(ids[0]), int(ids[-1]) + 1))
     return "polygon", selfPenetratingUVs
 
 def noneManifoldEdges(_, SLMesh):
-    noneManifoldEdges = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        edgeIt = om.MItMeshEdge(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        while not edgeIt.isDone():
-            if edgeIt.numConnectedFaces() > 2:
-                noneManifoldEdges[uuid].append(edgeIt.index())
-            edgeIt.next()
-        selIt.next()
-    return "edge", noneManifoldEdges
+    return _streamMeshCheck("noneManifoldEdges", SLMesh)
 
 
 def openEdges(_, SLMesh):
-    openEdges = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        edgeIt = om.MItMeshEdge(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        while not edgeIt.isDone():
-            if edgeIt.numConnectedFaces() < 2:
-                openEdges[uuid].append(edgeIt.index())
-            edgeIt.next()
-        selIt.next()
-    return "edge", openEdges
+    return _streamMeshCheck("openEdges", SLMesh)
 
 
-def poles(_, SLMesh):
-    poles = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        vertexIt = om.MItMeshVertex(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
+def _iterPoles(SLMesh):
+    for snapshot in mcm.iterSnapshots(SLMesh):
+        poles = []
+        vertexIt = om.MItMeshVertex(snapshot.dagPath)
         while not vertexIt.isDone():
             if vertexIt.numConnectedEdges() > 5:
-                poles[uuid].append(vertexIt.index())
+                poles.append(vertexIt.index())
             vertexIt.next()
-        selIt.next()
-    return "vertex", poles
+        mcm.countVisits("vertices", vertexIt.count())
+        if poles:
+            yield snapshot.uuid, poles
+
+def poles(_, SLMesh):
+    return "vertex", _iterPoles(SLMesh)
 
 
 def starlike(_, SLMesh):
-    noneStarlike = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        polyIt = om.MItMeshPolygon(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        while not polyIt.isDone():
-            if polyIt.isStarlike() is False:
-                noneStarlike[uuid].append(polyIt.index())
-            polyIt.next()
-        selIt.next()
-    return "polygon", noneStarlike
+    return _streamMeshCheck("starlike", SLMesh)
 
 def missingUVs(_, SLMesh):
-    missingUVs = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        faceIt = om.MItMeshPolygon(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        while not faceIt.isDone():
-            if faceIt.hasUVs() is False:
-                missingUVs[uuid].append(faceIt.index())
-            faceIt.next()
-        selIt.next()
-    return "polygon", missingUVs
+    return _streamMeshCheck("missingUVs", SLMesh)
+
+def _iterUvRange(SLMesh):
+    for snapshot in mcm.iterSnapshots(SLMesh):
+        Us, Vs = snapshot.us, snapshot.vs
+        mcm.countVisits("uvs", len(Us))
+        uvRange = [i for i in range(len(Us)) if Us[i] < 0 or Us[i] > 10 or Vs[i] < 0]
+        if uvRange:
+            yield snapshot.uuid, uvRange
 
 def uvRange(_, SLMesh):
-    uvRange = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        mesh = om.MFnMesh(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        Us, Vs = mesh.getUVs()
-        for i in range(len(Us)):
-            if Us[i] < 0 or Us[i] > 10 or Vs[i] < 0:
-                uvRange[uuid].append(i)
-        selIt.next()
-    return "uv", uvRange
+    if implementation == "numpy":
+        return _streamMeshCheck("uvRange", SLMesh)
+    return "uv", _iterUvRange(SLMesh)
+
+def _iterOnBorder(SLMesh):
+    for snapshot in mcm.iterSnapshots(SLMesh):
+        Us, Vs = snapshot.us, snapshot.vs
+        mcm.countVisits("uvs", len(Us))
+        onBorder = [i for i in range(len(Us))
+                    if abs(int(Us[i]) - Us[i]) < 0.00001 or abs(int(Vs[i]) - Vs[i]) < 0.00001]
+        if onBorder:
+            yield snapshot.uuid, onBorder
 
 def onBorder(_, SLMesh):
-    onBorder = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        mesh = om.MFnMesh(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
-        Us, Vs = mesh.getUVs()
-        for i in range(len(Us)):
-            if abs(int(Us[i]) - Us[i]) < 0.00001 or abs(int(Vs[i]) - Vs[i]) < 0.00001:
-                onBorder[uuid].append(i)
-        selIt.next()
-    return "uv", onBorder
-
-def crossBorder(_, SLMesh):
-    crossBorder = defaultdict(list)
-    selIt = om.MItSelectionList(SLMesh)
-    while not selIt.isDone():
-        faceIt = om.MItMeshPolygon(selIt.getDagPath())
-        fn = om.MFnDependencyNode(selIt.getDagPath().node())
-        uuid = fn.uuid().asString()
+    if implementation == "numpy":
+        return _streamMeshCheck("onBorder", SLMesh)
+    return "uv", _iterOnBorder(SLMesh)
+
+def _iterCrossBorder(SLMesh):
+    unmappedFaces = 0
+    for snapshot in mcm.iterSnapshots(SLMesh):
+        crossBorder = []
+        faceIt = om.MItMeshPolygon(snapshot.dagPath)
         while not faceIt.isDone():
             U, V = set(), set()
             try:
                 UVs = faceIt.getUVs()
-                Us, Vs, = UVs[0], UVs[1]
-                for i in range(len(Us)):
-                    uAdd = int(Us[i]) if Us[i] > 0 else int(Us[i]) - 1
-                    vAdd = int(Vs[i]) if Vs[i] > 0 else int(Vs[i]) - 1
-                    U.add(uAdd)
-                    V.add(vAdd)
-                if len(U) > 1 or len(V) > 1:
-                    crossBorder[uuid].append(faceIt.index())
-                faceIt.next()
-            except:
-                cmds.warning("Face " + str(faceIt.index()) + " has no UVs")
+            except RuntimeError:
+                unmappedFaces += 1
                 faceIt.next()
-        selIt.next()
-    return "polygon", crossBorder
+                continue
+            Us, Vs, = UVs[0], UVs[1]
+            for i in range(len(Us)):
+                uAdd = int(Us[i]) if Us[i] > 0 else int(Us[i]) - 1
+                vAdd = int(Vs[i]) if Vs[i] > 0 else int(Vs[i]) - 1
+                U.add(uAdd)
+                V.add(vAdd)
+            if len(U) > 1 or len(V) > 1:
+                crossBorder.append(faceIt.index())
+            faceIt.next()
+        mcm.countVisits("faces", faceIt.count())
+        if crossBorder:
+            yield snapshot.uuid, crossBorder
+    if unmappedFaces:
+        cmds.warning("Cross Border: {} faces have no UVs".format(unmappedFaces))
+
+def crossBorder(_, SLMesh):
+    if implementation == "numpy":
+        return _streamMeshCheck("crossBorder", SLMesh)
+    return "polygon", _iterCrossBorder(SLMesh)
 
 def unfrozenTransforms(nodes, _):
     unfrozenTransforms = []
@@ -310,30 +560,31 @@ def unfrozenTransforms(nodes, _):
 
 def layers(nodes, _):
     layers = []
+    members = mcs.scene.displayLayerMembers()
     for node in nodes:
-        nodeName = _getNodeName(node)
-        layer = cmds.listConnections(nodeName, type="displayLayer")
-        if layer:
+        if node in members:
             layers.append(node)
     return "nodes", layers
 
 def shaders(transformNodes, _):
     shaders = []
+    scene = mcs.scene.ensure()
     for node in transformNodes:
-        nodeName = _getNodeName(node)
-        shape = cmds.listRelatives(nodeName, shapes=True, fullPath=True)
-        if cmds.nodeType(shape) == 'mesh' and shape:
+        dagNode = scene.get(node)
+        if dagNode and dagNode.shapes and scene.get(dagNode.shapes[0]).type == 'mesh':
+            shape = [scene.get(shape).path for shape in dagNode.shapes]
             shadingGrps = cmds.listConnections(shape, type='shadingEngine')
-            if shadingGrps[0] != 'initialShadingGroup':
+            if shadingGrps and shadingGrps[0] != 'initialShadingGroup':
                 shaders.append(node)
     return "nodes", shaders
 
 def history(nodes, _):
     history = []
+    scene = mcs.scene.ensure()
     for node in nodes:
-        nodeName = _getNodeName(node)
-        shape = cmds.listRelatives(nodeName, shapes=True, fullPath=True)
-        if shape and cmds.nodeType(shape[0]) == 'mesh':
+        dagNode = scene.get(node)
+        if dagNode and dagNode.shapes and scene.get(dagNode.shapes[0]).type == 'mesh':
+            shape = [scene.get(shape).path for shape in dagNode.shapes]
             historySize = len(cmds.listHistory(shape))
             if historySize > 1:
                 history.append(node)
@@ -350,21 +601,22 @@ def uncenteredPivots(nodes, _):
 
 def emptyGroups(nodes, _):
     emptyGroups = []
+    scene = mcs.scene.ensure()
     for node in nodes:
-        nodeName = _getNodeName(node)
-        if not cmds.listRelatives(nodeName, ad=True):
+        dagNode = scene.get(node)
+        if dagNode and not dagNode.children:
             emptyGroups.append(node)
     return "nodes", emptyGroups
 
 def parentGeometry(transformNodes, _):
     parentGeometry = []
+    scene = mcs.scene.ensure()
     for node in transformNodes:
-        nodeName = _getNodeName(node)
-        parents = cmds.listRelatives(nodeName, p=True, fullPath=True)
-        if parents:
-            for parent in parents:
-                children = cmds.listRelatives(parent, fullPath=True)
-                for child in children:
-                    if cmds.nodeType(child) == 'mesh':
-                        parentGeometry.append(node)
+        dagNode = scene.get(node)
+        if not dagNode:
+            continue
+        for parent in dagNode.parents:
+            if any(scene.get(child).type == 'mesh' for child in scene.get(parent).children):
+                parentGeometry.append(node)
+                break
     return "nodes", parentGeometry
@@ -0,0 +1,132 @@
+from array import array
+from bisect import bisect_right
+
+HAS_NUMPY = None
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Component Set
+#     The failing component ids of one mesh, as sorted runs of consecutive ids:
+#         starts -> 'i' [... first id of each run]
+#         ends   -> 'i' [... last id of each run]
+#     Storage, counting and formatting cost follow the number of runs, so a
+#     mesh where every face fails holds a single run. Iterating still yields
+#     the ids one by one.
+
+
+def _frombytes(values, data):
+    # array.frombytes, fromstring before Python 3.
+    if hasattr(values, "frombytes"):
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
+
+
+def _tobytes(values):
+    return values.tobytes() if hasattr(values, "tobytes") else values.tostring()
+
+
+class ComponentSet(object):
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, ids=()):
+        self.starts = array('i')
+        self.ends = array('i')
+        self.extend(ids)
+
+    @classmethod
+    def fromRuns(cls, starts, ends):
+        # Sorted, disjoint runs as 'i' arrays or their bytes.
+        components = cls()
+        _frombytes(components.starts, bytes(starts))
+        _frombytes(components.ends, bytes(ends))
+        return components
+
+    def runBytes(self):
+        # (starts, ends) as bytes, for fromRuns.
+        return _tobytes(self.starts), _tobytes(self.ends)
+
+    def extend(self, ids):
+        if isinstance(ids, ComponentSet):
+            ids = ids.toArray() if HAS_NUMPY else list(ids)
+        if HAS_NUMPY:
+            self._extendArray(np.asarray(ids, dtype=np.int64).ravel())
+            return
+        ids = list(ids)
+        if not ids:
+            return
+        ascending = all(a < b for a, b in zip(ids, ids[1:]))
+        if not ascending or (self.ends and ids[0] <= self.ends[-1]):
+            ids = sorted(set(ids).union(self))
+            self.starts, self.ends = array('i'), array('i')
+        for id in ids:
+            if self.ends and id == self.ends[-1] + 1:
+                self.ends[-1] = id
+            else:
+                self.starts.append(id)
+                self.ends.append(id)
+
+    def _extendArray(self, ids):
+        if not len(ids):
+            return
+        if len(ids) > 1 and (np.diff(ids) <= 0).any():
+            ids = np.unique(ids)
+        if self.ends and ids[0] <= self.ends[-1]:
+            ids = np.union1d(self.toArray(), ids)
+            self.starts, self.ends = array('i'), array('i')
+        breaks = np.nonzero(np.diff(ids) != 1)[0]
+        starts = ids[np.concatenate(([0], breaks + 1))]
+        ends = ids[np.concatenate((breaks, [len(ids) - 1]))]
+        if self.ends and starts[0] == self.ends[-1] + 1:
+            self.ends[-1] = int(ends[0])
+            starts, ends = starts[1:], ends[1:]
+        _frombytes(self.starts, starts.astype(np.int32).tobytes())
+        _frombytes(self.ends, ends.astype(np.int32).tobytes())
+
+    def toArray(self):
+        # Every id as an int array, only with numpy.
+        if not self.starts:
+            return np.zeros(0, dtype=np.int64)
+        starts = np.frombuffer(self.starts, dtype=np.int32).astype(np.int64)
+        lengths = np.frombuffer(self.ends, dtype=np.int32) - starts + 1
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return np.arange(int(lengths.sum())) + offsets
+
+    def runs(self):
+        return zip(self.starts, self.ends)
+
+    def formatRuns(self):
+        # ["12", "20:31", ...] as Maya writes component ranges.
+        return [str(start) if start == end else "{}:{}".format(start, end) for start, end in self.runs()]
+
+    def __len__(self):
+        return sum(self.ends) - sum(self.starts) + len(self.starts)
+
+    def __bool__(self):
+        return len(self.starts) > 0
+
+    __nonzero__ = __bool__
+
+    def __iter__(self):
+        for start, end in self.runs():
+            for id in range(start, end + 1):
+                yield id
+
+    def __contains__(self, id):
+        index = bisect_right(self.starts, id) - 1
+        return index >= 0 and id <= self.ends[index]
+
+    def __eq__(self, other):
+        if isinstance(other, ComponentSet):
+            return self.starts == other.starts and self.ends == other.ends
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "ComponentSet([{}])".format(", ".join(self.formatRuns()))
@@ -0,0 +1,78 @@
+from modelChecker.modelChecker_backend import om
+import modelChecker.modelChecker_cache as mcca
+import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_mesh as mcm
+import modelChecker.modelChecker_scene as mcs
+
+# Mesh Groups
+#     Set dressing repeats one mesh on many transforms, as instances of the
+#     same shape or as copies with identical geometry. Checks with
+#     'scope': 'mesh' run on one transform per group and their results are
+#     copied to the other transforms of the group.
+#         instances -> transforms sharing their mesh shapes, for every mesh
+#                      check
+#         geometry  -> also transforms whose meshes hash the same, only for
+#                      the checks the modelChecker_cache digest covers
+#     Hashing reads the mesh data of every transform, checks then reuse it
+#     inside the engine's snapshotCache block.
+
+
+class MeshGroups(object):
+    def __init__(self, nodes, SLMesh, checks, mode="instances"):
+        self.nodes = nodes
+        self.SLMesh = SLMesh
+        self.levels = {}
+        if not mode:
+            return
+        scene = mcs.scene.ensure()
+        meshChecks = [command for command in checks if mcl.mcCommandsList[command].get('scope') == 'mesh']
+        if not meshChecks:
+            return
+        byShapes = {}
+        for node in nodes:
+            shapes = tuple(scene.meshShapes(node))
+            if shapes:
+                byShapes.setdefault(shapes, []).append(node)
+        instances = self._level(byShapes.values())
+        for command in meshChecks:
+            self.levels[command] = instances
+
+        hashed = [command for command in meshChecks if command in mcca.CACHEABLE]
+        if mode != "geometry" or not hashed:
+            return
+        # Equal edge lists imply equal faces and UVs, the edges are only
+        # hashed when an edge check needs them anyway.
+        data = mcca.EDGE_DATA if any(mcca.CACHEABLE[command] == mcca.EDGE_DATA for command in hashed) else mcca.MESH_DATA
+        byDigest = {}
+        for snapshot in mcm.iterSnapshots(instances[1]):
+            byDigest.setdefault(mcca.meshDigest(snapshot, data), []).extend(instances[2][snapshot.uuid])
+        copies = self._level(byDigest.values())
+        for command in hashed:
+            self.levels[command] = copies
+
+    def _level(self, groups):
+        # (representative nodes, their selection list, {representative: [... every node of its group]})
+        scene = mcs.scene.ensure()
+        representatives = []
+        selection = om.MSelectionList()
+        members = {}
+        for group in groups:
+            representatives.append(group[0])
+            selection.add(scene.get(group[0]).dagPath)
+            members[group[0]] = group
+        return representatives, selection, members
+
+    def meshes(self, command):
+        # (nodes, SLMesh) to run a check on.
+        level = self.levels.get(command)
+        if level is None:
+            return self.nodes, self.SLMesh
+        return level[0], level[1]
+
+    def members(self, command, uuid):
+        # Every node the failures of a checked node apply to.
+        level = self.levels.get(command)
+        if level is None:
+            return (uuid,)
+        return level[2].get(uuid, (uuid,))
+
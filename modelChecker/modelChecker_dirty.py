@@ -0,0 +1,147 @@
+from collections import defaultdict
+from functools import partial
+
+from modelChecker.modelChecker_backend import om
+import modelChecker.modelChecker_components as mcco
+import modelChecker.modelChecker_scene as mcs
+
+# Dirty Tracker
+#     Registers callbacks on the transforms of checked contexts and on their
+#     shapes, and collects the UUIDs of the transforms edited since they were
+#     last checked. Shape edits, renames, shader assignments, topology changes
+#     and removals are reported on the owning transform, since results are
+#     keyed by transform UUID.
+#     Edits that change the results of other nodes dirty those too:
+#         transform attributes, renames -> every descendant, world space
+#                                          checks read the whole path
+#         children added or removed     -> the old and new parents, and the
+#                                          moved node with its descendants
+#     Ancestors of the watched transforms, in the context or not, are watched
+#     for attribute edits and renames as well.
+#     Descendants are only looked up when the dirty nodes are taken, since
+#     the scene index is stale while the hierarchy is being edited.
+
+
+class DirtyTracker(object):
+    def __init__(self, onDirty=None):
+        self.dirty = set()
+        self.onDirty = onDirty
+        self._owners = {}
+        self._callbacks = {}
+        self._ancestorCallbacks = {}
+        self._subtrees = set()
+        self._sceneCallbacks = []
+
+    def markDirty(self, uuid, *args):
+        self.dirty.add(uuid)
+        if self.onDirty:
+            self.onDirty(uuid)
+
+    def markSubtree(self, uuid, *args):
+        self._subtrees.add(uuid)
+        self.markDirty(uuid)
+
+    def _nodeRemoved(self, node, *args):
+        owner = self._owners.get(om.MFnDependencyNode(node).uuid().asString())
+        if owner:
+            self.markDirty(owner)
+
+    def _childChanged(self, child, parent, *args):
+        if not parent.node().hasFn(om.MFn.kWorld):
+            parentUuid = om.MFnDependencyNode(parent.node()).uuid().asString()
+            if child.node().hasFn(om.MFn.kShape):
+                # Geometry under a group changes parentGeometry on its children.
+                self.markSubtree(parentUuid)
+            else:
+                self.markDirty(parentUuid)
+        if child.node().hasFn(om.MFn.kTransform):
+            self.markSubtree(om.MFnDependencyNode(child.node()).uuid().asString())
+
+    def watch(self, uuids):
+        scene = mcs.scene.ensure()
+        if not self._sceneCallbacks:
+            self._sceneCallbacks = [
+                om.MDGMessage.addNodeRemovedCallback(self._nodeRemoved, "dependNode"),
+                om.MDagMessage.addChildAddedCallback(self._childChanged),
+                om.MDagMessage.addChildRemovedCallback(self._childChanged),
+            ]
+        for uuid in uuids:
+            dagNode = scene.get(uuid)
+            if uuid in self._callbacks or not dagNode:
+                continue
+            mark = partial(self.markDirty, uuid)
+            markSubtree = partial(self.markSubtree, uuid)
+            node = dagNode.dagPath.node()
+            callbacks = [
+                om.MNodeMessage.addAttributeChangedCallback(node, markSubtree),
+                om.MNodeMessage.addNameChangedCallback(node, markSubtree),
+            ]
+            self._owners[uuid] = uuid
+            for shapeUuid in dagNode.shapes:
+                shape = scene.get(shapeUuid)
+                shapeNode = shape.dagPath.node()
+                callbacks.append(om.MNodeMessage.addNodeDirtyCallback(shapeNode, mark))
+                callbacks.append(om.MNodeMessage.addAttributeChangedCallback(shapeNode, mark))
+                callbacks.append(om.MNodeMessage.addNameChangedCallback(shapeNode, mark))
+                if shape.type == "mesh":
+                    callbacks.append(om.MPolyMessage.addPolyTopologyChangedCallback(shapeNode, mark))
+                self._owners[shapeUuid] = uuid
+            self._callbacks[uuid] = callbacks
+        # Ancestors outside the context still move the nodes under them.
+        ancestors = set(parent for uuid in uuids if scene.get(uuid) for parent in scene.get(uuid).parents)
+        while ancestors:
+            uuid = ancestors.pop()
+            if uuid not in self._callbacks and uuid not in self._ancestorCallbacks:
+                node = scene.get(uuid).dagPath.node()
+                markSubtree = partial(self.markSubtree, uuid)
+                self._ancestorCallbacks[uuid] = [
+                    om.MNodeMessage.addAttributeChangedCallback(node, markSubtree),
+                    om.MNodeMessage.addNameChangedCallback(node, markSubtree),
+                ]
+            ancestors.update(scene.get(uuid).parents)
+
+    def unwatch(self):
+        for callbacks in list(self._callbacks.values()) + list(self._ancestorCallbacks.values()):
+            for callback in callbacks:
+                om.MMessage.removeCallback(callback)
+        for callback in self._sceneCallbacks:
+            om.MMessage.removeCallback(callback)
+        self._sceneCallbacks = []
+        self._callbacks = {}
+        self._ancestorCallbacks = {}
+        self._owners = {}
+        self._subtrees.clear()
+        self.dirty.clear()
+
+    def takeDirty(self, uuids):
+        if self._subtrees:
+            scene = mcs.scene.ensure()
+            for uuid in self._subtrees:
+                if scene.get(uuid):
+                    self.dirty.update(scene.descendants(uuid))
+            self._subtrees.clear()
+        dirty = self.dirty.intersection(uuids)
+        self.dirty.difference_update(dirty)
+        return dirty
+
+
+def mergeDiagnostics(previous, updated, rechecked, nodes):
+    # Keeps the previous results of nodes that were not re-checked and still
+    # belong to the context, and adds the updated results of the re-checked ones.
+    keep = set(nodes).difference(rechecked)
+    merged = {}
+    for command, result in previous.items():
+        update = updated.get(command)
+        if result['type'] == 'nodes':
+            uuids = [uuid for uuid in result['uuids'] if uuid in keep]
+            if update:
+                uuids.extend(update['uuids'])
+        else:
+            uuids = defaultdict(mcco.ComponentSet)
+            for uuid, components in result['uuids'].items():
+                if uuid in keep:
+                    uuids[uuid] = components
+            if update:
+                uuids.update(update['uuids'])
+        merged[command] = {"type": result['type'], "uuids": uuids}
+    return merged
@@ -0,0 +1,497 @@
+import time
+from collections import defaultdict
+
+from modelChecker.modelChecker_backend import cmds, om
+import modelChecker.modelChecker_cache as mcca
+import modelChecker.modelChecker_commands as mcc
+import modelChecker.modelChecker_components as mcco
+import modelChecker.modelChecker_dedupe as mcdd
+import modelChecker.modelChecker_dirty as mcd
+import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_mesh as mcm
+import modelChecker.modelChecker_names as mcn
+import modelChecker.modelChecker_plan as mcpl
+import modelChecker.modelChecker_profile as mcp
+import modelChecker.modelChecker_registry as mcreg
+import modelChecker.modelChecker_scene as mcs
+
+# Engine
+#     Runs checks on nodes without any UI, for the modelChecker window as well
+#     as publish hooks and batch jobs. Nodes are always transform UUIDs.
+#
+#     run(checks, nodes, options) -> Diagnostics
+#         options = {
+#             "progress": callable(command, done, total), called after each check
+#             "isCancelled": callable() -> bool, polled before each check
+#             "results": callable(command, type, [(uuid, ids), ...]), called
+#                        with the failures of at most "bufferSize" meshes at
+#                        a time while the checks run; ids is empty for
+#                        "nodes" checks
+#             "bufferSize": meshes per results call, RESULT_BUFFER by default
+#             "keep": False to only stream results, Diagnostics then holds
+#                     the type of every check but no failures
+#             "profile": run every check on its own and record visit and
+#                        cmds call counts, see modelChecker_profile
+#             "cprofile": also capture a cProfile report per check
+#             "workers": threads for the NumPy kernels, "auto" for one per
+#                        core, see modelChecker_commands.setWorkers
+#             "cache": a modelChecker_cache.ResultCache, meshes it already
+#                      holds results for are not checked again
+#             "dedupe": "instances" (default) runs the 'scope': 'mesh' checks
+#                       once per shared shape, "geometry" also once per
+#                       identical mesh, False on every transform, see
+#                       modelChecker_dedupe
+#             "maxPerMesh": keep at most this many failing components of a
+#                           mesh per check, component walks stop there
+#             "maxPerCheck": stop a check once it found this many failing
+#                            components, or nodes
+#             "failFast": stop the run at the first failing component, or
+#                         node, of any check
+#             "budget": seconds, only used by recheck
+#         }
+#     Diagnostics.profile always holds the wall time of every check. In a
+#     profiled run, mesh data shared between checks is extracted by, and
+#     charged to, the first check that reads it. Diagnostics.plan is the
+#     modelChecker_plan.RunPlan the run followed. Diagnostics.cache holds the
+#     hits and misses of the "cache" option, per mesh and check.
+#     Diagnostics.truncated names the checks whose failures were cut short by
+#     the limits above, Diagnostics.aborted is True when "failFast" stopped
+#     the run. Checks after the one that failed are then missing. Limits are
+#     meant for pass or fail gating, truncated results are never cached.
+
+TYPE_MAPPING = {
+    "uv": ".map[{}]",
+    "vertex": ".vtx[{}]",
+    "edge": ".e[{}]",
+    "polygon": ".f[{}]",
+}
+
+# om.MFn component type per result type, looked up on the active backend.
+COMPONENT_TYPES = {
+    "uv": "kMeshMapComponent",
+    "vertex": "kMeshVertComponent",
+    "edge": "kMeshEdgeComponent",
+    "polygon": "kMeshPolygonComponent",
+}
+
+RECHECK_CHUNK_SIZE = 50
+RESULT_BUFFER = 64
+
+
+class Diagnostics(dict):
+    # {command: {"type": type, "uuids": errors}} for every command that ran.
+    def __init__(self, *args, **kwargs):
+        super(Diagnostics, self).__init__(*args, **kwargs)
+        self.cancelled = False
+        self.profile = {}
+        self.cache = {}
+        self.truncated = set()
+        self.aborted = False
+        self.plan = None
+
+
+class _Results(object):
+    # Collects the failures of checks into the diagnostics as they arrive and
+    # hands them on to the "results" option in bounded batches.
+    def __init__(self, diagnostics, options):
+        self.diagnostics = diagnostics
+        self.callback = options.get("results")
+        self.bufferSize = options.get("bufferSize", RESULT_BUFFER)
+        self.keep = options.get("keep", True)
+        self.buffers = {}
+        self.cached = {}
+        self.record = None
+        self.members = None
+        self.maxPerMesh = options.get("maxPerMesh")
+        self.maxPerCheck = options.get("maxPerCheck")
+        self.failFast = options.get("failFast", False)
+        self.meshCounts = defaultdict(int)
+        self.checkCounts = defaultdict(int)
+        self.full = set()
+
+    def start(self, command, type):
+        self.diagnostics[command] = {"type": type, "uuids": [] if type == "nodes" else defaultdict(mcco.ComponentSet)}
+        self.buffers[command] = []
+
+    def add(self, command, uuid, ids):
+        if self.stopped(command):
+            return
+        if self.record:
+            self.record(command, uuid, ids)
+        isNodes = self.diagnostics[command]["type"] == "nodes"
+        for member in self.members(command, uuid) if self.members else (uuid,):
+            if self.stopped(command):
+                break
+            memberIds = ids if isNodes else self._limit(command, member, ids)
+            if not isNodes and not len(memberIds):
+                continue
+            if self.keep:
+                uuids = self.diagnostics[command]["uuids"]
+                if isinstance(uuids, list):
+                    uuids.append(member)
+                else:
+                    uuids[member].extend(memberIds)
+            if self.callback:
+                self.buffers[command].append((member, memberIds))
+                if len(self.buffers[command]) >= self.bufferSize:
+                    self.flush(command)
+            self.checkCounts[command] += 1 if isNodes else len(memberIds)
+            if self.maxPerCheck is not None and self.checkCounts[command] >= self.maxPerCheck:
+                self.full.add(command)
+                self.diagnostics.truncated.add(command)
+            if self.failFast:
+                self.diagnostics.aborted = True
+                self.diagnostics.truncated.add(command)
+
+    def _limit(self, command, uuid, ids):
+        # The ids left under "maxPerMesh", "maxPerCheck" and "failFast". Mesh
+        # walks stop at the limit, so a mesh reaching it counts as truncated.
+        limit = len(ids)
+        if self.maxPerMesh is not None:
+            limit = min(limit, self.maxPerMesh - self.meshCounts[command, uuid])
+        if self.maxPerCheck is not None:
+            limit = min(limit, self.maxPerCheck - self.checkCounts[command])
+        if self.failFast:
+            limit = min(limit, 1)
+        if limit < len(ids):
+            self.diagnostics.truncated.add(command)
+            if isinstance(ids, mcco.ComponentSet):
+                ids = ids.toArray() if mcco.HAS_NUMPY else list(ids)
+            ids = ids[:max(limit, 0)]
+        if self.maxPerMesh is not None:
+            self.meshCounts[command, uuid] += len(ids)
+            if self.meshCounts[command, uuid] >= self.maxPerMesh:
+                self.diagnostics.truncated.add(command)
+        return ids
+
+    def remaining(self, command):
+        # Failures of one mesh a check still keeps, None without limits.
+        limits = []
+        if self.maxPerMesh is not None:
+            limits.append(self.maxPerMesh)
+        if self.maxPerCheck is not None:
+            limits.append(self.maxPerCheck - self.checkCounts[command])
+        if self.failFast:
+            limits.append(1)
+        return min(limits) if limits else None
+
+    def stopped(self, command=None):
+        # True once a check, or with "failFast" the run, needs no more results.
+        return self.diagnostics.aborted or command in self.full
+
+    def flush(self, command):
+        if self.buffers[command]:
+            self.callback(command, self.diagnostics[command]["type"], self.buffers[command])
+            self.buffers[command] = []
+
+    def replay(self, command):
+        # Failures answered by the result cache, for meshes the check skipped.
+        for uuid, components in self.cached.get(command, ()):
+            self.add(command, uuid, components)
+
+    def collect(self, command, type, errors):
+        # Takes the return value of a check, consuming streamed results.
+        self.start(command, type)
+        if type == "nodes":
+            errors = ((uuid, []) for uuid in errors)
+        elif isinstance(errors, dict):
+            errors = errors.items()
+        for uuid, ids in errors:
+            self.add(command, uuid, ids)
+            if self.stopped(command):
+                break
+        self.replay(command)
+        self.flush(command)
+
+
+def _hasLimits(options):
+    return (options.get("maxPerMesh") is not None or options.get("maxPerCheck") is not None
+            or options.get("failFast", False))
+
+
+def _limitResults(merged, checks, options):
+    # Diagnostics with the merged results of checks under the limits of
+    # options, as if they came from a single run.
+    diagnostics = Diagnostics()
+    results = _Results(diagnostics, dict(options, results=None))
+    for command in checks:
+        if results.stopped():
+            break
+        if command not in merged:
+            continue
+        type, uuids = merged[command]["type"], merged[command]["uuids"]
+        results.start(command, type)
+        for uuid in uuids:
+            results.add(command, uuid, [] if type == "nodes" else uuids[uuid])
+            if results.stopped(command):
+                break
+    return diagnostics
+
+
+def _hasFailures(merged):
+    return any(len(errors["uuids"]) for errors in merged.values())
+
+
+def allNodes():
+    return mcs.scene.ensure().transforms()
+
+
+def hierarchy(nodes):
+    hierachy = set()
+    scene = mcs.scene.ensure()
+    for node in nodes:
+        if scene.get(node):
+            descendants = scene.descendants(node)
+            hierachy.update(uuid for uuid in descendants if scene.get(uuid).isTransform)
+        hierachy.add(node)
+    return list(hierachy)
+
+
+def existingNodes(nodes):
+    mcn.names.resolve(nodes)
+    return [node for node in nodes if mcn.names.exists(node)]
+
+
+def run(checks, nodes=None, options=None):
+    options = options or {}
+    progress = options.get("progress")
+    isCancelled = options.get("isCancelled")
+    diagnostics = Diagnostics()
+    mcreg.loadPlugins()
+
+    scene = mcs.scene.ensure()
+    if nodes is None:
+        nodes = scene.transforms()
+    nodes = existingNodes(nodes)
+    # Checks that declare no mesh data get an empty selection.
+    SLMesh = om.MSelectionList()
+    if mcreg.needsMeshes(checks):
+        for node in nodes:
+            if scene.meshShapes(node):
+                SLMesh.add(scene.get(node).dagPath)
+
+    results = _Results(diagnostics, options)
+    detailed = options.get("profile") or options.get("cprofile")
+    with mcm.snapshotCache(), mcc.kernelWorkers(options.get("workers")):
+        if isCancelled and isCancelled():
+            diagnostics.cancelled = True
+            return diagnostics
+        groups = mcdd.MeshGroups(nodes, SLMesh, checks, options.get("dedupe", "instances"))
+        results.members = groups.members
+        cacheable = [command for command in checks if command in mcca.CACHEABLE]
+        cachePlan = None
+        if options.get("cache") and cacheable:
+            cachePlan = mcca.CachePlan(options["cache"], cacheable, groups.meshes(cacheable[0])[1])
+            results.cached = cachePlan.hits
+            results.record = cachePlan.record
+
+        def meshesFor(command):
+            # (nodes, SLMesh) a check runs on.
+            meshNodes, meshes = groups.meshes(command)
+            if cachePlan and command in cachePlan.missing:
+                meshes = cachePlan.missing[command]
+            return meshNodes, meshes
+
+        fused = {}
+        if not detailed:
+            fused = mcc.meshCheckTypes([command for command in checks if mcreg.builtin(command)])
+        runPlan = diagnostics.plan = mcpl.RunPlan(checks, fused)
+        done = [0]
+
+        def reportDone(command):
+            done[0] += 1
+            if progress:
+                progress(command, done[0], len(checks))
+
+        def runChecks(commands):
+            for command in commands:
+                if results.stopped():
+                    return
+                if isCancelled and isCancelled():
+                    diagnostics.cancelled = True
+                    return
+                if detailed:
+                    with mcp.profiled(diagnostics.profile, command, nodes, options.get("cprofile")):
+                        results.collect(command, *mcreg.getCheck(command)(*meshesFor(command)))
+                else:
+                    start = time.time()
+                    results.collect(command, *mcreg.getCheck(command)(*meshesFor(command)))
+                    diagnostics.profile[command] = {"seconds": time.time() - start}
+                reportDone(command)
+
+        runChecks(runPlan.before)
+        if fused and not (results.stopped() or diagnostics.cancelled):
+            start = time.time()
+            for command, type in fused.items():
+                results.start(command, type)
+            # One fused pass per set of meshes, checks sharing it share the walks.
+            passes = []
+            for command in fused:
+                meshes = meshesFor(command)[1]
+                for passMeshes, passChecks in passes:
+                    if passMeshes is meshes:
+                        passChecks.append(command)
+                        break
+                else:
+                    passes.append((meshes, [command]))
+            for meshes, passChecks in passes:
+                runPlan.addPass(meshes, mcc.MeshPlan(passChecks))
+            for index, (meshes, meshPlan) in enumerate(runPlan.passes):
+                passChecks = passes[index][1]
+                for command, uuid, ids in mcc.iterMeshChecks(passChecks, meshes, results.stopped, meshPlan, results.remaining):
+                    results.add(command, uuid, ids)
+                    if results.stopped() or all(results.stopped(command) for command in passChecks):
+                        break
+                if results.stopped():
+                    # The other checks of the pass stopped with it.
+                    for _, stoppedChecks in passes[index:]:
+                        diagnostics.truncated.update(stoppedChecks)
+                    break
+            for command in fused:
+                results.replay(command)
+                results.flush(command)
+            seconds = time.time() - start
+            for command in fused:
+                diagnostics.profile[command] = {"seconds": seconds, "shared": len(fused) > 1}
+                reportDone(command)
+        if not diagnostics.cancelled:
+            runChecks(runPlan.after)
+        if cachePlan:
+            cachePlan.store(dict((command, diagnostics[command]["type"]) for command in cachePlan.commands
+                                 if command in diagnostics and command not in diagnostics.truncated))
+            diagnostics.cache = cachePlan.stats
+    SLMesh.clear()
+    return diagnostics
+
+
+def recheck(previous, checkedNodes, checks, nodes, dirty, options=None):
+    # Checks without previous results, with truncated ones, and context scoped
+    # ones, run on every node. The rest only re-check dirty nodes and nodes new
+    # to the context and are merged into the previous results. Returns the
+    # diagnostics and the dirty nodes left over when the "budget" option ran
+    # out, the run was cancelled or "failFast" stopped it.
+    options = options or {}
+    budget = options.get("budget")
+    checkedNodes = set(checkedNodes)
+    truncated = getattr(previous, "truncated", ())
+    full = [command for command in checks
+            if command not in previous or command in truncated
+            or mcl.mcCommandsList[command].get('scope') == 'context']
+    incremental = [command for command in checks if command not in full]
+    dirtyNodes = [node for node in nodes if node in dirty or node not in checkedNodes]
+
+    diagnostics = run(full, nodes, options) if full else Diagnostics()
+    pending = []
+    chunkOptions = dict((key, value) for key, value in options.items() if key != "progress")
+    if incremental and not diagnostics.cancelled and not diagnostics.aborted:
+        current = mcd.mergeDiagnostics(
+            dict((command, previous[command]) for command in incremental), {}, [], nodes)
+        start = time.time()
+        chunkStarts = range(0, len(dirtyNodes), RECHECK_CHUNK_SIZE)
+        kept = mcd.mergeDiagnostics(current, {}, dirtyNodes, nodes)
+        if options.get("failFast") and _hasFailures(kept):
+            # A kept failure already fails the run, dirty nodes wait for the next.
+            diagnostics.aborted = True
+            current, pending, chunkStarts = kept, dirtyNodes, []
+        for chunkStart in chunkStarts:
+            if budget is not None and chunkStart and time.time() - start > budget:
+                pending = dirtyNodes[chunkStart:]
+                break
+            chunk = dirtyNodes[chunkStart:chunkStart + RECHECK_CHUNK_SIZE]
+            chunkDiagnostics = run(incremental, chunk, chunkOptions)
+            if chunkDiagnostics.cancelled:
+                # The chunk holds no results, its nodes keep their previous ones.
+                diagnostics.cancelled = True
+                pending = dirtyNodes[chunkStart:]
+                break
+            mcp.mergeProfiles(diagnostics.profile, chunkDiagnostics.profile)
+            diagnostics.truncated.update(chunkDiagnostics.truncated)
+            for key, count in chunkDiagnostics.cache.items():
+                diagnostics.cache[key] = diagnostics.cache.get(key, 0) + count
+            current = mcd.mergeDiagnostics(current, chunkDiagnostics, chunk, nodes)
+            if chunkDiagnostics.aborted:
+                # Checks the chunk did not get to are checked again next time.
+                diagnostics.aborted = True
+                pending = dirtyNodes[chunkStart:]
+                break
+        if _hasLimits(options):
+            # Chunks only count their own failures, the caps apply to the merge.
+            current = _limitResults(current, incremental, options)
+            diagnostics.truncated.update(current.truncated)
+            diagnostics.aborted = diagnostics.aborted or current.aborted
+        diagnostics.update(current)
+    return diagnostics, pending
+
+
+def parseErrors(errors):
+    uuids = errors['uuids']
+    type = errors['type']
+
+    if type == 'nodes':
+        nodes = []
+        for node in uuids:
+            curNode = mcn.names.name(node)
+            if curNode:
+                nodes.append(curNode)
+        return nodes
+
+    # Components come out as ranges, "pCube1.f[0:99]", one per run of ids.
+    outputErrors = []
+    for uuid in uuids:
+        nodeName = mcn.names.name(uuid)
+        if nodeName:
+            components = uuids[uuid]
+            if not isinstance(components, mcco.ComponentSet):
+                components = mcco.ComponentSet(components)
+            for component in components.formatRuns():
+                outputErrors.append(nodeName + TYPE_MAPPING[type].format(component))
+    return outputErrors
+
+
+def shapePath(uuid):
+    # The first visible mesh shape under the transform's own path, so that
+    # instances select their own copy rather than the first path of the shape.
+    dagNode = mcs.scene.ensure().get(uuid)
+    if not dagNode:
+        return None
+    transformPath = dagNode.dagPath
+    for index in range(transformPath.childCount()):
+        child = transformPath.child(index)
+        if child.hasFn(om.MFn.kMesh) and not om.MFnDagNode(child).isIntermediateObject:
+            path = om.MDagPath(transformPath)
+            path.push(child)
+            return path
+    return None
+
+
+def selectionList(errors):
+    # One indexed component per mesh, built from the stored ids instead of a
+    # "pCube1.f[0:99]" string per run for cmds.select to parse.
+    componentType = getattr(om.MFn, COMPONENT_TYPES[errors['type']])
+    selection = om.MSelectionList()
+    for uuid, components in errors['uuids'].items():
+        path = shapePath(uuid) if len(components) else None
+        if path is None:
+            continue
+        if not isinstance(components, mcco.ComponentSet):
+            components = mcco.ComponentSet(components)
+        ids = components.toArray().tolist() if mcco.HAS_NUMPY else list(components)
+        fnComponent = om.MFnSingleIndexedComponent()
+        component = fnComponent.create(componentType)
+        fnComponent.addElements(ids)
+        selection.add((path, component))
+    return selection
+
+
+def selectErrors(errors):
+    if errors['type'] == 'nodes':
+        cmds.select(parseErrors(errors))
+        return
+    om.MGlobal.setActiveSelectionList(selectionList(errors))
+
+
+def countComponents(errors):
+    # Failing components per node UUID, 1 for every node of a "nodes" check.
+    if errors['type'] == 'nodes':
+        return dict((uuid, 1) for uuid in errors['uuids'])
+    return dict((uuid, len(components)) for uuid, components in errors['uuids'].items() if len(components))
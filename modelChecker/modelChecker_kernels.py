@@ -0,0 +1,211 @@
+import numpy as np
+
+# Vectorized check kernels
+#     Kernels work on bulk mesh arrays (as returned by MFnMesh) and return the
+#     failing component indices as an int array. They never touch Maya.
+#     truncate and edgeFaceCounts compute intermediates that several kernels
+#     read, see INTERMEDIATES in modelChecker_commands.
+
+
+def triangles(polygonCounts):
+    return np.nonzero(polygonCounts == 3)[0]
+
+
+def ngons(polygonCounts):
+    return np.nonzero(polygonCounts > 4)[0]
+
+
+def uvRange(us, vs):
+    return np.nonzero((us < 0) | (us > 10) | (vs < 0))[0]
+
+
+def truncate(values):
+    return np.trunc(values)
+
+
+def onBorder(us, vs, uTruncated, vTruncated):
+    onU = np.abs(uTruncated - us) < 0.00001
+    onV = np.abs(vTruncated - vs) < 0.00001
+    return np.nonzero(onU | onV)[0]
+
+
+def _uvTiles(values, truncated):
+    # Same tile numbering as the per-face loop: int(x) above zero, int(x) - 1 otherwise.
+    return np.where(values > 0, truncated, truncated - 1)
+
+
+def edgeFaceCounts(polygonCounts, polygonConnects, edges):
+    # Distinct faces per edge id, as MItMeshEdge.numConnectedFaces counts
+    # them. Every face corner is matched to the edge to the next corner.
+    numEdges = len(edges) // 2
+    if not numEdges or not len(polygonConnects):
+        return np.zeros(numEdges, dtype=np.int64)
+    mapped = polygonCounts > 0
+    offsets = np.cumsum(polygonCounts) - polygonCounts
+    faceOf = np.repeat(np.arange(len(polygonCounts), dtype=np.int64), polygonCounts)
+    nextCorner = np.arange(1, len(polygonConnects) + 1)
+    nextCorner[offsets[mapped] + polygonCounts[mapped] - 1] = offsets[mapped]
+    start = polygonConnects.astype(np.int64)
+    end = start[nextCorner]
+    pairs = edges.reshape(-1, 2).astype(np.int64)
+    width = int(max(pairs.max(), start.max())) + 1
+    edgeKeys = np.minimum(pairs[:, 0], pairs[:, 1]) * width + np.maximum(pairs[:, 0], pairs[:, 1])
+    order = np.argsort(edgeKeys, kind="mergesort")
+    sortedKeys = edgeKeys[order]
+    cornerKeys = np.minimum(start, end) * width + np.maximum(start, end)
+    position = np.minimum(np.searchsorted(sortedKeys, cornerKeys), numEdges - 1)
+    found = sortedKeys[position] == cornerKeys
+    # A face using an edge twice still counts once.
+    faceEdges = np.sort(faceOf[found] * numEdges + order[position[found]])
+    distinct = np.ones(len(faceEdges), dtype=bool)
+    distinct[1:] = faceEdges[1:] != faceEdges[:-1]
+    return np.bincount(faceEdges[distinct] % numEdges, minlength=numEdges)
+
+
+def openEdges(edgeFaceCounts):
+    return np.nonzero(edgeFaceCounts < 2)[0]
+
+
+def noneManifoldEdges(edgeFaceCounts):
+    return np.nonzero(edgeFaceCounts > 2)[0]
+
+
+def crossBorder(uvCounts, uvIds, us, vs, uTruncated, vTruncated):
+    # Faces without UVs have no segment in uvIds and are never reported.
+    mapped = np.nonzero(uvCounts)[0]
+    if not len(mapped):
+        return mapped
+    offsets = (np.cumsum(uvCounts) - uvCounts)[mapped]
+    crossing = np.zeros(len(mapped), dtype=bool)
+    for tiles in (_uvTiles(us, uTruncated)[uvIds], _uvTiles(vs, vTruncated)[uvIds]):
+        crossing |= np.maximum.reduceat(tiles, offsets) != np.minimum.reduceat(tiles, offsets)
+    return mapped[crossing]
+
+
+# UV overlap
+#     Faces are split into UV triangle fans. A uniform grid with cells about
+#     the size of a typical triangle pairs up triangles whose bounding boxes
+#     share a cell, and each pair is only tested in the cell holding the
+#     corner of the intersection of their boxes, so no pair is tested twice.
+#     The separating axis test then runs on every candidate pair at once.
+#     Triangles that only touch along an edge or at a vertex do not overlap.
+#     Overlaps thinner than OVERLAP_TOLERANCE cells count as touching.
+OVERLAP_CELLS_PER_TRIANGLE = 4
+OVERLAP_TOLERANCE = 1e-6
+OVERLAP_PAIR_CHUNK = 1 << 18
+
+
+def _uvTriangles(uvCounts, uvIds):
+    # (face, uvId, uvId, uvId) of the fan triangles of every face with UVs.
+    counts = uvCounts.astype(np.int64)
+    fans = np.maximum(counts - 2, 0)
+    faces = np.repeat(np.arange(len(counts)), fans)
+    first = np.repeat(np.cumsum(counts) - counts, fans)
+    step = np.arange(len(faces)) - np.repeat(np.cumsum(fans) - fans, fans) + 1
+    return faces, uvIds[first], uvIds[first + step], uvIds[first + step + 1]
+
+
+def _outside(normalUs, normalVs, offsets, us, vs, tolerance):
+    # True where all three corners (us, vs) of the other triangle lie beyond
+    # one of the outward edge lines of the first. Columns are spelled out,
+    # numpy reduces poorly over axes of length three.
+    outside = np.zeros(len(us), dtype=bool)
+    for edge in range(3):
+        normalU, normalV = normalUs[:, edge], normalVs[:, edge]
+        nearest = np.minimum(np.minimum(normalU * us[:, 0] + normalV * vs[:, 0],
+                                        normalU * us[:, 1] + normalV * vs[:, 1]),
+                             normalU * us[:, 2] + normalV * vs[:, 2])
+        outside |= nearest >= offsets[:, edge] - tolerance
+    return outside
+
+
+def _cellPairs(keys, entries):
+    # (key, entry, entry) of every pair of entries that share a key, keys sorted.
+    starts = np.concatenate(([0], np.nonzero(np.diff(keys))[0] + 1))
+    ends = np.append(starts[1:], len(keys))
+    groupEnds = np.repeat(ends, ends - starts)
+    counts = groupEnds - np.arange(len(keys)) - 1
+    first = np.repeat(np.arange(len(keys)), counts)
+    second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return keys[first], entries[first], entries[second]
+
+
+def uvOverlap(uvCounts, uvIds, us, vs):
+    faces, uv0, uv1, uv2 = _uvTriangles(uvCounts, uvIds)
+    corners = np.stack((uv0, uv1, uv2), axis=1)
+    triangleUs, triangleVs = us[corners], vs[corners]
+    signedAreas = ((triangleUs[:, 1] - triangleUs[:, 0]) * (triangleVs[:, 2] - triangleVs[:, 0])
+                   - (triangleUs[:, 2] - triangleUs[:, 0]) * (triangleVs[:, 1] - triangleVs[:, 0]))
+    valid = np.nonzero(np.abs(signedAreas) > 1e-12)[0]
+    if len(valid) < 2:
+        return np.zeros(0, dtype=np.int64)
+    faces, triangleUs, triangleVs = faces[valid], triangleUs[valid], triangleVs[valid]
+
+    # Counter-clockwise corners, so that every edge normal points outwards.
+    clockwise = signedAreas[valid] < 0
+    triangleUs[clockwise] = triangleUs[clockwise][:, ::-1]
+    triangleVs[clockwise] = triangleVs[clockwise][:, ::-1]
+    edgeUs = triangleUs[:, [1, 2, 0]] - triangleUs
+    edgeVs = triangleVs[:, [1, 2, 0]] - triangleVs
+    lengths = np.hypot(edgeUs, edgeVs)
+    normalUs, normalVs = edgeVs / lengths, -edgeUs / lengths
+    offsets = normalUs * triangleUs + normalVs * triangleVs
+    lowUs, lowVs = triangleUs.min(axis=1), triangleVs.min(axis=1)
+    highUs, highVs = triangleUs.max(axis=1), triangleVs.max(axis=1)
+
+    low, high = np.stack((lowUs, lowVs), axis=1), np.stack((highUs, highVs), axis=1)
+    cell = float(np.median((high - low).max(axis=1)))
+    origin = low.min(axis=0)
+    while True:
+        # Boxes only touching a cell stay out of it, so that a layout snapped
+        # to the grid does not spill into the neighbouring cells.
+        lowCells = np.floor((low - origin) / cell + OVERLAP_TOLERANCE).astype(np.int64)
+        highCells = np.maximum(np.ceil((high - origin) / cell - OVERLAP_TOLERANCE).astype(np.int64) - 1, lowCells)
+        spans = highCells - lowCells + 1
+        numCells = spans[:, 0] * spans[:, 1]
+        if numCells.sum() <= OVERLAP_CELLS_PER_TRIANGLE * len(faces):
+            break
+        cell *= 2.0
+    tolerance = cell * OVERLAP_TOLERANCE
+
+    # One (cell, triangle) entry per cell a bounding box covers.
+    entries = np.repeat(np.arange(len(faces)), numCells)
+    local = np.arange(len(entries)) - np.repeat(np.cumsum(numCells) - numCells, numCells)
+    cellUs = lowCells[entries, 0] + local // spans[entries, 1]
+    cellVs = lowCells[entries, 1] + local % spans[entries, 1]
+    rows = int(highCells[:, 1].max()) + 1
+    keys = cellUs * rows + cellVs
+    order = np.argsort(keys, kind='stable')
+    keys, entries = keys[order], entries[order]
+
+    # Pairs come out in chunks of whole cells to bound their memory.
+    overlapping = []
+    cellStarts = np.concatenate(([0], np.nonzero(np.diff(keys))[0] + 1, [len(keys)]))
+    sizes = np.diff(cellStarts)
+    pairCounts = np.cumsum(sizes * (sizes - 1) // 2)
+    start = 0
+    while start < len(sizes):
+        done = pairCounts[start - 1] if start else 0
+        stop = max(int(np.searchsorted(pairCounts, done + OVERLAP_PAIR_CHUNK, 'right')), start + 1)
+        begin, end = cellStarts[start], cellStarts[stop]
+        start = stop
+        pairKeys, a, b = _cellPairs(keys[begin:end], entries[begin:end])
+        cornerUs = np.maximum(lowUs[a], lowUs[b])
+        cornerVs = np.maximum(lowVs[a], lowVs[b])
+        keep = ((faces[a] != faces[b])
+                & (np.minimum(highUs[a], highUs[b]) > cornerUs)
+                & (np.minimum(highVs[a], highVs[b]) > cornerVs))
+        a, b, pairKeys = a[keep], b[keep], pairKeys[keep]
+        cornerKeys = (np.floor((cornerUs[keep] - origin[0]) / cell + OVERLAP_TOLERANCE).astype(np.int64) * rows
+                      + np.floor((cornerVs[keep] - origin[1]) / cell + OVERLAP_TOLERANCE).astype(np.int64))
+        keep = cornerKeys == pairKeys
+        a, b = a[keep], b[keep]
+        keep = ~_outside(normalUs[a], normalVs[a], offsets[a], triangleUs[b], triangleVs[b], tolerance)
+        a, b = a[keep], b[keep]
+        keep = ~_outside(normalUs[b], normalVs[b], offsets[b], triangleUs[a], triangleVs[a], tolerance)
+        a, b = a[keep], b[keep]
+        overlapping.append(faces[a])
+        overlapping.append(faces[b])
+    if not overlapping:
+        return np.zeros(0, dtype=np.int64)
+    return np.unique(np.concatenate(overlapping))
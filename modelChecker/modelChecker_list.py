@@ -1,106 +1,207 @@
+# 'scope': 'context' marks checks whose result for a node depends on the other
+# nodes of the context. Incremental runs always re-check them on every node.
+# 'scope': 'mesh' marks checks whose result for a node only depends on its mesh
+# shapes, so instances and copies of a mesh can share it.
+# 'type' is the result type, 'cost' how much work a check does per node and
+# 'needs' the scene data it reads, see modelChecker_registry.
 mcCommandsList = {
     "trailingNumbers": {
         'label': 'Trailing Numbers',
         'category': 'naming',
+        'type': 'nodes',
+        'cost': 'cheap',
+        'needs': ('names',),
     },
     "duplicatedNames": {
         'label': 'Duplicated Names',
         'category': 'naming',
+        'scope': 'context',
+        'type': 'nodes',
+        'cost': 'cheap',
+        'needs': ('names',),
     },
     "shapeNames":{
         'label': 'Shape Names',
         'category': 'naming',
+        'type': 'nodes',
+        'cost': 'cheap',
+        'needs': ('names', 'hierarchy'),
     },
     "namespaces": {
         'label': 'Namespaces',
         'category': 'naming',
+        'type': 'nodes',
+        'cost': 'cheap',
+        'needs': ('names',),
     },
     "layers": {
         'label': 'Layers',
-        'category': 'general',  
+        'category': 'general',
+        'type': 'nodes',
+        'cost': 'cheap',
+        'needs': ('layers',),
     },
     "history": {
         'label': 'History',
         'category': 'general',
+        'type': 'nodes',
+        'cost': 'moderate',
+        'needs': ('hierarchy', 'history'),
     },
     "shaders": {
         'label': 'Shaders',
         'category': 'general',
+        'type': 'nodes',
+        'cost': 'moderate',
+        'needs': ('hierarchy', 'shaders'),
     },
     "unfrozenTransforms": {
         'label': 'Unfrozen Transforms',
         'category': 'general',
+        'type': 'nodes',
+        'cost': 'cheap',
+        'needs': ('transforms',),
     },
     "uncenteredPivots": {
         'label': 'Uncentered Pivots',
         'category': 'general',
+        'type': 'nodes',
+        'cost': 'cheap',
+        'needs': ('transforms',),
     },
     "parentGeometry": {
         'label': 'Parent Geometry',
         'category': 'general',
+        'scope': 'context',
+        'type': 'nodes',
+        'cost': 'cheap',
+        'needs': ('hierarchy',),
     },
     "emptyGroups": {
         'label': 'Empty Groups',
         'category': 'general',
+        'type': 'nodes',
+        'cost': 'cheap',
+        'needs': ('hierarchy',),
     },
     "triangles": {
         'label': 'Triangles',
         'category': 'topology',
+        'scope': 'mesh',
+        'type': 'polygon',
+        'cost': 'moderate',
+        'needs': ('faces',),
     },
     "ngons": {
         'label': 'Ngons',
         'category': 'topology',
+        'scope': 'mesh',
+        'type': 'polygon',
+        'cost': 'moderate',
+        'needs': ('faces',),
     },
     "openEdges": {
         'label': 'Open Edges',
         'category': 'topology',
+        'scope': 'mesh',
+        'type': 'edge',
+        'cost': 'moderate',
+        'needs': ('edges',),
     },
     "poles":{
         'label': 'Poles',
         'category': 'topology',
+        'scope': 'mesh',
+        'type': 'vertex',
+        'cost': 'moderate',
+        'needs': ('faces',),
     },
     "hardEdges": {
         'label': 'Hard Edges',
         'category': 'topology',
+        'scope': 'mesh',
+        'type': 'edge',
+        'cost': 'moderate',
+        'needs': ('edges',),
     },
     "lamina": {
         'label': 'Lamina',
-        'category': 'topology',  
+        'category': 'topology',
+        'scope': 'mesh',
+        'type': 'polygon',
+        'cost': 'moderate',
+        'needs': ('faces',),
     },
     "zeroAreaFaces":{
         'label': 'Zero Area Faces',
         'category': 'topology',
+        'scope': 'mesh',
+        'type': 'polygon',
+        'cost': 'moderate',
+        'needs': ('faces', 'points'),
     },
     "zeroLengthEdges":{
         'label': 'Zero Length Edges',
         'category': 'topology',
+        'scope': 'mesh',
+        'type': 'edge',
+        'cost': 'moderate',
+        'needs': ('edges', 'points'),
     },
     "noneManifoldEdges":{
         'label': 'None Manifold Edges',
         'category': 'topology',
+        'scope': 'mesh',
+        'type': 'edge',
+        'cost': 'moderate',
+        'needs': ('edges',),
     },
     "starlike": {
         'label': 'Starlike',
         'category': 'topology',
+        'scope': 'mesh',
+        'type': 'polygon',
+        'cost': 'moderate',
+        'needs': ('faces', 'points'),
     },
     "selfPenetratingUVs":{
         'label': 'Self Penetrating UVs',
         'category': 'UVs',
+        'scope': 'mesh',
+        'type': 'polygon',
+        'cost': 'expensive',
+        'needs': ('faces', 'uvs'),
     },
     "missingUVs":{
         'label': 'Missing UVs',
         'category': 'UVs',
+        'scope': 'mesh',
+        'type': 'polygon',
+        'cost': 'moderate',
+        'needs': ('faces', 'uvs'),
     },
     "uvRange":{
         'label': 'UV Range',
         'category': 'UVs',
+        'scope': 'mesh',
+        'type': 'uv',
+        'cost': 'moderate',
+        'needs': ('uvs',),
     },
     "crossBorder":{
         'label': 'Cross Border',
         'category': 'UVs',
+        'scope': 'mesh',
+        'type': 'polygon',
+        'cost': 'moderate',
+        'needs': ('faces', 'uvs'),
     },
     "onBorder": {
         'label': 'On Border',
-        'category': 'UVs',   
+        'category': 'UVs',
+        'scope': 'mesh',
+        'type': 'uv',
+        'cost': 'moderate',
+        'needs': ('uvs',),
     }
 }
@@ -0,0 +1,183 @@
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager
+
+from modelChecker.modelChecker_backend import om
+
+# Mesh Snapshot
+#     Holds the bulk data of one mesh, keyed by the UUID of the node in the
+#     selection list. Every buffer is extracted from MFnMesh the first time it
+#     is read and kept as a flat array:
+#         points          -> 'd' [x0, y0, z0, x1, ...]
+#         polygonCounts   -> 'i' [... vertices per face]
+#         polygonConnects -> 'i' [... vertex ids, face after face]
+#         edges           -> 'i' [v0, v1, v0, v1, ...] in edge id order
+#         us, vs          -> 'd' [... uv coordinates]
+#         uvCounts        -> 'i' [... uvs per face]
+#         uvIds           -> 'i' [... uv ids, face after face]
+#     UV sets other than the current one are read with uvSet(name), which
+#     returns the same four UV buffers for that set.
+
+
+class MeshSnapshot(object):
+    __slots__ = (
+        "dagPath",
+        "uuid",
+        "_points",
+        "_polygonCounts",
+        "_polygonConnects",
+        "_edges",
+        "_us",
+        "_vs",
+        "_uvCounts",
+        "_uvIds",
+        "_uvSetNames",
+        "_uvSets",
+    )
+
+    def __init__(self, dagPath, uuid):
+        self.dagPath = dagPath
+        self.uuid = uuid
+        self._points = None
+        self._polygonCounts = None
+        self._polygonConnects = None
+        self._edges = None
+        self._us = None
+        self._vs = None
+        self._uvCounts = None
+        self._uvIds = None
+        self._uvSetNames = None
+        self._uvSets = {}
+
+    def _mesh(self):
+        return om.MFnMesh(self.dagPath)
+
+    @property
+    def points(self):
+        if self._points is None:
+            points = array('d')
+            for point in self._mesh().getPoints():
+                points.extend((point.x, point.y, point.z))
+            self._points = points
+        return self._points
+
+    def _loadPolygons(self):
+        polygonCounts, polygonConnects = self._mesh().getVertices()
+        self._polygonCounts = array('i', polygonCounts)
+        self._polygonConnects = array('i', polygonConnects)
+
+    @property
+    def polygonCounts(self):
+        if self._polygonCounts is None:
+            self._loadPolygons()
+        return self._polygonCounts
+
+    @property
+    def polygonConnects(self):
+        if self._polygonConnects is None:
+            self._loadPolygons()
+        return self._polygonConnects
+
+    @property
+    def edges(self):
+        if self._edges is None:
+            mesh = self._mesh()
+            edges = array('i')
+            for edgeId in range(mesh.numEdges):
+                edges.extend(mesh.getEdgeVertices(edgeId))
+            self._edges = edges
+        return self._edges
+
+    def _loadUVs(self):
+        us, vs = self._mesh().getUVs()
+        self._us = array('d', us)
+        self._vs = array('d', vs)
+
+    @property
+    def us(self):
+        if self._us is None:
+            self._loadUVs()
+        return self._us
+
+    @property
+    def vs(self):
+        if self._vs is None:
+            self._loadUVs()
+        return self._vs
+
+    def _loadUVAssignments(self):
+        uvCounts, uvIds = self._mesh().getAssignedUVs()
+        self._uvCounts = array('i', uvCounts)
+        self._uvIds = array('i', uvIds)
+
+    @property
+    def uvCounts(self):
+        if self._uvCounts is None:
+            self._loadUVAssignments()
+        return self._uvCounts
+
+    @property
+    def uvIds(self):
+        if self._uvIds is None:
+            self._loadUVAssignments()
+        return self._uvIds
+
+    @property
+    def uvSetNames(self):
+        if self._uvSetNames is None:
+            self._uvSetNames = list(self._mesh().getUVSetNames())
+        return self._uvSetNames
+
+    def uvSet(self, name):
+        # (uvCounts, uvIds, us, vs) of one UV set.
+        if name not in self._uvSets:
+            mesh = self._mesh()
+            us, vs = mesh.getUVs(name)
+            uvCounts, uvIds = mesh.getAssignedUVs(name)
+            self._uvSets[name] = (array('i', uvCounts), array('i', uvIds), array('d', us), array('d', vs))
+        return self._uvSets[name]
+
+
+# Visit counters
+#     Checks add the number of meshes and components they process, so that a
+#     profiled run can report them per check. See modelChecker_profile.
+visits = defaultdict(int)
+
+
+def countVisits(kind, count=1):
+    visits[kind] += count
+
+
+# Snapshots are only shared inside a snapshotCache() block. Outside of one,
+# every lookup extracts fresh data so edits between runs are never missed.
+_cache = None
+
+
+@contextmanager
+def snapshotCache():
+    global _cache
+    outer = _cache
+    if outer is None:
+        _cache = {}
+    try:
+        yield _cache
+    finally:
+        _cache = outer
+
+
+def getSnapshot(dagPath):
+    uuid = om.MFnDependencyNode(dagPath.node()).uuid().asString()
+    if _cache is None:
+        return MeshSnapshot(dagPath, uuid)
+    snapshot = _cache.get(uuid)
+    if snapshot is None:
+        snapshot = _cache[uuid] = MeshSnapshot(dagPath, uuid)
+    return snapshot
+
+
+def iterSnapshots(SLMesh):
+    selIt = om.MItSelectionList(SLMesh)
+    while not selIt.isDone():
+        countVisits("meshes")
+        yield getSnapshot(selIt.getDagPath())
+        selIt.next()
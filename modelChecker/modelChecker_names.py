@@ -0,0 +1,85 @@
+import modelChecker.modelChecker_backend as mcb
+from modelChecker.modelChecker_backend import cmds, om
+
+# Name Index
+#     Resolves node UUIDs to names in bulk and serves them from memory:
+#         name      -> shortest unique name, as cmds.ls(uuid) returns it
+#         longName  -> full DAG path
+#         shortName -> leaf name without parents
+#     The index is cleared whenever a node is added, removed, renamed or
+#     reparented, so cached names never outlive a scene edit.
+
+
+class NameIndex(object):
+    def __init__(self):
+        self._names = {}
+        self._callbacks = []
+
+    def clear(self, *args):
+        self._names.clear()
+
+    def watch(self):
+        if self._callbacks:
+            return
+        self._callbacks = [
+            om.MNodeMessage.addNameChangedCallback(om.MObject(), self.clear),
+            om.MDGMessage.addNodeAddedCallback(self.clear, "dependNode"),
+            om.MDGMessage.addNodeRemovedCallback(self.clear, "dependNode"),
+            om.MDagMessage.addAllDagChangesCallback(self.clear),
+        ]
+
+    def unwatch(self):
+        for callback in self._callbacks:
+            om.MMessage.removeCallback(callback)
+        self._callbacks = []
+
+    def add(self, uuid, name, longName):
+        if self._names.get(uuid) is None:
+            self._names[uuid] = (name, longName)
+
+    def _store(self, longNames):
+        if not longNames:
+            return
+        uuids = cmds.ls(longNames, uuid=True)
+        names = cmds.ls(longNames)
+        for uuid, longName, name in zip(uuids, longNames, names):
+            # Instanced nodes resolve to several paths, the first one wins.
+            self.add(uuid, name, longName)
+
+    def resolve(self, uuids):
+        self.watch()
+        missing = [uuid for uuid in uuids if uuid not in self._names]
+        if missing:
+            for uuid in missing:
+                self._names[uuid] = None
+            self._store(cmds.ls(missing, long=True))
+
+    def _entry(self, uuid):
+        if uuid not in self._names:
+            self.resolve([uuid])
+        return self._names[uuid]
+
+    def exists(self, uuid):
+        return self._entry(uuid) is not None
+
+    def name(self, uuid):
+        entry = self._entry(uuid)
+        if entry:
+            return entry[0]
+        return None
+
+    def longName(self, uuid):
+        entry = self._entry(uuid)
+        if entry:
+            return entry[1]
+        return None
+
+    def shortName(self, uuid):
+        entry = self._entry(uuid)
+        if entry:
+            return entry[1].rsplit('|', 1)[-1]
+        return None
+
+
+names = NameIndex()
+mcb.beforeSwitch.extend([names.unwatch, names.clear])
@@ -0,0 +1,395 @@
+import mmap
+import os
+import re
+import struct
+from array import array
+
+import numpy as np
+
+import modelChecker.modelChecker_backend as mcb
+import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_registry as mcreg
+
+# Offline
+#     Checks OBJ and PLY files without Maya. The files are read through a
+#     memory map, line by line or in binary blocks, straight into the flat
+#     buffers MFnMesh returns:
+#         points, polygonCounts, polygonConnects, us, vs, uvCounts, uvIds
+#     Only those compact arrays grow with the file, never its text. Every OBJ
+#     object or group, and every PLY file, becomes one mesh of the stand-in
+#     scene, so the checks, their names and the reports are those of a scene
+#     with the same meshes imported into Maya.
+#
+#     OfflineLoader checks a file as it reads it. Checks with 'scope': 'mesh'
+#     run on batches of about BATCH_FACES faces, after which the mesh data of
+#     the batch is dropped and only its transforms and shapes stay for the
+#     other checks, which run once the file is read. Memory then follows the
+#     batch rather than the file, unless one of those other checks needs mesh
+#     data. Checks that do not declare the "standin" backend are reported as
+#     skipped.
+#
+#     mayapy -m modelChecker.modelChecker_batch \
+#         --loader modelChecker.modelChecker_offline:OfflineLoader "/vendor/**/*.obj"
+
+EXTENSIONS = (".obj", ".ply")
+BATCH_FACES = 1000000
+
+PLY_TYPES = {
+    "char": "i1", "int8": "i1",
+    "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2",
+    "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4",
+    "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4",
+    "double": "f8", "float64": "f8",
+}
+
+PLY_UV_NAMES = (("u", "v"), ("s", "t"), ("texture_u", "texture_v"))
+
+
+def nodeName(name):
+    # Maya node names only hold letters, digits and underscores.
+    name = re.sub(r"[^0-9A-Za-z_]", "_", name) or "polySurface"
+    return "_" + name if name[0].isdigit() else name
+
+
+class MeshBuffers(object):
+    def __init__(self, name):
+        self.name = name
+        self.points = array('d')
+        self.polygonCounts = array('i')
+        self.polygonConnects = array('i')
+        self.us = array('d')
+        self.vs = array('d')
+        self.uvCounts = array('i')
+        self.uvIds = array('i')
+
+
+def _mapped(path):
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _objIndex(token, count):
+    index = int(token)
+    return index - 1 if index > 0 else count + index
+
+
+def _objMesh(name, points, us, vs, faces):
+    # OBJ indices are global to the file, each object keeps the points and
+    # UVs its faces use, in their original order.
+    mesh = MeshBuffers(name)
+    mesh.polygonCounts = faces.polygonCounts
+    mesh.uvCounts = faces.uvCounts
+    if len(faces.polygonConnects):
+        used, local = np.unique(np.frombuffer(faces.polygonConnects, dtype=np.int32), return_inverse=True)
+        mesh.polygonConnects = array('i', local.astype(np.int32).tobytes())
+        mesh.points = array('d', np.frombuffer(points, dtype=np.float64).reshape(-1, 3)[used].tobytes())
+    if len(faces.uvIds):
+        used, local = np.unique(np.frombuffer(faces.uvIds, dtype=np.int32), return_inverse=True)
+        mesh.uvIds = array('i', local.astype(np.int32).tobytes())
+        mesh.us = array('d', np.frombuffer(us, dtype=np.float64)[used].tobytes())
+        mesh.vs = array('d', np.frombuffer(vs, dtype=np.float64)[used].tobytes())
+    return mesh
+
+
+def readObj(path):
+    # Yields one MeshBuffers per object or group that has faces.
+    name = nodeName(os.path.splitext(os.path.basename(path))[0])
+    points, us, vs = array('d'), array('d'), array('d')
+    faces = MeshBuffers(name)
+    data = _mapped(path)
+    try:
+        for line in iter(data.readline, b""):
+            tokens = line.split()
+            if not tokens:
+                continue
+            kind = tokens[0]
+            if kind == b"v":
+                points.extend((float(tokens[1]), float(tokens[2]), float(tokens[3])))
+            elif kind == b"vt":
+                us.append(float(tokens[1]))
+                vs.append(float(tokens[2]) if len(tokens) > 2 else 0.0)
+            elif kind == b"f":
+                corners = [corner.split(b"/") for corner in tokens[1:]]
+                faces.polygonCounts.append(len(corners))
+                faces.polygonConnects.extend(_objIndex(corner[0], len(points) // 3) for corner in corners)
+                if all(len(corner) > 1 and corner[1] for corner in corners):
+                    faces.uvCounts.append(len(corners))
+                    faces.uvIds.extend(_objIndex(corner[1], len(us)) for corner in corners)
+                else:
+                    faces.uvCounts.append(0)
+            elif kind in (b"o", b"g"):
+                if len(faces.polygonCounts):
+                    yield _objMesh(faces.name, points, us, vs, faces)
+                faces = MeshBuffers(nodeName(tokens[1].decode("utf-8", "replace")) if len(tokens) > 1 else name)
+        if len(faces.polygonCounts):
+            yield _objMesh(faces.name, points, us, vs, faces)
+    finally:
+        data.close()
+
+
+def _plyHeader(data):
+    # Returns the format and [(element, count, [(property, type, countType)])],
+    # countType is None for scalar properties.
+    if data.readline().strip() != b"ply":
+        raise ValueError("Not a PLY file")
+    format = None
+    elements = []
+    for line in iter(data.readline, b""):
+        tokens = line.decode("ascii", "replace").split()
+        if not tokens or tokens[0] in ("comment", "obj_info"):
+            continue
+        if tokens[0] == "end_header":
+            return format, elements
+        if tokens[0] == "format":
+            format = tokens[1]
+        elif tokens[0] == "element":
+            elements.append((tokens[1], int(tokens[2]), []))
+        elif tokens[0] == "property":
+            if tokens[1] == "list":
+                elements[-1][2].append((tokens[4], PLY_TYPES[tokens[3]], PLY_TYPES[tokens[2]]))
+            else:
+                elements[-1][2].append((tokens[2], PLY_TYPES[tokens[1]], None))
+    raise ValueError("PLY header has no end_header")
+
+
+def _plyUVNames(properties):
+    names = [name for name, _, _ in properties]
+    for u, v in PLY_UV_NAMES:
+        if u in names and v in names:
+            return u, v
+    return None
+
+
+def _addPlyVertices(mesh, columns, uvNames):
+    points = np.stack([columns["x"], columns["y"], columns["z"]], axis=1).astype(np.float64)
+    mesh.points = array('d', points.tobytes())
+    if uvNames:
+        mesh.us = array('d', np.asarray(columns[uvNames[0]], dtype=np.float64).tobytes())
+        mesh.vs = array('d', np.asarray(columns[uvNames[1]], dtype=np.float64).tobytes())
+
+
+def _addPlyFace(mesh, indices, texcoords, perVertexUVs):
+    mesh.polygonCounts.append(len(indices))
+    mesh.polygonConnects.extend(indices)
+    if texcoords:
+        # Per face corner UVs become UVs of their own.
+        first = len(mesh.us)
+        mesh.us.extend(texcoords[0::2])
+        mesh.vs.extend(texcoords[1::2])
+        mesh.uvCounts.append(len(indices))
+        mesh.uvIds.extend(range(first, first + len(indices)))
+    elif perVertexUVs:
+        mesh.uvCounts.append(len(indices))
+        mesh.uvIds.extend(indices)
+    else:
+        mesh.uvCounts.append(0)
+
+
+def _readPlyAscii(data, elements, mesh):
+    uvNames = None
+    for element, count, properties in elements:
+        if element == "vertex":
+            names = [name for name, _, _ in properties]
+            uvNames = _plyUVNames(properties)
+            wanted = ["x", "y", "z"] + list(uvNames or ())
+            positions = [names.index(name) for name in wanted]
+            values = array('d')
+            for _ in range(count):
+                tokens = data.readline().split()
+                values.extend(float(tokens[position]) for position in positions)
+            table = np.frombuffer(values, dtype=np.float64).reshape(-1, len(wanted))
+            _addPlyVertices(mesh, dict(zip(wanted, table.T)), uvNames)
+            del table
+        elif element == "face":
+            for _ in range(count):
+                tokens = data.readline().split()
+                indices, texcoords, position = None, None, 0
+                for name, _, countType in properties:
+                    size = int(tokens[position]) if countType else 1
+                    values = tokens[position + 1:position + 1 + size] if countType else tokens[position:position + 1]
+                    position += size + (1 if countType else 0)
+                    if name in ("vertex_indices", "vertex_index"):
+                        indices = [int(value) for value in values]
+                    elif name == "texcoord":
+                        texcoords = [float(value) for value in values]
+                _addPlyFace(mesh, indices, texcoords, uvNames)
+        else:
+            for _ in range(count):
+                data.readline()
+
+
+def _readPlyBinary(data, elements, mesh, endian):
+    offset = data.tell()
+    uvNames = None
+    for element, count, properties in elements:
+        if all(countType is None for _, _, countType in properties):
+            dtype = np.dtype([(name, endian + type) for name, type, _ in properties])
+            block = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            if element == "vertex":
+                uvNames = _plyUVNames(properties)
+                # A list, Python 2 cannot delete a name a generator refers to.
+                _addPlyVertices(mesh, dict([(name, block[name]) for name in block.dtype.names]), uvNames)
+            offset += count * dtype.itemsize
+            del block
+        elif element == "face":
+            offset = _readPlyBinaryFaces(data, offset, count, properties, mesh, endian, uvNames)
+        else:
+            offset = _skipPlyBinary(data, offset, count, properties, endian)
+
+
+def _readPlyBinaryFaces(data, offset, count, properties, mesh, endian, uvNames):
+    if len(properties) == 1 and count:
+        # Meshes with one polygon size are read as a single block.
+        _, type, countType = properties[0]
+        sides = int(np.frombuffer(data, dtype=endian + countType, count=1, offset=offset)[0])
+        dtype = np.dtype([("n", endian + countType), ("i", endian + type, (sides,))])
+        if offset + count * dtype.itemsize <= len(data):
+            block = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            if (block["n"] == sides).all():
+                mesh.polygonCounts = array('i', np.full(count, sides, dtype=np.int32).tobytes())
+                mesh.polygonConnects = array('i', block["i"].astype(np.int32).tobytes())
+                if uvNames:
+                    mesh.uvCounts = array('i', mesh.polygonCounts)
+                    mesh.uvIds = array('i', mesh.polygonConnects)
+                else:
+                    mesh.uvCounts = array('i', bytes(4 * count))
+                del block
+                return offset + count * dtype.itemsize
+            del block
+    for _ in range(count):
+        indices, texcoords = None, None
+        for name, type, countType in properties:
+            size = 1
+            if countType:
+                size = struct.unpack_from(endian + np.dtype(countType).char, data, offset)[0]
+                offset += np.dtype(countType).itemsize
+            values = struct.unpack_from(endian + np.dtype(type).char * size, data, offset)
+            offset += size * np.dtype(type).itemsize
+            if name in ("vertex_indices", "vertex_index"):
+                indices = values
+            elif name == "texcoord":
+                texcoords = values
+        _addPlyFace(mesh, indices, texcoords, uvNames)
+    return offset
+
+
+def _skipPlyBinary(data, offset, count, properties, endian):
+    for _ in range(count):
+        for _, type, countType in properties:
+            size = 1
+            if countType:
+                size = struct.unpack_from(endian + np.dtype(countType).char, data, offset)[0]
+                offset += np.dtype(countType).itemsize
+            offset += size * np.dtype(type).itemsize
+    return offset
+
+
+def readPly(path):
+    # Yields the single mesh of the file.
+    mesh = MeshBuffers(nodeName(os.path.splitext(os.path.basename(path))[0]))
+    data = _mapped(path)
+    try:
+        format, elements = _plyHeader(data)
+        if format == "ascii":
+            _readPlyAscii(data, elements, mesh)
+        elif format in ("binary_little_endian", "binary_big_endian"):
+            _readPlyBinary(data, elements, mesh, "<" if format == "binary_little_endian" else ">")
+        else:
+            raise ValueError("Unknown PLY format: {}".format(format))
+    finally:
+        data.close()
+    yield mesh
+
+
+READERS = {
+    ".obj": readObj,
+    ".ply": readPly,
+}
+
+
+def readMeshes(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ValueError("Unsupported file type: {}".format(path))
+    return READERS[extension](path)
+
+
+def loadFile(path):
+    # Replaces the stand-in scene with the meshes of the file.
+    import modelChecker.modelChecker_standin as standin
+    standin.scene.new()
+    for mesh in readMeshes(path):
+        standin.scene.createMesh(
+            mesh.points, mesh.polygonCounts, mesh.polygonConnects,
+            mesh.us, mesh.vs, mesh.uvCounts, mesh.uvIds, name=mesh.name)
+
+
+def skipped(command):
+    # Report entry of a check the stand-in cannot run.
+    return {"type": None, "errors": [], "skipped": "{} does not run without Maya".format(command)}
+
+
+def _dropMeshes(transforms):
+    # Keeps the nodes of the meshes, without their buffers.
+    import modelChecker.modelChecker_standin as standin
+    for transform in transforms:
+        for shape in transform.children:
+            if shape.mesh is not None:
+                standin.scene.setMesh(shape, [], [], [], [], [], [], [])
+
+
+class OfflineLoader(object):
+    # Scene loader for modelChecker_batch.
+    def __init__(self, batchFaces=BATCH_FACES):
+        self.batchFaces = batchFaces
+
+    def initialize(self):
+        mcb.use("standin")
+
+    def check(self, path, checks):
+        import modelChecker.modelChecker_engine as mce
+        import modelChecker.modelChecker_standin as standin
+        supported = [command for command in checks if mcreg.supported(command, "standin")]
+        meshChecks = [command for command in supported if mcl.mcCommandsList[command].get('scope') == 'mesh']
+        sceneChecks = [command for command in supported if command not in meshChecks]
+        keepMeshes = mcreg.needsMeshes(sceneChecks)
+        types = {}
+        errors = dict((command, []) for command in meshChecks)
+
+        def checkBatch(batch):
+            if not batch:
+                return
+            if meshChecks:
+                diagnostics = mce.run(meshChecks, [transform.uuid for transform in batch])
+                for command in meshChecks:
+                    types[command] = diagnostics[command]["type"]
+                    errors[command].extend(mce.parseErrors(diagnostics[command]))
+            if not keepMeshes:
+                _dropMeshes(batch)
+
+        standin.scene.new()
+        batch, faces = [], 0
+        for mesh in readMeshes(path):
+            batch.append(standin.scene.createMesh(
+                mesh.points, mesh.polygonCounts, mesh.polygonConnects,
+                mesh.us, mesh.vs, mesh.uvCounts, mesh.uvIds, name=mesh.name))
+            faces += len(mesh.polygonCounts)
+            if faces >= self.batchFaces:
+                checkBatch(batch)
+                batch, faces = [], 0
+        checkBatch(batch)
+
+        diagnostics = mce.run(sceneChecks) if sceneChecks else {}
+        report = {}
+        for command in checks:
+            if command in diagnostics:
+                report[command] = {"type": diagnostics[command]["type"], "errors": mce.parseErrors(diagnostics[command])}
+            elif command in errors:
+                report[command] = {"type": types.get(command, mcl.mcCommandsList[command]["type"]),
+                                   "errors": errors[command]}
+            else:
+                report[command] = skipped(command)
+        return report
@@ -0,0 +1,67 @@
+import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_registry as mcreg
+
+# Run Plan
+#     The order an engine run takes, from what the checks declare in
+#     mcCommandsList:
+#         before -> checks that read no mesh data, cheapest first
+#         passes -> [(meshes, MeshPlan), ...] fused passes, each computing
+#                   the buffers and intermediates its checks share once per
+#                   mesh, see modelChecker_commands.MeshPlan
+#         after  -> the other mesh checks, cheapest first
+#     Node checks run first so that cheap failures show up, and stop a
+#     "failFast" run, before any mesh data is read.
+#
+#     print(modelChecker_plan.formatPlan(diagnostics.plan, diagnostics.profile))
+
+
+def _cost(command):
+    cost = mcl.mcCommandsList[command].get("cost", "moderate")
+    return mcreg.COSTS.index(cost) if cost in mcreg.COSTS else len(mcreg.COSTS)
+
+
+class RunPlan(object):
+    def __init__(self, checks, fused=()):
+        ordered = sorted((command for command in checks if command not in fused), key=_cost)
+        self.before = [command for command in ordered if not mcreg.needsMeshes([command])]
+        self.after = [command for command in ordered if command not in self.before]
+        self.passes = []
+
+    def addPass(self, meshes, meshPlan):
+        self.passes.append((meshes, meshPlan))
+
+
+def _line(text, seconds):
+    return "    {:<60}{:>10.1f} ms".format(text, seconds * 1000.0)
+
+
+def formatPlan(plan, profile=None):
+    # The steps of a run with the time spent in each, profile being
+    # Diagnostics.profile of the run.
+    profile = profile or {}
+    lines = []
+
+    def checks(title, commands):
+        if commands:
+            lines.append(title)
+            for command in commands:
+                text = "{:<32}{}".format(command, mcl.mcCommandsList[command].get("cost", ""))
+                lines.append(_line(text, profile.get(command, {}).get("seconds", 0)))
+
+    checks("node checks", plan.before)
+    for index, (_, meshPlan) in enumerate(plan.passes, 1):
+        lines.append("mesh pass {} over {} meshes: {}".format(index, meshPlan.meshes, ", ".join(meshPlan.commands())))
+        buffers, intermediates, kernels, walks = meshPlan.steps()
+        for name in buffers:
+            lines.append(_line("buffer " + name, meshPlan.seconds[name]))
+        for name, data, _ in intermediates:
+            lines.append(_line("{} <- {}".format(name, ", ".join(data)), meshPlan.seconds[name]))
+        for command, data, _ in kernels:
+            lines.append(_line("{} <- {}".format(command, ", ".join(data)), meshPlan.seconds[command]))
+        for kind, _, _, walkChecks in walks:
+            if walkChecks:
+                measures = sorted(set(measure for _, (measure, _) in walkChecks))
+                text = "{} walk: {} -> {}".format(kind, ", ".join(measures), ", ".join(command for command, _ in walkChecks))
+                lines.append(_line(text, meshPlan.seconds[kind + " walk"]))
+    checks("mesh checks", plan.after)
+    return "\n".join(lines)
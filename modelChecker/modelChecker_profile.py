@@ -0,0 +1,94 @@
+import cProfile
+import pstats
+import time
+from contextlib import contextmanager
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import modelChecker.modelChecker_backend as mcb
+import modelChecker.modelChecker_mesh as mcm
+
+# Profiling
+#     profiled() wraps one check invocation and records into profile[command]:
+#         "seconds"                   -> wall time
+#         "nodes"                     -> nodes handed to the check
+#         "meshes", "faces", "edges",
+#         "vertices", "uvs"           -> elements the check visited
+#         "cmdsCalls"                 -> maya.cmds calls made by the check
+#         "cprofile"                  -> cProfile report, only if requested
+#     Checks sharing one fused mesh pass get the pass time with "shared": True.
+
+VISIT_KINDS = ("meshes", "faces", "edges", "vertices", "uvs")
+CPROFILE_LINES = 25
+
+
+class CountingCmds(object):
+    def __init__(self, cmds):
+        self._cmds = cmds
+        self.calls = 0
+
+    def __getattr__(self, name):
+        function = getattr(self._cmds, name)
+
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return function(*args, **kwargs)
+        return counted
+
+
+@contextmanager
+def profiled(profile, command, nodes, useCProfile=False):
+    entry = {"nodes": len(nodes)}
+    before = dict(mcm.visits)
+    profiler = cProfile.Profile() if useCProfile else None
+    with mcb.wrapped("cmds", CountingCmds) as counter:
+        start = time.time()
+        if profiler:
+            profiler.enable()
+        try:
+            yield entry
+        finally:
+            if profiler:
+                profiler.disable()
+            entry["seconds"] = time.time() - start
+            entry["cmdsCalls"] = counter.calls
+            for kind in VISIT_KINDS:
+                entry[kind] = mcm.visits[kind] - before.get(kind, 0)
+            if profiler:
+                stream = StringIO()
+                pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(CPROFILE_LINES)
+                entry["cprofile"] = stream.getvalue()
+            profile[command] = entry
+
+
+def mergeProfiles(target, source):
+    # Adds up the numbers of repeated runs of the same checks, e.g. the chunks
+    # of an incremental re-check.
+    for command, entry in source.items():
+        merged = target.setdefault(command, {})
+        for key, value in entry.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                merged[key] = merged.get(key, 0) + value
+            else:
+                merged[key] = value
+    return target
+
+
+def formatProfile(profile):
+    lines = ["{:<24}{:>12}{:>10}{:>10}{:>12}{:>12}{:>12}{:>12}{:>10}".format(
+        "check", "ms", "nodes", "meshes", "faces", "edges", "vertices", "uvs", "cmds")]
+    for command, entry in sorted(profile.items(), key=lambda item: -item[1].get("seconds", 0)):
+        lines.append("{:<24}{:>12.1f}{:>10}{:>10}{:>12}{:>12}{:>12}{:>12}{:>10}".format(
+            command,
+            entry.get("seconds", 0) * 1000.0,
+            entry.get("nodes", ""),
+            entry.get("meshes", ""),
+            entry.get("faces", ""),
+            entry.get("edges", ""),
+            entry.get("vertices", ""),
+            entry.get("uvs", ""),
+            entry.get("cmdsCalls", "")))
+    return "\n".join(lines)
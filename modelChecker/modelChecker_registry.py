@@ -0,0 +1,167 @@
+import glob
+import importlib
+import json
+import os
+import sys
+
+import modelChecker.modelChecker_backend as mcb
+import modelChecker.modelChecker_list as mcl
+
+try:
+    from importlib import metadata as importlib_metadata
+except ImportError:
+    importlib_metadata = None
+
+# Check Registry
+#     mcCommandsList holds what every check declares, the functions behind
+#     them are only imported when a check first runs:
+#         'label', 'category' -> shown in the window
+#         'type'              -> result type, one of RESULT_TYPES
+#         'cost'              -> one of COSTS, the work a check does per node
+#         'needs'             -> scene data it reads, from NEEDS, all of it
+#                                when missing
+#         'scope'             -> one of SCOPES, see modelChecker_list
+#         'backends'          -> backends it runs on, from modelChecker_backend,
+#                                all of them when missing
+#         'module'            -> module holding the check, DEFAULT_MODULE
+#                                when missing
+#         'function'          -> its name there, the check name when missing
+#     Studio checks are declared in manifests, {name: {...}} dicts in the same
+#     format, so listing them imports none of their code:
+#         - entry points of the ENTRY_POINT_GROUP group, naming a manifest or
+#           a callable returning one
+#         - *.json manifests in the folders of the SEARCH_PATH variable, the
+#           folder is added to sys.path before their modules are imported
+#     register raises ValueError for undeclared or unknown values, and for
+#     names of the built-in checks, which studio checks cannot replace.
+#     A check is called with (transform UUIDs, mesh MSelectionList) and
+#     returns (type, errors) like the checks in modelChecker_commands.
+
+DEFAULT_MODULE = "modelChecker.modelChecker_commands"
+ENTRY_POINT_GROUP = "modelChecker.checks"
+SEARCH_PATH = "MODELCHECKER_CHECK_PATH"
+
+RESULT_TYPES = ("nodes", "vertex", "edge", "polygon", "uv")
+COSTS = ("cheap", "moderate", "expensive")
+NODE_DATA = ("names", "hierarchy", "transforms", "layers", "history", "shaders")
+MESH_DATA = ("faces", "points", "edges", "uvs")
+NEEDS = NODE_DATA + MESH_DATA
+SCOPES = ("context", "mesh")
+BUILTIN_CHECKS = frozenset(mcl.mcCommandsList)
+
+_functions = {}
+_loaded = False
+
+
+def _declaration(name, declaration, path=None):
+    # The validated declaration as register stores it.
+    if name in BUILTIN_CHECKS:
+        raise ValueError("Check {} is built in and cannot be replaced".format(name))
+    missing = [key for key in ("label", "category", "type") if key not in declaration]
+    if missing:
+        raise ValueError("Check {} does not declare {}".format(name, ", ".join(missing)))
+    if declaration["type"] not in RESULT_TYPES:
+        raise ValueError("Check {} has an unknown type {}".format(name, declaration["type"]))
+    declaration = dict(declaration)
+    declaration.setdefault("cost", "moderate")
+    if declaration["cost"] not in COSTS:
+        raise ValueError("Check {} has an unknown cost {}".format(name, declaration["cost"]))
+    if "needs" in declaration:
+        declaration["needs"] = tuple(declaration["needs"])
+        unknown = [need for need in declaration["needs"] if need not in NEEDS]
+        if unknown:
+            raise ValueError("Check {} needs unknown data {}".format(name, ", ".join(unknown)))
+    if "scope" in declaration and declaration["scope"] not in SCOPES:
+        raise ValueError("Check {} has an unknown scope {}".format(name, declaration["scope"]))
+    if "backends" in declaration:
+        declaration["backends"] = tuple(declaration["backends"])
+        unknown = [backend for backend in declaration["backends"] if backend not in mcb.LOADERS]
+        if unknown:
+            raise ValueError("Check {} declares unknown backends {}".format(name, ", ".join(unknown)))
+    if path:
+        declaration["path"] = path
+    return declaration
+
+
+def register(name, declaration, path=None):
+    mcl.mcCommandsList[name] = _declaration(name, declaration, path)
+    _functions.pop(name, None)
+
+
+def registerManifest(manifest, path=None):
+    # Registers all checks of the manifest, or none when one is invalid.
+    declarations = [(name, _declaration(name, declaration, path)) for name, declaration in manifest.items()]
+    for name, declaration in declarations:
+        mcl.mcCommandsList[name] = declaration
+        _functions.pop(name, None)
+
+
+def _entryPoints():
+    if importlib_metadata is None:
+        return []
+    entryPoints = importlib_metadata.entry_points()
+    if hasattr(entryPoints, "select"):
+        return list(entryPoints.select(group=ENTRY_POINT_GROUP))
+    return list(entryPoints.get(ENTRY_POINT_GROUP, []))
+
+
+def loadPlugins(force=False):
+    # Adds the studio checks to mcCommandsList, once per session.
+    global _loaded
+    if _loaded and not force:
+        return
+    _loaded = True
+    for entryPoint in _entryPoints():
+        try:
+            manifest = entryPoint.load()
+            registerManifest(manifest() if callable(manifest) else manifest)
+        except Exception as error:
+            sys.stderr.write("modelChecker: skipped checks of {}: {}\n".format(entryPoint.name, error))
+    for folder in os.environ.get(SEARCH_PATH, "").split(os.pathsep):
+        if not folder:
+            continue
+        for manifestPath in sorted(glob.glob(os.path.join(folder, "*.json"))):
+            try:
+                with open(manifestPath) as manifestFile:
+                    registerManifest(json.load(manifestFile), folder)
+            except (IOError, ValueError) as error:
+                sys.stderr.write("modelChecker: skipped checks of {}: {}\n".format(manifestPath, error))
+
+
+def getCheck(command):
+    # The check function, importing its module on first use.
+    function = _functions.get(command)
+    if function is not None:
+        return function
+    if command not in mcl.mcCommandsList:
+        loadPlugins()
+    declaration = mcl.mcCommandsList[command]
+    path = declaration.get("path")
+    if path and path not in sys.path:
+        sys.path.append(path)
+    module = importlib.import_module(declaration.get("module", DEFAULT_MODULE))
+    function = _functions[command] = getattr(module, declaration.get("function", command))
+    return function
+
+
+def builtin(command):
+    # True for the checks of modelChecker_commands, which the engine may fuse.
+    declaration = mcl.mcCommandsList[command]
+    return declaration.get("module", DEFAULT_MODULE) == DEFAULT_MODULE and declaration.get("function", command) == command
+
+
+def supported(command, backend):
+    # True when the check runs on the backend.
+    return backend in mcl.mcCommandsList[command].get("backends", mcb.LOADERS)
+
+
+def needs(commands):
+    # Scene data the commands read together.
+    needed = set()
+    for command in commands:
+        needed.update(mcl.mcCommandsList[command].get("needs", NEEDS))
+    return needed
+
+
+def needsMeshes(commands):
+    return bool(needs(commands).intersection(MESH_DATA))
@@ -0,0 +1,304 @@
+try:
+    from PySide6 import QtCore, QtGui
+except ImportError:
+    from PySide2 import QtCore, QtGui
+
+import modelChecker.modelChecker_components as mcco
+import modelChecker.modelChecker_engine as mce
+import modelChecker.modelChecker_names as mcn
+
+FAILED_COLOR = "#9c4f4f"
+SUCCESS_COLOR = "#64a65a"
+
+# Column headers, the first one shows the report title.
+HEADERS = ("", "Time")
+TIMING_COLUMN = 1
+
+# Report Model
+#     The report as a tree for a QTreeView:
+#         Node(s) checked: N     -> checked node names
+#         <check> [ FAILED ]     -> failing nodes with their issue count
+#             <node> - N issues  -> "pCube1.f[0:99]", one row per run of ids
+#     A second column holds the time each check took, with "shared" for
+#     checks timed together in a fused pass.
+#     Every row container below only knows how many rows it has. Names and
+#     ranges are formatted when the view draws a row, and containers are made
+#     when the view first asks about a row's children, so the cost follows
+#     what is on screen, not the number of failing components.
+
+
+class _Rows(object):
+    def __init__(self, parent=None, row=0):
+        self.parent = parent
+        self.row = row
+
+    def rowCount(self):
+        return 0
+
+    def child(self, row):
+        return None
+
+    def text(self, row):
+        return ""
+
+    def color(self, row):
+        return None
+
+    def timing(self, row):
+        return ""
+
+
+def _issues(count):
+    return "{} {}".format(count, "issues" if count > 1 else "issue")
+
+
+class _NodeList(_Rows):
+    def __init__(self, nodes, parent, row):
+        super(_NodeList, self).__init__(parent, row)
+        self.nodes = nodes
+
+    def rowCount(self):
+        return len(self.nodes)
+
+    def text(self, row):
+        return mcn.names.name(self.nodes[row]) or self.nodes[row]
+
+
+class _Components(_Rows):
+    def __init__(self, uuid, type, components, parent, row):
+        super(_Components, self).__init__(parent, row)
+        self.uuid = uuid
+        self.format = mce.TYPE_MAPPING[type]
+        if not isinstance(components, mcco.ComponentSet):
+            components = mcco.ComponentSet(components)
+        self.components = components
+
+    def rowCount(self):
+        return len(self.components.starts)
+
+    def text(self, row):
+        start, end = self.components.starts[row], self.components.ends[row]
+        run = str(start) if start == end else "{}:{}".format(start, end)
+        return (mcn.names.name(self.uuid) or self.uuid) + self.format.format(run)
+
+    def color(self, row):
+        return FAILED_COLOR
+
+
+class _Check(_Rows):
+    # Failing nodes of one check. Counts come from the stored runs, the
+    # components are only listed when a node is expanded.
+    def __init__(self, parent, row, errors=None, consolidated=True):
+        super(_Check, self).__init__(parent, row)
+        self.errors = errors
+        self.consolidated = consolidated
+        self.uuids = []
+        self.counts = {}
+        self._children = {}
+        if errors is not None:
+            counts = mce.countComponents(errors)
+            self.add((uuid, counts[uuid]) for uuid in counts if mcn.names.name(uuid))
+
+    def add(self, counts):
+        for uuid, count in counts:
+            if uuid not in self.counts:
+                self.uuids.append(uuid)
+                self.counts[uuid] = 0
+            self.counts[uuid] += count
+
+    def rowCount(self):
+        return len(self.uuids)
+
+    def child(self, row):
+        if self.consolidated or self.errors is None or self.errors['type'] == 'nodes':
+            return None
+        if row not in self._children:
+            uuid = self.uuids[row]
+            self._children[row] = _Components(uuid, self.errors['type'], self.errors['uuids'][uuid], self, row)
+        return self._children[row]
+
+    def text(self, row):
+        uuid = self.uuids[row]
+        name = mcn.names.name(uuid) or uuid
+        if self.errors is not None and self.errors['type'] == 'nodes' and not self.consolidated:
+            return name
+        return "{} - {}".format(name, _issues(self.counts[uuid]))
+
+    def color(self, row):
+        return FAILED_COLOR
+
+
+class _Root(_Rows):
+    def __init__(self):
+        super(_Root, self).__init__()
+        self.lines = []
+        self.colors = []
+        self.children = []
+        self.timings = []
+        self.commands = {}
+
+    def append(self, text, color=None, child=None, timing=""):
+        self.lines.append(text)
+        self.colors.append(color)
+        self.children.append(child)
+        self.timings.append(timing)
+
+    def rowCount(self):
+        return len(self.lines)
+
+    def child(self, row):
+        return self.children[row]
+
+    def text(self, row):
+        return self.lines[row]
+
+    def color(self, row):
+        return self.colors[row]
+
+    def timing(self, row):
+        return self.timings[row]
+
+
+def _timing(profile):
+    # "12.3 ms", or "12.3 ms shared" for checks of a fused pass.
+    timing = "{:.1f} ms".format(profile["seconds"] * 1000.0)
+    return timing + " shared" if profile.get("shared") else timing
+
+
+class ReportModel(QtCore.QAbstractItemModel):
+    def __init__(self, parent=None):
+        super(ReportModel, self).__init__(parent)
+        self.title = ""
+        self.root = _Root()
+
+    # Content
+
+    def setReport(self, title, nodes, diagnostics, labels, profile=None, consolidated=False, cache=None,
+                  truncated=(), aborted=False):
+        # labels: (command, label) pairs in report order. Only commands found
+        # in diagnostics are listed. cache, truncated and aborted as in
+        # Diagnostics.
+        profile = profile or {}
+        self.beginResetModel()
+        self.title = title
+        self.root = _Root()
+        plural = '' if len(nodes) == 1 else 's'
+        nodeList = None
+        if nodes and not consolidated:
+            nodeList = _NodeList(nodes, self.root, 0)
+        self.root.append("Node{} checked: {}".format(plural, len(nodes)), child=nodeList)
+        if cache and (cache.get("hits") or cache.get("misses")):
+            self.root.append("Cache: {} hits, {} misses".format(cache.get("hits", 0), cache.get("misses", 0)))
+        if aborted:
+            self.root.append("Stopped at the first failure, later checks did not run.", FAILED_COLOR)
+        if not diagnostics:
+            self.root.append("No tests run in this context.")
+        for command, label in labels:
+            if command not in diagnostics:
+                continue
+            check = _Check(self.root, self.root.rowCount(), diagnostics[command], consolidated)
+            timing = _timing(profile[command]) if command in profile else ""
+            if check.rowCount():
+                truncation = " truncated" if command in truncated else ""
+                self.root.append("{} [ FAILED{} ]".format(label, truncation), FAILED_COLOR, check, timing)
+            else:
+                self.root.append("{} [ SUCCESS ]".format(label), SUCCESS_COLOR, timing=timing)
+            self.root.commands[command] = check
+        self.endResetModel()
+
+    def startRun(self, title):
+        self.beginResetModel()
+        self.title = title
+        self.root = _Root()
+        self.root.append("Running...")
+        self.endResetModel()
+
+    def addResults(self, command, label, counts):
+        # Streamed (uuid, count) pairs of a running check.
+        check = self.root.commands.get(command)
+        if check is None:
+            row = self.root.rowCount()
+            self.beginInsertRows(QtCore.QModelIndex(), row, row)
+            check = _Check(self.root, row)
+            self.root.append("{} [ FAILED ]".format(label), FAILED_COLOR, check)
+            self.root.commands[command] = check
+            self.endInsertRows()
+        parent = self.index(check.row, 0)
+        first = check.rowCount()
+        added = len(set(uuid for uuid, _ in counts if uuid not in check.counts))
+        if added:
+            self.beginInsertRows(parent, first, first + added - 1)
+        check.add(counts)
+        if added:
+            self.endInsertRows()
+        if first and added < len(counts):
+            self.dataChanged.emit(self.index(0, 0, parent), self.index(first - 1, 0, parent))
+
+    def failed(self, command):
+        check = self.root.commands.get(command)
+        return check is not None and check.rowCount() > 0
+
+    def clear(self):
+        self.beginResetModel()
+        self.title = ""
+        self.root = _Root()
+        self.endResetModel()
+
+    # QAbstractItemModel
+
+    def _rows(self, index):
+        if not index.isValid():
+            return self.root
+        return index.internalPointer().child(index.row())
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column, self._rows(parent))
+
+    def parent(self, index=None):
+        if index is None:
+            return super(ReportModel, self).parent()
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        rows = index.internalPointer()
+        if rows.parent is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(rows.row, 0, rows.parent)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        rows = self._rows(parent)
+        return rows.rowCount() if rows else 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return len(HEADERS)
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        return self.rowCount(parent) > 0
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        rows = index.internalPointer()
+        if index.column() == TIMING_COLUMN:
+            if role == QtCore.Qt.DisplayRole:
+                return rows.timing(index.row())
+            if role == QtCore.Qt.TextAlignmentRole:
+                return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return rows.text(index.row())
+        if role == QtCore.Qt.ForegroundRole:
+            color = rows.color(index.row())
+            if color:
+                return QtGui.QBrush(QtGui.QColor(color))
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.title if section == 0 else HEADERS[section]
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.TextAlignmentRole and section == TIMING_COLUMN:
+            return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        return None
@@ -0,0 +1,149 @@
+import modelChecker.modelChecker_backend as mcb
+from modelChecker.modelChecker_backend import cmds, om
+import modelChecker.modelChecker_names as mcn
+
+# Scene Index
+#     One MItDag traversal records every DAG node by UUID:
+#         parents, children, shapes -> [... UUIDs]
+#         type                      -> node type name
+#         path, name                -> full DAG path, leaf name
+#     Context building and the node level checks answer relatives and type
+#     queries from it. The index is rebuilt on the next access after any node
+#     is added, removed, renamed or reparented.
+
+DEFAULT_CAMERAS = {'|front', '|persp', '|top', '|side'}
+
+
+class DagNode(object):
+    __slots__ = (
+        "uuid",
+        "dagPath",
+        "path",
+        "name",
+        "type",
+        "isTransform",
+        "isShape",
+        "parents",
+        "children",
+        "shapes",
+    )
+
+    def __init__(self, uuid, dagPath, name, type, isTransform, isShape):
+        self.uuid = uuid
+        self.dagPath = dagPath
+        self.path = dagPath.fullPathName()
+        self.name = name
+        self.type = type
+        self.isTransform = isTransform
+        self.isShape = isShape
+        self.parents = []
+        self.children = []
+        self.shapes = []
+
+
+class SceneIndex(object):
+    def __init__(self):
+        self.nodes = {}
+        self.order = []
+        self._stale = True
+        self._callbacks = []
+
+    def invalidate(self, *args):
+        self._stale = True
+
+    def watch(self):
+        if self._callbacks:
+            return
+        self._callbacks = [
+            om.MNodeMessage.addNameChangedCallback(om.MObject(), self.invalidate),
+            om.MDGMessage.addNodeAddedCallback(self.invalidate, "dependNode"),
+            om.MDGMessage.addNodeRemovedCallback(self.invalidate, "dependNode"),
+            om.MDagMessage.addAllDagChangesCallback(self.invalidate),
+        ]
+
+    def unwatch(self):
+        for callback in self._callbacks:
+            om.MMessage.removeCallback(callback)
+        self._callbacks = []
+        self._stale = True
+
+    def ensure(self):
+        self.watch()
+        if self._stale:
+            self.build()
+        return self
+
+    def build(self):
+        nodes = {}
+        order = []
+        dagIt = om.MItDag()
+        while not dagIt.isDone():
+            dagPath = dagIt.getPath()
+            obj = dagPath.node()
+            if obj.hasFn(om.MFn.kWorld):
+                dagIt.next()
+                continue
+            fn = om.MFnDagNode(dagPath)
+            uuid = fn.uuid().asString()
+            if uuid in nodes:
+                # Another path to an instanced node, its subtree is already recorded.
+                dagIt.prune()
+                dagIt.next()
+                continue
+            node = DagNode(
+                uuid,
+                dagPath,
+                fn.name(),
+                fn.typeName,
+                obj.hasFn(om.MFn.kTransform),
+                obj.hasFn(om.MFn.kShape))
+            for i in range(fn.parentCount()):
+                parent = fn.parent(i)
+                if not parent.hasFn(om.MFn.kWorld):
+                    node.parents.append(om.MFnDependencyNode(parent).uuid().asString())
+            nodes[uuid] = node
+            order.append(node)
+            mcn.names.add(uuid, dagPath.partialPathName(), node.path)
+            dagIt.next()
+        for node in order:
+            for parent in node.parents:
+                nodes[parent].children.append(node.uuid)
+                if node.isShape:
+                    nodes[parent].shapes.append(node.uuid)
+        self.nodes = nodes
+        self.order = order
+        self._stale = False
+
+    def get(self, uuid):
+        return self.nodes.get(uuid)
+
+    def transforms(self):
+        return [node.uuid for node in self.order
+                if node.isTransform and node.path not in DEFAULT_CAMERAS]
+
+    def descendants(self, uuid):
+        descendants = []
+        stack = list(self.nodes[uuid].children)
+        while stack:
+            node = self.nodes[stack.pop()]
+            descendants.append(node.uuid)
+            stack.extend(node.children)
+        return descendants
+
+    def meshShapes(self, uuid):
+        node = self.nodes.get(uuid)
+        if not node:
+            return []
+        return [shape for shape in node.shapes if self.nodes[shape].type == "mesh"]
+
+    def displayLayerMembers(self):
+        # Layer assignments are connections, not DAG edits, so they are not cached.
+        layers = cmds.ls(type="displayLayer")
+        connected = cmds.listConnections(layers) if layers else None
+        if not connected:
+            return set()
+        return set(cmds.ls(connected, uuid=True))
+
+
+scene = SceneIndex()
+mcb.beforeSwitch.append(scene.unwatch)
@@ -0,0 +1,227 @@
+import argparse
+import heapq
+import json
+import multiprocessing
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+import modelChecker.modelChecker_backend as mcb
+import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_registry as mcreg
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+# Shards
+#     Checks the meshes of one large asset, without Maya, on a pool of worker
+#     processes. The mesh buffers of every mesh are packed into one shared
+#     memory block; workers map it once and build their stand-in meshes on
+#     views of it, so no mesh data is pickled. Meshes are dealt into shards
+#     of about equal face count, largest first, and every worker returns the
+#     failing ids of its shard as runs, by mesh index.
+#     Only checks with 'scope': 'mesh' are sharded. Every other check reads
+#     node names or the hierarchy, which only the calling process's scene
+#     holds as the loaders built it, and runs there. Before Python 3.8 there
+#     is no shared memory and the packed block is handed to every worker once
+#     instead.
+#
+#     python -m modelChecker.modelChecker_shards --checks triangles,ngons \
+#         --workers 32 /vendor/city.obj
+
+FIELDS = (
+    ("points", 'd'),
+    ("polygonCounts", 'i'),
+    ("polygonConnects", 'i'),
+    ("us", 'd'),
+    ("vs", 'd'),
+    ("uvCounts", 'i'),
+    ("uvIds", 'i'),
+)
+SHARDS_PER_WORKER = 4
+
+
+def pack(meshes):
+    # Returns the size of the block and, per mesh, (name, faces, [(offset,
+    # typecode, length), ...] in FIELDS order).
+    layout = []
+    offset = 0
+    for mesh in meshes:
+        fields = []
+        for field, typecode in FIELDS:
+            length = len(getattr(mesh, field))
+            fields.append((offset, typecode, length))
+            offset += -(-length * np.dtype(typecode).itemsize // 8) * 8
+        layout.append((mesh.name, len(mesh.polygonCounts), fields))
+    return offset, layout
+
+
+def _copyInto(buffer, meshes, layout):
+    for mesh, (_, _, fields) in zip(meshes, layout):
+        for (field, _), (offset, typecode, length) in zip(FIELDS, fields):
+            data = np.frombuffer(getattr(mesh, field), dtype=typecode)
+            np.frombuffer(buffer, dtype=typecode, count=length, offset=offset)[:] = data
+
+
+def balance(faceCounts, shards):
+    # Largest meshes first, each into the lightest shard. Returns the shards
+    # as lists of mesh indices, heaviest shard first.
+    heap = [(0, shard) for shard in range(shards)]
+    members = [[] for _ in range(shards)]
+    for index in sorted(range(len(faceCounts)), key=lambda index: -faceCounts[index]):
+        load, shard = heapq.heappop(heap)
+        members[shard].append(index)
+        heapq.heappush(heap, (load + faceCounts[index], shard))
+    loads = dict((shard, load) for load, shard in heap)
+    order = sorted(range(shards), key=lambda shard: -loads[shard])
+    return [sorted(members[shard]) for shard in order if members[shard]]
+
+
+# Worker side. The block stays mapped for the life of the worker, the stand-in
+# meshes of every shard are views of it.
+_buffer = None
+_block = None
+
+
+def _attach(name, data):
+    global _buffer, _block
+    if name:
+        try:
+            _block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            _block = shared_memory.SharedMemory(name=name)
+        _buffer = _block.buf
+    else:
+        _buffer = data
+    mcb.use("standin")
+
+
+def _checkShard(job):
+    # Returns {command: (type, [(mesh index, starts, ends), ...])}.
+    import modelChecker.modelChecker_components as mcco
+    import modelChecker.modelChecker_engine as mce
+    import modelChecker.modelChecker_standin as standin
+    indices, layout, checks = job
+    standin.scene.new()
+    meshIndex = {}
+    for index, (name, _, fields) in zip(indices, layout):
+        arrays = [np.frombuffer(_buffer, dtype=typecode, count=length, offset=offset)
+                  for offset, typecode, length in fields]
+        transform = standin.scene.createMesh(*arrays, name=name)
+        meshIndex[transform.uuid] = index
+    diagnostics = mce.run(checks)
+    results = {}
+    for command, errors in diagnostics.items():
+        failed = []
+        for uuid, components in errors['uuids'].items():
+            if not isinstance(components, mcco.ComponentSet):
+                components = mcco.ComponentSet(components)
+            if components:
+                failed.append((meshIndex[uuid],) + components.runBytes())
+        results[command] = (errors['type'], failed)
+    standin.scene.new()
+    return results
+
+
+def runSharded(meshes, transforms, checks, workers=None):
+    # meshes: MeshBuffers, loaded into the stand-in scene as transforms.
+    # Returns the diagnostics of the calling process's scene.
+    import modelChecker.modelChecker_components as mcco
+    import modelChecker.modelChecker_engine as mce
+    workers = workers or multiprocessing.cpu_count()
+    shardChecks = [command for command in checks if mcl.mcCommandsList[command].get('scope') == 'mesh']
+    sceneChecks = [command for command in checks if command not in shardChecks]
+    diagnostics = mce.Diagnostics()
+
+    if shardChecks and meshes:
+        size, layout = pack(meshes)
+        shards = balance([faces for _, faces, _ in layout], min(workers * SHARDS_PER_WORKER, len(meshes)))
+        jobs = [(shard, [layout[index] for index in shard], shardChecks) for shard in shards]
+        block = None
+        if shared_memory is not None:
+            block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            buffer, initargs = block.buf, (block.name, None)
+        else:
+            buffer = bytearray(size)
+            initargs = (None, buffer)
+        try:
+            _copyInto(buffer, meshes, layout)
+            pool = multiprocessing.Pool(min(workers, len(jobs)), initializer=_attach, initargs=initargs)
+            try:
+                shardResults = list(pool.imap_unordered(_checkShard, jobs))
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            del buffer
+            if block is not None:
+                block.close()
+                block.unlink()
+
+        # Merged in mesh order, whatever order the shards finished in.
+        merged = dict((command, [None, []]) for command in shardChecks)
+        for results in shardResults:
+            for command, (type, failed) in results.items():
+                merged[command][0] = type
+                merged[command][1].extend(failed)
+        for command in shardChecks:
+            type, failed = merged[command]
+            failed.sort(key=lambda result: result[0])
+            errors = defaultdict(mcco.ComponentSet)
+            for index, starts, ends in failed:
+                errors[transforms[index]] = mcco.ComponentSet.fromRuns(starts, ends)
+            diagnostics[command] = {"type": type, "uuids": errors}
+
+    if sceneChecks:
+        diagnostics.update(mce.run(sceneChecks))
+    return diagnostics
+
+
+def checkFile(path, checks, workers=None):
+    # Report in the format of modelChecker_batch loaders.
+    import modelChecker.modelChecker_engine as mce
+    import modelChecker.modelChecker_offline as mco
+    import modelChecker.modelChecker_standin as standin
+    mcb.use("standin")
+    standin.scene.new()
+    meshes = list(mco.readMeshes(path))
+    transforms = []
+    for mesh in meshes:
+        transforms.append(standin.scene.createMesh(
+            mesh.points, mesh.polygonCounts, mesh.polygonConnects,
+            mesh.us, mesh.vs, mesh.uvCounts, mesh.uvIds, name=mesh.name).uuid)
+    supported = [command for command in checks if mcreg.supported(command, "standin")]
+    diagnostics = runSharded(meshes, transforms, supported, workers)
+    report = {}
+    for command in checks:
+        if command in diagnostics:
+            errors = diagnostics[command]
+            report[command] = {"type": errors["type"], "errors": mce.parseErrors(errors)}
+        else:
+            report[command] = mco.skipped(command)
+    return report
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Check the meshes of large OBJ or PLY files on a process pool.")
+    parser.add_argument("paths", nargs="+", help="OBJ or PLY files")
+    parser.add_argument("--checks", help="Comma separated checks, all checks by default")
+    parser.add_argument("--workers", type=int, help="Worker processes, one per core by default")
+    args = parser.parse_args(args)
+
+    mcreg.loadPlugins()
+    checks = args.checks.split(",") if args.checks else sorted(mcl.mcCommandsList)
+    unknown = [check for check in checks if check not in mcl.mcCommandsList]
+    if unknown:
+        parser.error("Unknown checks: {}".format(", ".join(unknown)))
+    for path in args.paths:
+        record = {"file": path, "diagnostics": checkFile(path, checks, args.workers)}
+        sys.stdout.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
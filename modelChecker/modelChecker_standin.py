@@ -0,0 +1,937 @@
+import sys
+import uuid as uuidlib
+from collections import defaultdict
+from itertools import count
+
+import numpy as np
+
+import modelChecker.modelChecker_components as mcco
+import modelChecker.modelChecker_kernels as mck
+
+# Stand-in
+#     An in-memory scene that answers the subset of maya.api.OpenMaya and
+#     maya.cmds the checks use, so they can run without Maya. The module
+#     itself is the "om" of the "standin" backend, see modelChecker_backend,
+#     and its cmds object is the "cmds".
+#
+#     Meshes are NumPy buffers in the layout MFnMesh returns. Their topology
+#     (edges, face areas, lamina and starlike faces, edge and vertex valence)
+#     is derived once, in bulk, the first time an iterator needs it. Edge ids
+#     follow the order in which faces first use an edge.
+#
+#     Scenes are built with the functions of the scene object:
+#         scene.new()
+#         transform = scene.createMesh(points, polygonCounts, polygonConnects,
+#                                      us, vs, uvCounts, uvIds, name="pCube1")
+#         scene.createNode("transform", "group1")
+#         scene.setAttr(transform, "translate", [0.0, 1.0, 0.0])
+#     World space transforms compose by adding translations and rotations and
+#     multiplying scales, which is all the node checks compare.
+
+
+class MFn(object):
+    kInvalid = 0
+    kWorld = 1
+    kTransform = 2
+    kShape = 3
+    kMesh = 4
+    kCamera = 5
+    kMeshVertComponent = 6
+    kMeshEdgeComponent = 7
+    kMeshPolygonComponent = 8
+    kMeshMapComponent = 9
+
+
+COMPONENT_NAMES = {
+    MFn.kMeshVertComponent: "vtx",
+    MFn.kMeshEdgeComponent: "e",
+    MFn.kMeshPolygonComponent: "f",
+    MFn.kMeshMapComponent: "map",
+}
+
+
+FUNCTION_SETS = {
+    "world": (MFn.kWorld,),
+    "transform": (MFn.kTransform,),
+    "mesh": (MFn.kShape, MFn.kMesh),
+    "camera": (MFn.kShape, MFn.kCamera),
+}
+
+DAG_TYPES = ("world", "transform", "mesh", "camera")
+
+
+class MObject(object):
+    type = None
+
+    def hasFn(self, kind):
+        return kind in FUNCTION_SETS.get(self.type, ())
+
+    def isNull(self):
+        return self.type is None
+
+
+class MUuid(object):
+    def __init__(self, value):
+        self._value = value
+
+    def asString(self):
+        return self._value
+
+
+class MPoint(object):
+    __slots__ = ("x", "y", "z", "w")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = w
+
+
+class Node(MObject):
+    def __init__(self, type, name, uuid=None):
+        self.type = type
+        self.name = name
+        self.uuid = uuid if uuid is not None else str(uuidlib.uuid4()).upper()
+        self.parents = []
+        self.children = []
+        self.connections = []
+        self.history = []
+        self.attributes = {}
+        self.mesh = None
+
+    @property
+    def isDag(self):
+        return self.type in DAG_TYPES
+
+    def paths(self):
+        # Every path from the world to the node, as tuples of nodes.
+        if self.type == "world":
+            return [()]
+        paths = []
+        for parent in self.parents:
+            paths.extend(path + (self,) for path in parent.paths())
+        return paths
+
+
+def _pathName(path):
+    return "|" + "|".join(node.name for node in path)
+
+
+class MeshData(object):
+    def __init__(self, points, polygonCounts, polygonConnects, us, vs, uvCounts, uvIds, hardEdges=None):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.polygonCounts = np.asarray(polygonCounts, dtype=np.int32)
+        self.polygonConnects = np.asarray(polygonConnects, dtype=np.int32)
+        self.us = np.asarray(us, dtype=np.float64)
+        self.vs = np.asarray(vs, dtype=np.float64)
+        self.uvCounts = np.asarray(uvCounts, dtype=np.int32)
+        self.uvIds = np.asarray(uvIds, dtype=np.int32)
+        self.hardEdges = hardEdges
+        self.uvSets = {}
+        self._topology = None
+
+    def addUVSet(self, name, us, vs, uvCounts, uvIds):
+        self.uvSets[name] = (np.asarray(us, dtype=np.float64), np.asarray(vs, dtype=np.float64),
+                             np.asarray(uvCounts, dtype=np.int32), np.asarray(uvIds, dtype=np.int32))
+
+    def uvSet(self, name=None):
+        # (us, vs, uvCounts, uvIds), "map1" is the set given to the constructor.
+        if name is None or name == "map1":
+            return self.us, self.vs, self.uvCounts, self.uvIds
+        if name not in self.uvSets:
+            raise RuntimeError("(kInvalidParameter): UV set {} does not exist".format(name))
+        return self.uvSets[name]
+
+    def topology(self):
+        if self._topology is None:
+            self._topology = MeshTopology(self)
+        return self._topology
+
+
+class MeshTopology(object):
+    def __init__(self, mesh):
+        counts = mesh.polygonCounts
+        connects = mesh.polygonConnects
+        points = mesh.points
+        numFaces = len(counts)
+        self.faceOffsets = np.cumsum(counts) - counts
+        self.uvOffsets = np.cumsum(mesh.uvCounts) - mesh.uvCounts
+        faceOf = np.repeat(np.arange(numFaces), counts)
+        corners = np.arange(len(connects))
+        position = corners - self.faceOffsets[faceOf]
+        nextCorner = self.faceOffsets[faceOf] + (position + 1) % counts[faceOf]
+        start, end = connects, connects[nextCorner]
+
+        low = np.minimum(start, end).astype(np.int64)
+        high = np.maximum(start, end).astype(np.int64)
+        keys = low * max(len(points), 1) + high
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        order = np.argsort(first, kind="mergesort")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        cornerEdge = rank[inverse.ravel()]
+        self.edges = np.stack((start[first[order]], end[first[order]]), axis=1)
+
+        numEdges = len(self.edges)
+        faceEdges = np.unique(faceOf.astype(np.int64) * max(numEdges, 1) + cornerEdge)
+        self.edgeFaceCounts = np.bincount(faceEdges % max(numEdges, 1), minlength=numEdges)
+        self.vertexEdgeCounts = np.bincount(self.edges.ravel(), minlength=len(points))
+        self.edgeLengths = np.linalg.norm(points[self.edges[:, 0]] - points[self.edges[:, 1]], axis=1)
+        if mesh.hardEdges is None:
+            self.smooth = np.ones(numEdges, dtype=bool)
+        else:
+            self.smooth = ~np.asarray(mesh.hardEdges, dtype=bool)
+
+        if numFaces:
+            # Newell's method, the length of the summed cross products is twice the area.
+            p, q = points[start], points[end]
+            normals = np.add.reduceat(np.cross(p, q), self.faceOffsets)
+            self.areas = np.linalg.norm(normals, axis=1) / 2.0
+            centres = np.add.reduceat(p, self.faceOffsets) / counts[:, None]
+            fan = np.cross(p - centres[faceOf], q - centres[faceOf])
+            facing = (fan * normals[faceOf]).sum(axis=1)
+            self.starlike = np.minimum.reduceat(facing, self.faceOffsets) >= 0.0
+        else:
+            self.areas = np.zeros(0)
+            self.starlike = np.zeros(0, dtype=bool)
+
+        # Faces are lamina when another face uses exactly the same vertices.
+        self.lamina = np.zeros(numFaces, dtype=bool)
+        for sides in np.unique(counts):
+            faces = np.nonzero(counts == sides)[0]
+            vertices = np.sort(connects[self.faceOffsets[faces][:, None] + np.arange(sides)], axis=1)
+            _, inverse, occurrences = np.unique(vertices, axis=0, return_inverse=True, return_counts=True)
+            self.lamina[faces] = occurrences[inverse.ravel()] > 1
+
+
+class Scene(object):
+    def __init__(self):
+        self._callbacks = {}
+        self._callbackIds = count(1)
+        self.nodes = {}
+        self.new()
+
+    def new(self):
+        for node in list(self.nodes.values()):
+            self._notify("nodeRemoved", node)
+        self.world = Node("world", "", uuid="")
+        self.nodes = {}
+        self._index = None
+        self.selection = None
+        for camera in ("persp", "top", "front", "side"):
+            transform = self.createNode("transform", camera)
+            self.createNode("camera", camera + "Shape", transform)
+        self.createNode("shadingEngine", "initialShadingGroup")
+
+    # Scene edits
+
+    def _uniqueName(self, name, parent):
+        siblings = parent.children if parent else [node for node in self.nodes.values() if not node.isDag]
+        taken = set(node.name for node in siblings)
+        if name not in taken:
+            return name
+        base = name.rstrip("0123456789")
+        for index in count(1):
+            candidate = "{}{}".format(base, index)
+            if candidate not in taken:
+                return candidate
+
+    def createNode(self, type, name=None, parent=None):
+        node = Node(type, None)
+        if node.isDag:
+            parent = parent or self.world
+            node.name = self._uniqueName(name or type + "1", parent)
+            node.parents.append(parent)
+            parent.children.append(node)
+            self._notify("childAdded", node, parent)
+        else:
+            node.name = self._uniqueName(name or type + "1", None)
+        self.nodes[node.uuid] = node
+        self._notify("nodeAdded", node)
+        if node.isDag:
+            self._notify("dagChanged", node)
+        return node
+
+    def createMesh(self, points, polygonCounts, polygonConnects, us, vs, uvCounts, uvIds,
+                   name="polySurface1", parent=None, hardEdges=None):
+        transform = self.createNode("transform", name, parent)
+        shape = self.createNode("mesh", transform.name + "Shape", transform)
+        shape.mesh = MeshData(points, polygonCounts, polygonConnects, us, vs, uvCounts, uvIds, hardEdges)
+        self.connect(shape, self.byName("initialShadingGroup"))
+        return transform
+
+    def instance(self, node, parent):
+        node.parents.append(parent)
+        parent.children.append(node)
+        self._notify("childAdded", node, parent)
+        self._notify("dagChanged", node)
+
+    def parent(self, node, parent):
+        for previous in node.parents:
+            previous.children.remove(node)
+            self._notify("childRemoved", node, previous)
+        node.parents = [parent]
+        parent.children.append(node)
+        self._notify("childAdded", node, parent)
+        self._notify("dagChanged", node)
+
+    def rename(self, node, name):
+        previous = node.name
+        node.name = self._uniqueName(name, node.parents[0] if node.isDag else None)
+        self._notify("nameChanged", node, previous)
+
+    def delete(self, node):
+        for child in list(node.children):
+            if child.parents == [node]:
+                self.delete(child)
+        for parent in node.parents:
+            parent.children.remove(node)
+            self._notify("childRemoved", node, parent)
+        for other in node.connections:
+            other.connections = [connected for connected in other.connections if connected is not node]
+        del self.nodes[node.uuid]
+        self._notify("nodeRemoved", node)
+        if node.isDag:
+            self._notify("dagChanged", node)
+
+    def connect(self, source, destination):
+        source.connections.append(destination)
+        destination.connections.append(source)
+        self._notify("attributeChanged", source)
+        self._notify("attributeChanged", destination)
+
+    def disconnect(self, source, destination):
+        source.connections.remove(destination)
+        destination.connections.remove(source)
+        self._notify("attributeChanged", source)
+        self._notify("attributeChanged", destination)
+
+    def setAttr(self, node, attribute, value):
+        node.attributes[attribute] = list(value)
+        self._notify("attributeChanged", node)
+
+    def setMesh(self, shape, *args, **kwargs):
+        shape.mesh = MeshData(*args, **kwargs)
+        self._notify("nodeDirty", shape)
+        self._notify("topologyChanged", shape)
+
+    # Lookups
+
+    def _lookup(self):
+        # Full paths, and the (full path, path) pairs of every leaf name.
+        if self._index is None:
+            byPath = {}
+            byLeaf = defaultdict(list)
+            for path in self.dagPaths():
+                fullPath = _pathName(path)
+                byPath[fullPath] = path[-1]
+                byLeaf[path[-1].name].append((fullPath, path))
+            for node in self.nodes.values():
+                if not node.isDag:
+                    byPath[node.name] = node
+            self._index = byPath, byLeaf
+        return self._index
+
+    def byName(self, name):
+        # Full path, partial path, leaf name or UUID.
+        node = self.nodes.get(name)
+        if node:
+            return node
+        byPath, byLeaf = self._lookup()
+        if name.startswith("|") or name in byPath:
+            return byPath.get(name)
+        suffix = "|" + name
+        matches = set(path[-1] for fullPath, path in byLeaf.get(name.rsplit("|", 1)[-1], ())
+                      if fullPath.endswith(suffix))
+        return matches.pop() if len(matches) == 1 else None
+
+    def dagPaths(self):
+        paths = []
+        stack = [()]
+        while stack:
+            path = stack.pop()
+            if path:
+                paths.append(path)
+            children = path[-1].children if path else self.world.children
+            stack.extend(path + (child,) for child in reversed(children))
+        return paths
+
+    def partialName(self, path):
+        # Shortest path suffix that names only this node.
+        full = _pathName(path)
+        _, byLeaf = self._lookup()
+        others = [fullPath for fullPath, other in byLeaf[path[-1].name] if other[-1] is not path[-1]]
+        for start in range(len(path) - 1, -1, -1):
+            suffix = "|".join(node.name for node in path[start:])
+            if not any(other == "|" + suffix or other.endswith("|" + suffix) for other in others):
+                return suffix
+        return full
+
+    def worldTransform(self, node, attribute, default):
+        path = node.paths()[0] if node.isDag else (node,)
+        values = list(default)
+        for transform in path:
+            local = transform.attributes.get(attribute, default)
+            if attribute == "scale":
+                values = [a * b for a, b in zip(values, local)]
+            else:
+                values = [a + b for a, b in zip(values, local)]
+        return values
+
+    # Callbacks
+
+    def addCallback(self, kind, function, node=None):
+        callbackId = next(self._callbackIds)
+        self._callbacks[callbackId] = (kind, node, function)
+        return callbackId
+
+    def removeCallback(self, callbackId):
+        self._callbacks.pop(callbackId, None)
+
+    def _notify(self, kind, node, *args):
+        if kind in ("nodeAdded", "nodeRemoved", "nameChanged", "dagChanged"):
+            self._index = None
+        for callbackKind, watched, function in list(self._callbacks.values()):
+            if callbackKind == kind and (watched is None or watched is node):
+                function(node, *args)
+
+
+scene = Scene()
+
+
+# OpenMaya
+
+class MDagPath(object):
+    def __init__(self, path=()):
+        self._path = path._path if isinstance(path, MDagPath) else tuple(path)
+
+    def node(self):
+        return self._path[-1] if self._path else scene.world
+
+    def childCount(self):
+        return len(self.node().children)
+
+    def child(self, index):
+        return self.node().children[index]
+
+    def push(self, child):
+        self._path += (child,)
+
+    def fullPathName(self):
+        return _pathName(self._path) if self._path else ""
+
+    def partialPathName(self):
+        return scene.partialName(self._path) if self._path else ""
+
+
+def _node(target):
+    if isinstance(target, MDagPath):
+        return target.node()
+    return target
+
+
+def _mesh(target):
+    # Like Maya, a transform stands for its first mesh shape.
+    node = _node(target)
+    if node.mesh is None:
+        for child in node.children:
+            if child.mesh is not None:
+                return child.mesh
+        raise RuntimeError("(kInvalidParameter): Object is incompatible with this method")
+    return node.mesh
+
+
+class MFnDependencyNode(object):
+    def __init__(self, target=None):
+        self._node = _node(target)
+
+    def uuid(self):
+        return MUuid(self._node.uuid)
+
+    def name(self):
+        return self._node.name
+
+    @property
+    def typeName(self):
+        return self._node.type
+
+    def setName(self, name):
+        scene.rename(self._node, name)
+        return self._node.name
+
+
+class MFnDagNode(MFnDependencyNode):
+    def parentCount(self):
+        return len(self._node.parents)
+
+    def parent(self, index):
+        return self._node.parents[index]
+
+    def childCount(self):
+        return len(self._node.children)
+
+    def child(self, index):
+        return self._node.children[index]
+
+    def fullPathName(self):
+        return _pathName(self._node.paths()[0])
+
+    @property
+    def isIntermediateObject(self):
+        return bool(self._node.attributes.get("intermediateObject"))
+
+
+class MComponent(MObject):
+    def __init__(self, type):
+        self.componentType = type
+        self.elements = []
+
+    def hasFn(self, kind):
+        return kind == self.componentType
+
+    def isNull(self):
+        return False
+
+
+class MFnSingleIndexedComponent(object):
+    def __init__(self, component=None):
+        self._component = component
+
+    def create(self, type):
+        self._component = MComponent(type)
+        return self._component
+
+    def addElements(self, elements):
+        self._component.elements.extend(int(element) for element in elements)
+        return self
+
+    def getElements(self):
+        return list(self._component.elements)
+
+    @property
+    def elementCount(self):
+        return len(self._component.elements)
+
+
+class MSelectionList(object):
+    def __init__(self):
+        self._paths = []
+        self._components = []
+
+    def add(self, item):
+        component = None
+        if isinstance(item, tuple):
+            item, component = item
+        if not isinstance(item, MDagPath):
+            node = scene.byName(item) if isinstance(item, str) else item
+            if node is None or not node.isDag:
+                raise RuntimeError("(kInvalidParameter): Object does not exist")
+            item = MDagPath(node.paths()[0])
+        self._paths.append(item)
+        self._components.append(component)
+        return self
+
+    def clear(self):
+        self._paths = []
+        self._components = []
+
+    def getComponent(self, index):
+        return self._paths[index], self._components[index] or MObject()
+
+    def length(self):
+        return len(self._paths)
+
+    def isEmpty(self):
+        return not self._paths
+
+    def getDagPath(self, index):
+        return self._paths[index]
+
+
+class MItSelectionList(object):
+    def __init__(self, selectionList):
+        self._paths = list(selectionList._paths)
+        self._index = 0
+
+    def isDone(self):
+        return self._index >= len(self._paths)
+
+    def next(self):
+        self._index += 1
+
+    def getDagPath(self):
+        return self._paths[self._index]
+
+
+class MGlobal(object):
+    @staticmethod
+    def setActiveSelectionList(selectionList):
+        scene.selection = selectionList
+
+    @staticmethod
+    def getActiveSelectionList():
+        return scene.selection or MSelectionList()
+
+
+class MItDag(object):
+    # Depth first from the world, one stop for every path of instanced nodes.
+    def __init__(self, *args):
+        self._stack = []
+        self._current = ()
+        self._pruned = False
+        self._done = False
+
+    def isDone(self):
+        return self._done
+
+    def getPath(self):
+        return MDagPath(self._current)
+
+    def prune(self):
+        self._pruned = True
+
+    def next(self):
+        if not self._pruned:
+            children = self._current[-1].children if self._current else scene.world.children
+            self._stack.extend(self._current + (child,) for child in reversed(children))
+        self._pruned = False
+        if self._stack:
+            self._current = self._stack.pop()
+        else:
+            self._done = True
+
+
+class MFnMesh(object):
+    def __init__(self, target):
+        self._mesh = _mesh(target)
+
+    @property
+    def numVertices(self):
+        return len(self._mesh.points)
+
+    @property
+    def numPolygons(self):
+        return len(self._mesh.polygonCounts)
+
+    @property
+    def numEdges(self):
+        return len(self._mesh.topology().edges)
+
+    def numUVs(self):
+        return len(self._mesh.us)
+
+    def getPoints(self, space=None):
+        return [MPoint(x, y, z) for x, y, z in self._mesh.points.tolist()]
+
+    def getVertices(self):
+        return self._mesh.polygonCounts.tolist(), self._mesh.polygonConnects.tolist()
+
+    def getEdgeVertices(self, edgeId):
+        start, end = self._mesh.topology().edges[edgeId]
+        return int(start), int(end)
+
+    def getUVSetNames(self):
+        return ["map1"] + sorted(self._mesh.uvSets)
+
+    def getUVs(self, uvSet=None):
+        us, vs, _, _ = self._mesh.uvSet(uvSet)
+        return us.tolist(), vs.tolist()
+
+    def getAssignedUVs(self, uvSet=None):
+        _, _, uvCounts, uvIds = self._mesh.uvSet(uvSet)
+        return uvCounts.tolist(), uvIds.tolist()
+
+
+class _ComponentIterator(object):
+    def __init__(self, target):
+        self._mesh = _mesh(target)
+        self._topology = self._mesh.topology()
+        self._index = 0
+
+    def isDone(self):
+        return self._index >= self.count()
+
+    def next(self):
+        self._index += 1
+
+    def index(self):
+        return self._index
+
+    def reset(self):
+        self._index = 0
+
+
+class MItMeshPolygon(_ComponentIterator):
+    def count(self):
+        return len(self._mesh.polygonCounts)
+
+    def polygonVertexCount(self):
+        return int(self._mesh.polygonCounts[self._index])
+
+    def isLamina(self):
+        return bool(self._topology.lamina[self._index])
+
+    def getArea(self, space=None):
+        return float(self._topology.areas[self._index])
+
+    def isStarlike(self):
+        return bool(self._topology.starlike[self._index])
+
+    def hasUVs(self, uvSet=None):
+        return bool(self._mesh.uvCounts[self._index] > 0)
+
+    def getUVs(self, uvSet=None):
+        uvCount = self._mesh.uvCounts[self._index]
+        if not uvCount:
+            raise RuntimeError("(kFailure): Object does not exist")
+        offset = self._topology.uvOffsets[self._index]
+        uvIds = self._mesh.uvIds[offset:offset + uvCount]
+        return self._mesh.us[uvIds].tolist(), self._mesh.vs[uvIds].tolist()
+
+
+class MItMeshEdge(_ComponentIterator):
+    def count(self):
+        return len(self._topology.edges)
+
+    @property
+    def isSmooth(self):
+        return bool(self._topology.smooth[self._index])
+
+    def onBoundary(self):
+        return bool(self._topology.edgeFaceCounts[self._index] == 1)
+
+    def length(self, space=None):
+        return float(self._topology.edgeLengths[self._index])
+
+    def numConnectedFaces(self):
+        return int(self._topology.edgeFaceCounts[self._index])
+
+
+class MItMeshVertex(_ComponentIterator):
+    def count(self):
+        return len(self._mesh.points)
+
+    def numConnectedEdges(self):
+        return int(self._topology.vertexEdgeCounts[self._index])
+
+
+class MMessage(object):
+    @staticmethod
+    def removeCallback(callbackId):
+        scene.removeCallback(callbackId)
+
+
+def _watched(node):
+    return None if node is None or node.isNull() else node
+
+
+class MNodeMessage(MMessage):
+    @staticmethod
+    def addNameChangedCallback(node, function):
+        return scene.addCallback("nameChanged", function, _watched(node))
+
+    @staticmethod
+    def addAttributeChangedCallback(node, function):
+        return scene.addCallback("attributeChanged", function, _watched(node))
+
+    @staticmethod
+    def addNodeDirtyCallback(node, function):
+        return scene.addCallback("nodeDirty", function, _watched(node))
+
+
+class MDGMessage(MMessage):
+    @staticmethod
+    def addNodeAddedCallback(function, nodeType="dependNode"):
+        return scene.addCallback("nodeAdded", function)
+
+    @staticmethod
+    def addNodeRemovedCallback(function, nodeType="dependNode"):
+        return scene.addCallback("nodeRemoved", function)
+
+
+def _childCallback(function):
+    # Maya passes (child, parent, clientData) as paths.
+    def callback(child, parent):
+        parentPath = parent.paths()[0] if parent.paths() else ()
+        function(MDagPath(parentPath + (child,)), MDagPath(parentPath), None)
+    return callback
+
+
+class MDagMessage(MMessage):
+    @staticmethod
+    def addAllDagChangesCallback(function):
+        return scene.addCallback("dagChanged", function)
+
+    @staticmethod
+    def addChildAddedCallback(function):
+        return scene.addCallback("childAdded", _childCallback(function))
+
+    @staticmethod
+    def addChildRemovedCallback(function):
+        return scene.addCallback("childRemoved", _childCallback(function))
+
+
+class MPolyMessage(MMessage):
+    @staticmethod
+    def addPolyTopologyChangedCallback(node, function):
+        return scene.addCallback("topologyChanged", function, _watched(node))
+
+
+# maya.cmds
+
+def _arguments(args):
+    names = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            names.extend(arg)
+        else:
+            names.append(arg)
+    return names
+
+
+def _flag(kwargs, *names):
+    for name in names:
+        if name in kwargs:
+            return kwargs[name]
+    return None
+
+
+class Commands(object):
+    def _nodes(self, args):
+        nodes = []
+        for name in _arguments(args):
+            node = scene.byName(name)
+            if node is not None:
+                nodes.append(node)
+        return nodes
+
+    def _name(self, node, long=False):
+        if not node.isDag:
+            return node.name
+        path = node.paths()[0]
+        return _pathName(path) if long else scene.partialName(path)
+
+    def ls(self, *args, **kwargs):
+        if args:
+            nodes = self._nodes(args)
+        elif _flag(kwargs, "selection", "sl"):
+            return self._selection(kwargs)
+        else:
+            nodes = list(scene.nodes.values())
+        nodeType = _flag(kwargs, "type", "typ")
+        if nodeType:
+            types = nodeType if isinstance(nodeType, (list, tuple)) else [nodeType]
+            nodes = [node for node in nodes if node.type in types]
+        if kwargs.get("uuid"):
+            return [node.uuid for node in nodes]
+        return [self._name(node, _flag(kwargs, "long", "l")) for node in nodes]
+
+    def _selection(self, kwargs):
+        selected = []
+        selection = MGlobal.getActiveSelectionList()
+        for index in range(selection.length()):
+            dagPath, component = selection.getComponent(index)
+            if kwargs.get("uuid"):
+                selected.append(dagPath.node().uuid)
+                continue
+            name = dagPath.fullPathName() if _flag(kwargs, "long", "l") else dagPath.partialPathName()
+            if component.isNull():
+                selected.append(name)
+            else:
+                kind = COMPONENT_NAMES[component.componentType]
+                selected.extend("{}.{}[{}]".format(name, kind, element) for element in component.elements)
+        return selected
+
+    def select(self, *args, **kwargs):
+        # Node names only, components go through MGlobal.setActiveSelectionList.
+        selection = MSelectionList()
+        if not _flag(kwargs, "clear", "cl"):
+            for node in self._nodes(args):
+                selection.add(node)
+        MGlobal.setActiveSelectionList(selection)
+
+    def listRelatives(self, *args, **kwargs):
+        relatives = []
+        for node in self._nodes(args):
+            if _flag(kwargs, "parent", "p"):
+                relatives.extend(parent for parent in node.parents if parent.type != "world")
+            else:
+                children = node.children
+                if _flag(kwargs, "shapes", "s"):
+                    children = [child for child in children if child.hasFn(MFn.kShape)]
+                relatives.extend(children)
+        nodeType = _flag(kwargs, "type", "typ")
+        if nodeType:
+            relatives = [node for node in relatives if node.type == nodeType]
+        if not relatives:
+            return None
+        return [self._name(node, _flag(kwargs, "fullPath", "f")) for node in relatives]
+
+    def listConnections(self, *args, **kwargs):
+        connected = []
+        for node in self._nodes(args):
+            connected.extend(node.connections)
+        nodeType = _flag(kwargs, "type", "t")
+        if nodeType:
+            connected = [node for node in connected if node.type == nodeType]
+        return [self._name(node) for node in connected]
+
+    def listHistory(self, *args, **kwargs):
+        history = []
+        for node in self._nodes(args):
+            history.append(node)
+            history.extend(node.history)
+        return [self._name(node) for node in history]
+
+    def xform(self, name, **kwargs):
+        node = scene.byName(name)
+        if node is None:
+            raise ValueError("No object matches name: {}".format(name))
+        if _flag(kwargs, "translation", "t"):
+            return scene.worldTransform(node, "translate", [0.0, 0.0, 0.0])
+        if _flag(kwargs, "rotation", "ro"):
+            return scene.worldTransform(node, "rotate", [0.0, 0.0, 0.0])
+        if _flag(kwargs, "scale", "s"):
+            return scene.worldTransform(node, "scale", [1.0, 1.0, 1.0])
+        if _flag(kwargs, "rotatePivot", "rp"):
+            translation = scene.worldTransform(node, "translate", [0.0, 0.0, 0.0])
+            pivot = node.attributes.get("rotatePivot", [0.0, 0.0, 0.0])
+            return [a + b for a, b in zip(translation, pivot)]
+        raise ValueError("xform in the stand-in only queries translation, rotation, scale and rotatePivot")
+
+    def polyUVOverlap(self, *args, **kwargs):
+        # Overlapping faces of the current UV set of whole meshes, found by the
+        # kernel of the numpy implementation.
+        if not _flag(kwargs, "overlappingComponents", "oc"):
+            raise ValueError("polyUVOverlap in the stand-in only queries overlappingComponents")
+        overlapping = []
+        for name in _arguments(args):
+            shapeName = name.split(".")[0]
+            node = scene.byName(shapeName)
+            if node is None or node.mesh is None:
+                raise ValueError("No object matches name: {}".format(name))
+            us, vs, uvCounts, uvIds = node.mesh.uvSet()
+            faces = mcco.ComponentSet(mck.uvOverlap(uvCounts, uvIds, us, vs))
+            overlapping.extend("{}.f[{}]".format(shapeName, run) for run in faces.formatRuns())
+        return overlapping or None
+
+    def warning(self, message):
+        sys.stderr.write("# Warning: {}\n".format(message))
+
+    def file(self, *args, **kwargs):
+        # New scenes, and OBJ and PLY files opened through modelChecker_offline.
+        if kwargs.get("new"):
+            scene.new()
+            return None
+        if _flag(kwargs, "open", "o") and args:
+            import modelChecker.modelChecker_offline as mco
+            try:
+                mco.loadFile(args[0])
+            except (IOError, ValueError) as error:
+                raise RuntimeError("Could not open file: {}: {}".format(args[0], error))
+            return args[0]
+        raise RuntimeError("The stand-in only creates new scenes and opens OBJ and PLY files")
+
+
+cmds = Commands()
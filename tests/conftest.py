@@ -0,0 +1,88 @@
+import pytest
+
+import modelChecker.modelChecker_backend as mcb
+
+mcb.use("standin")
+
+import modelChecker.modelChecker_benchmark as mcbm
+import modelChecker.modelChecker_commands as mcc
+import modelChecker.modelChecker_engine as mce
+import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_standin as standin
+
+# Every test runs on an empty stand-in scene.
+MESH_CHECKS = sorted(command for command, data in mcl.mcCommandsList.items() if data.get('scope') == 'mesh')
+
+
+@pytest.fixture(autouse=True)
+def scene():
+    mcb.use("standin")
+    standin.scene.new()
+    previous = mcc.implementation
+    yield standin.scene
+    mcc.implementation = previous
+    standin.scene.new()
+
+
+def addMesh(mesh, name, parent=None):
+    # Adds a benchmark SyntheticMesh to the stand-in scene.
+    return standin.scene.createMesh(
+        mesh.points, mesh.polygonCounts, mesh.polygonConnects,
+        mesh.us, mesh.vs, mesh.uvCounts, mesh.uvIds, name=name, parent=parent)
+
+
+@pytest.fixture
+def meshes(scene):
+    # Three meshes of different sizes with planted defects, and one group.
+    transforms = [addMesh(mcbm.syntheticMesh(faces, 5), "mesh{}".format(index))
+                  for index, faces in enumerate((200, 400, 800))]
+    scene.createNode("transform", "group")
+    return transforms
+
+
+@pytest.fixture
+def copies(scene):
+    # An instanced shape and an identical copy of the same mesh.
+    mesh = mcbm.syntheticMesh(200, 5)
+    tris = addMesh(mesh, "tris")
+    scene.instance(tris.children[0], scene.createNode("transform", "grp"))
+    addMesh(mesh, "copy")
+    addMesh(mcbm.syntheticMesh(400, 5), "other")
+    return tris
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    # mcCommandsList, restored after the test.
+    monkeypatch.setattr(mcl, "mcCommandsList", dict(mcl.mcCommandsList))
+    return mcl.mcCommandsList
+
+
+
+def report(diagnostics, checks=None):
+    # {command: [... "mesh1.f[0:3]"]} to compare runs by.
+    return dict((command, sorted(mce.parseErrors(diagnostics[command])))
+                for command in checks or diagnostics)
+
+
+def writeObj(path, groups):
+    # groups: [(name, SyntheticMesh), ...], names may repeat.
+    lines = []
+    pointOffset = uvOffset = 0
+    for name, mesh in groups:
+        lines.append("g {}".format(name))
+        points = mesh.points
+        for i in range(0, len(points), 3):
+            lines.append("v {!r} {!r} {!r}".format(points[i], points[i + 1], points[i + 2]))
+        for u, v in zip(mesh.us, mesh.vs):
+            lines.append("vt {!r} {!r}".format(u, v))
+        corner = 0
+        for count in mesh.polygonCounts:
+            lines.append("f " + " ".join(
+                "{}/{}".format(mesh.polygonConnects[corner + k] + 1 + pointOffset, mesh.uvIds[corner + k] + 1 + uvOffset)
+                for k in range(count)))
+            corner += count
+        pointOffset += len(points) // 3
+        uvOffset += len(mesh.us)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
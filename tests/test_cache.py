@@ -0,0 +1,40 @@
+import modelChecker.modelChecker_cache as mcca
+import modelChecker.modelChecker_engine as mce
+
+from conftest import report
+
+CHECKS = sorted(mcca.CACHEABLE)
+
+
+def test_cached_runs_match_fresh_runs(meshes, tmp_path):
+    cache = mcca.ResultCache(str(tmp_path / "results.sqlite"))
+    fresh = report(mce.run(CHECKS))
+    first = mce.run(CHECKS, None, {"cache": cache})
+    second = mce.run(CHECKS, None, {"cache": cache})
+    assert report(first) == fresh
+    assert report(second) == fresh
+    assert first.cache == {"hits": 0, "misses": len(meshes) * len(CHECKS)}
+    assert second.cache == {"hits": len(meshes) * len(CHECKS), "misses": 0}
+
+
+def test_hits_are_resolved_per_mesh_and_check(meshes, tmp_path):
+    cache = mcca.ResultCache(str(tmp_path / "results.sqlite"))
+    mce.run(["triangles"], None, {"cache": cache})
+    diagnostics = mce.run(["triangles", "ngons"], None, {"cache": cache})
+    assert diagnostics.cache == {"hits": len(meshes), "misses": len(meshes)}
+    assert report(diagnostics) == report(mce.run(["triangles", "ngons"]))
+
+
+def test_truncated_results_are_not_stored(meshes, tmp_path):
+    cache = mcca.ResultCache(str(tmp_path / "results.sqlite"))
+    mce.run(["triangles"], None, {"cache": cache, "maxPerMesh": 1})
+    diagnostics = mce.run(["triangles"], None, {"cache": cache})
+    assert diagnostics.cache == {"hits": 0, "misses": len(meshes)}
+    assert report(diagnostics) == report(mce.run(["triangles"]))
+
+
+def test_eviction_keeps_the_cache_under_its_size(meshes, tmp_path):
+    cache = mcca.ResultCache(str(tmp_path / "results.sqlite"), maxBytes=200)
+    mce.run(CHECKS, None, {"cache": cache})
+    size = cache.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+    assert size <= 200
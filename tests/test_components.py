@@ -0,0 +1,28 @@
+import pytest
+
+import modelChecker.modelChecker_components as mcco
+
+
+@pytest.fixture(params=(True, False), ids=("numpy", "python"))
+def numpy(request, monkeypatch):
+    monkeypatch.setattr(mcco, "HAS_NUMPY", request.param and mcco.HAS_NUMPY)
+
+
+@pytest.mark.parametrize("ids", ([], [3], [5, 1, 2, 3, 9, 10, 2], list(range(100))))
+def test_runs_hold_every_id_once(numpy, ids):
+    components = mcco.ComponentSet(ids)
+    assert list(components) == sorted(set(ids))
+    assert len(components) == len(set(ids))
+
+
+def test_extend_merges_runs(numpy):
+    components = mcco.ComponentSet([1, 2, 3])
+    components.extend([4, 5, 9])
+    components.extend(mcco.ComponentSet([0, 7]))
+    assert components.formatRuns() == ["0:5", "7", "9"]
+    assert 7 in components and 8 not in components
+
+
+def test_run_bytes_round_trip(numpy):
+    components = mcco.ComponentSet([0, 1, 2, 7, 8, 20])
+    assert mcco.ComponentSet.fromRuns(*components.runBytes()) == components
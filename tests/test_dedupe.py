@@ -0,0 +1,11 @@
+import pytest
+
+import modelChecker.modelChecker_engine as mce
+
+from conftest import MESH_CHECKS, report
+
+
+@pytest.mark.parametrize("dedupe", ("instances", "geometry"))
+def test_dedupe_keeps_results(copies, dedupe):
+    deduped = report(mce.run(MESH_CHECKS, None, {"dedupe": dedupe}))
+    assert deduped == report(mce.run(MESH_CHECKS, None, {"dedupe": False}))
@@ -0,0 +1,36 @@
+import pytest
+
+import modelChecker.modelChecker_benchmark as mcbm
+import modelChecker.modelChecker_commands as mcc
+import modelChecker.modelChecker_engine as mce
+import modelChecker.modelChecker_list as mcl
+
+from conftest import MESH_CHECKS, addMesh, report
+
+
+def test_api_and_numpy_agree(meshes):
+    mcc.setImplementation("api")
+    api = report(mce.run(MESH_CHECKS))
+    mcc.setImplementation("numpy")
+    assert report(mce.run(MESH_CHECKS)) == api
+
+
+@pytest.mark.parametrize("implementation", mcc.IMPLEMENTATIONS)
+def test_planted_defects_are_found(implementation):
+    mesh = mcbm.syntheticMesh(2000, 10)
+    addMesh(mesh, "benchmarkMesh")
+    mcc.setImplementation(implementation)
+    diagnostics = mce.run(sorted(mesh.defects))
+    found = dict((command, sum(mce.countComponents(diagnostics[command]).values())) for command in mesh.defects)
+    assert found == mesh.defects
+
+
+def test_fused_and_profiled_runs_agree(meshes):
+    checks = sorted(mcl.mcCommandsList)
+    assert report(mce.run(checks)) == report(mce.run(checks, None, {"profile": True}))
+
+
+@pytest.mark.parametrize("workers", (1, 4))
+def test_kernel_threads_keep_results(meshes, workers):
+    checks = sorted(mcl.mcCommandsList)
+    assert report(mce.run(checks, None, {"workers": workers})) == report(mce.run(checks))
@@ -0,0 +1,51 @@
+import pytest
+
+import modelChecker.modelChecker_commands as mcc
+import modelChecker.modelChecker_engine as mce
+
+from conftest import report
+
+CHECKS = ["triangles", "lamina", "openEdges", "zeroLengthEdges", "uvRange"]
+
+
+@pytest.mark.parametrize("implementation", mcc.IMPLEMENTATIONS)
+def test_max_per_mesh(meshes, implementation):
+    mcc.setImplementation(implementation)
+    diagnostics = mce.run(CHECKS, None, {"maxPerMesh": 2})
+    for command in CHECKS:
+        counts = mce.countComponents(diagnostics[command])
+        assert len(counts) == len(meshes)
+        assert set(counts.values()) == {2}
+    assert diagnostics.truncated == set(CHECKS)
+
+
+@pytest.mark.parametrize("implementation", mcc.IMPLEMENTATIONS)
+def test_max_per_check(meshes, implementation):
+    mcc.setImplementation(implementation)
+    diagnostics = mce.run(CHECKS, None, {"maxPerCheck": 3})
+    for command in CHECKS:
+        assert sum(mce.countComponents(diagnostics[command]).values()) == 3
+    assert diagnostics.truncated == set(CHECKS)
+
+
+@pytest.mark.parametrize("implementation", mcc.IMPLEMENTATIONS)
+def test_fail_fast_stops_at_the_first_failure(meshes, implementation):
+    mcc.setImplementation(implementation)
+    diagnostics = mce.run(CHECKS, None, {"failFast": True})
+    assert diagnostics.aborted
+    assert sum(sum(mce.countComponents(errors).values()) for errors in diagnostics.values()) == 1
+
+
+def test_limits_keep_results_under_the_cap(meshes):
+    full = report(mce.run(CHECKS))
+    limited = report(mce.run(CHECKS, None, {"maxPerMesh": 1000}))
+    assert limited == full
+
+
+def test_recheck_runs_truncated_checks_again(meshes):
+    nodes = mce.allNodes()
+    truncated = mce.run(["triangles"], nodes, {"maxPerMesh": 2})
+    rechecked, pending = mce.recheck(truncated, nodes, ["triangles"], nodes, set())
+    assert report(rechecked) == report(mce.run(["triangles"], nodes))
+    assert not rechecked.truncated
+    assert not pending
@@ -0,0 +1,35 @@
+import modelChecker.modelChecker_benchmark as mcbm
+import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_offline as mco
+import modelChecker.modelChecker_registry as mcreg
+
+from conftest import writeObj
+
+
+def parts(tmp_path):
+    path = str(tmp_path / "parts.obj")
+    writeObj(path, [
+        ("part", mcbm.syntheticMesh(300, 3)),
+        ("part", mcbm.syntheticMesh(600, 3)),
+        ("base", mcbm.syntheticMesh(900, 3)),
+    ])
+    return path
+
+
+def test_batches_keep_the_report(scene, tmp_path):
+    path = parts(tmp_path)
+    checks = sorted(mcl.mcCommandsList)
+    whole = mco.OfflineLoader().check(path, checks)
+    batched = mco.OfflineLoader(batchFaces=1).check(path, checks)
+    assert batched == whole
+    assert batched["trailingNumbers"]["errors"] == ["part1"]
+    shapes = [scene.byName(name).children[0] for name in ("part", "part1", "base")]
+    assert [len(shape.mesh.polygonCounts) for shape in shapes] == [0, 0, 0]
+
+
+def test_checks_without_the_standin_are_skipped(commands, tmp_path):
+    mcreg.register("studioCheck", {"label": "Studio Check", "category": "studio", "type": "nodes",
+                                   "backends": ["maya"], "module": "studio_checks"})
+    report = mco.OfflineLoader().check(parts(tmp_path), ["triangles", "studioCheck"])
+    assert report["triangles"]["errors"]
+    assert report["studioCheck"]["skipped"]
@@ -0,0 +1,124 @@
+import pytest
+
+import modelChecker.modelChecker_benchmark as mcbm
+import modelChecker.modelChecker_dirty as mcd
+import modelChecker.modelChecker_engine as mce
+
+from conftest import addMesh, report
+
+CHECKS = [
+    "emptyGroups",
+    "parentGeometry",
+    "shaders",
+    "shapeNames",
+    "trailingNumbers",
+    "triangles",
+    "uncenteredPivots",
+    "unfrozenTransforms",
+]
+
+
+def translateParent(scene):
+    scene.setAttr(scene.byName("grp"), "translate", [1.0, 0.0, 0.0])
+
+
+def translateOutsideAncestor(scene):
+    scene.setAttr(scene.byName("root"), "translate", [0.0, 1.0, 0.0])
+
+
+def reparent(scene):
+    scene.parent(scene.byName("leaf"), scene.byName("grp"))
+
+
+def renameShape(scene):
+    scene.rename(scene.byName("trisShape"), "renamedShape")
+
+
+def assignShader(scene):
+    shape = scene.byName("trisShape")
+    scene.disconnect(shape, scene.byName("initialShadingGroup"))
+    scene.connect(shape, scene.createNode("shadingEngine", "blinnSG"))
+
+
+def changeTopology(scene):
+    mesh = mcbm.syntheticMesh(100, 1)
+    scene.setMesh(scene.byName("trisShape"), mesh.points, mesh.polygonCounts, mesh.polygonConnects,
+                  mesh.us, mesh.vs, mesh.uvCounts, mesh.uvIds)
+
+
+def deleteLeaf(scene):
+    scene.delete(scene.byName("leaf"))
+
+
+@pytest.mark.parametrize("edit", [
+    translateParent,
+    translateOutsideAncestor,
+    reparent,
+    renameShape,
+    assignShader,
+    changeTopology,
+    deleteLeaf,
+])
+def test_recheck_matches_a_full_run_after_an_edit(scene, edit):
+    root = scene.createNode("transform", "root")
+    grp = scene.createNode("transform", "grp", root)
+    scene.createNode("transform", "child", grp)
+    other = scene.createNode("transform", "other")
+    scene.createNode("transform", "leaf", other)
+    addMesh(mcbm.syntheticMesh(200, 5), "tris", grp)
+    nodes = [uuid for uuid in mce.allNodes() if uuid != root.uuid]
+
+    tracker = mcd.DirtyTracker()
+    try:
+        previous = mce.run(CHECKS, nodes)
+        tracker.watch(nodes)
+        edit(scene)
+        current = mce.existingNodes(nodes)
+        dirty = tracker.takeDirty(current)
+        rechecked, pending = mce.recheck(previous, nodes, CHECKS, current, dirty)
+    finally:
+        tracker.unwatch()
+    assert not pending
+    assert report(rechecked) == report(mce.run(CHECKS, current))
+
+
+def test_unedited_nodes_are_not_dirty(scene):
+    first = addMesh(mcbm.syntheticMesh(200, 5), "first")
+    second = addMesh(mcbm.syntheticMesh(200, 5), "second")
+    tracker = mcd.DirtyTracker()
+    try:
+        tracker.watch([first.uuid, second.uuid])
+        scene.setAttr(first, "translate", [1.0, 0.0, 0.0])
+        assert tracker.takeDirty([first.uuid, second.uuid]) == set([first.uuid])
+    finally:
+        tracker.unwatch()
+
+
+def test_cancelled_recheck_keeps_previous_results(scene):
+    nodes = [addMesh(mcbm.syntheticMesh(200, 10), "mesh{}".format(index)).uuid for index in range(3)]
+    previous = mce.run(["triangles"], nodes)
+    rechecked, pending = mce.recheck(previous, nodes, ["triangles"], nodes, set([nodes[1]]),
+                                     {"isCancelled": lambda: True})
+    assert rechecked.cancelled
+    assert pending == [nodes[1]]
+    assert report(rechecked) == report(previous)
+
+
+def test_recheck_limits_count_kept_results(meshes):
+    nodes = mce.allNodes()
+    previous = mce.run(["triangles"], nodes)
+    dirty = set([meshes[0].uuid])
+    rechecked, pending = mce.recheck(previous, nodes, ["triangles"], nodes, dirty, {"maxPerCheck": 5})
+    assert sum(mce.countComponents(rechecked["triangles"]).values()) == 5
+    assert rechecked.truncated == set(["triangles"])
+    assert not pending
+
+
+def test_recheck_fails_fast_on_kept_failures(meshes):
+    nodes = mce.allNodes()
+    previous = mce.run(["triangles"], nodes)
+    dirty = set([meshes[0].uuid])
+    rechecked, pending = mce.recheck(previous, nodes, ["triangles"], nodes, dirty, {"failFast": True})
+    assert rechecked.aborted
+    assert sum(mce.countComponents(rechecked["triangles"]).values()) == 1
+    assert pending == [meshes[0].uuid]
@@ -0,0 +1,37 @@
+import pytest
+
+import modelChecker.modelChecker_registry as mcreg
+
+
+def declaration(**values):
+    declared = {"label": "Studio Check", "category": "studio", "type": "nodes"}
+    declared.update(values)
+    return declared
+
+
+@pytest.mark.parametrize("values", (
+    {"type": "faces"},
+    {"cost": "huge"},
+    {"needs": ["names", "normals"]},
+    {"scope": "scene"},
+    {"backends": ["houdini"]},
+))
+def test_unknown_values_are_refused(commands, values):
+    with pytest.raises(ValueError):
+        mcreg.register("studioCheck", declaration(**values))
+    assert "studioCheck" not in commands
+
+
+def test_builtin_checks_cannot_be_replaced(commands):
+    with pytest.raises(ValueError):
+        mcreg.register("triangles", declaration())
+    assert commands["triangles"]["type"] == "polygon"
+
+
+def test_invalid_manifests_register_nothing(commands):
+    with pytest.raises(ValueError):
+        mcreg.registerManifest({"studioCheck": declaration(), "otherCheck": declaration(cost="huge")})
+    assert "studioCheck" not in commands
+    mcreg.registerManifest({"studioCheck": declaration(needs=["names"])})
+    assert commands["studioCheck"]["needs"] == ("names",)
+    assert commands["studioCheck"]["cost"] == "moderate"
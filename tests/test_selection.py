@@ -0,0 +1,24 @@
+import modelChecker.modelChecker_benchmark as mcbm
+import modelChecker.modelChecker_engine as mce
+import modelChecker.modelChecker_standin as standin
+
+from conftest import addMesh
+
+
+def test_instances_select_their_own_shape(copies):
+    diagnostics = mce.run(["triangles"])
+    mce.selectErrors(diagnostics["triangles"])
+    shapes = set(name.split(".")[0] for name in standin.cmds.ls(selection=True, long=True))
+    assert shapes == {"|tris|trisShape", "|grp|trisShape", "|copy|copyShape", "|other|otherShape"}
+
+
+def test_intermediate_shapes_are_not_selected(scene):
+    mesh = mcbm.syntheticMesh(200, 5)
+    deformed = addMesh(mesh, "deformed")
+    orig = scene.createNode("mesh", "deformedShapeOrig", deformed)
+    orig.mesh = deformed.children[0].mesh
+    scene.setAttr(orig, "intermediateObject", [True])
+    deformed.children.reverse()
+    mce.selectErrors(mce.run(["triangles"])["triangles"])
+    shapes = set(name.split(".")[0] for name in standin.cmds.ls(selection=True, long=True))
+    assert shapes == {"|deformed|deformedShape"}
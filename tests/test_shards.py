@@ -0,0 +1,27 @@
+import modelChecker.modelChecker_benchmark as mcbm
+import modelChecker.modelChecker_list as mcl
+import modelChecker.modelChecker_offline as mco
+import modelChecker.modelChecker_shards as mcsh
+
+from conftest import writeObj
+
+
+def test_sharded_report_matches_offline_loader(tmp_path):
+    path = str(tmp_path / "parts.obj")
+    writeObj(path, [
+        ("part", mcbm.syntheticMesh(300, 3)),
+        ("part", mcbm.syntheticMesh(600, 3)),
+        ("base", mcbm.syntheticMesh(900, 3)),
+    ])
+    checks = sorted(mcl.mcCommandsList)
+    sharded = mcsh.checkFile(path, checks, workers=2)
+    loader = mco.OfflineLoader()
+    loader.initialize()
+    assert sharded == loader.check(path, checks)
+    assert sharded["trailingNumbers"]["errors"] == ["part1"]
+
+
+def test_balance_spreads_faces():
+    shards = mcsh.balance([10, 1, 1, 8, 2], 2)
+    assert sorted(index for shard in shards for index in shard) == [0, 1, 2, 3, 4]
+    assert sorted(shards) == [[0, 1], [2, 3, 4]]
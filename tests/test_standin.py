@@ -0,0 +1,29 @@
+import pytest
+
+import modelChecker.modelChecker_benchmark as mcbm
+import modelChecker.modelChecker_engine as mce
+import modelChecker.modelChecker_standin as standin
+
+from conftest import addMesh, report, writeObj
+
+
+def test_open_reads_obj_files(scene, tmp_path):
+    path = str(tmp_path / "parts.obj")
+    writeObj(path, [("part", mcbm.syntheticMesh(200, 5))])
+    addMesh(mcbm.syntheticMesh(200, 5), "stale")
+    assert standin.cmds.file(path, open=True, force=True) == path
+    assert scene.byName("part")
+    assert not scene.byName("stale")
+    assert report(mce.run(["triangles"]))["triangles"]
+
+
+def test_open_refuses_other_files(tmp_path):
+    with pytest.raises(RuntimeError):
+        standin.cmds.file(str(tmp_path / "scene.ma"), open=True)
+
+
+def test_uv_overlap_lists_runs_of_faces(scene):
+    addMesh(mcbm.syntheticMesh(200, 5), "tris")
+    overlapping = standin.cmds.polyUVOverlap("trisShape.f[*]", oc=True)
+    assert overlapping
+    assert all(overlap.startswith("trisShape.f[") for overlap in overlapping)
@@ -0,0 +1,53 @@
+import numpy as np
+
+import modelChecker.modelChecker_commands as mcc
+import modelChecker.modelChecker_engine as mce
+import modelChecker.modelChecker_kernels as mck
+
+
+def layout(faces):
+    # (uvCounts, uvIds, us, vs) of faces given as [(u, v), ...] corners,
+    # every corner with its own UV.
+    corners = [corner for face in faces for corner in face]
+    return (np.array([len(face) for face in faces], dtype=np.int32),
+            np.arange(len(corners), dtype=np.int32),
+            np.array([u for u, _ in corners], dtype=np.float64),
+            np.array([v for _, v in corners], dtype=np.float64))
+
+
+def quad(u, v, size=1.0):
+    return [(u, v), (u + size, v), (u + size, v + size), (u, v + size)]
+
+
+def overlapping(faces):
+    return sorted(int(face) for face in mck.uvOverlap(*layout(faces)))
+
+
+def test_stacked_quads_overlap():
+    assert overlapping([quad(0, 0), quad(0, 0), quad(2, 0)]) == [0, 1]
+
+
+def test_triangle_inside_another_overlaps():
+    assert overlapping([[(0, 0), (4, 0), (0, 4)], [(0.5, 0.5), (1, 0.5), (0.5, 1)]]) == [0, 1]
+
+
+def test_quads_sharing_an_edge_do_not_overlap():
+    assert overlapping([quad(0, 0), quad(1, 0), quad(0, 1)]) == []
+
+
+def test_grid_snapped_layout():
+    grid = [quad(0.25 * column, 0.25 * row, 0.25) for row in range(8) for column in range(8)]
+    assert overlapping(grid) == []
+    assert overlapping(grid + [quad(0.3, 0.3, 0.1)]) == [9, 64]
+
+
+def test_every_uv_set_is_checked(scene):
+    points = [(u, v, 0.0) for u, v in quad(0, 0) + quad(2, 0)]
+    counts, ids, us, vs = layout([quad(0, 0), quad(2, 0)])
+    transform = scene.createMesh(points, [4, 4], list(range(8)), us, vs, counts, ids, name="quads")
+    # map1 is clean, the second set stacks both quads.
+    stackedCounts, stackedIds, stackedUs, stackedVs = layout([quad(0, 0), quad(0, 0)])
+    transform.children[0].mesh.addUVSet("stacked", stackedUs, stackedVs, stackedCounts, stackedIds)
+    mcc.setImplementation("numpy")
+    errors = mce.run(["selfPenetratingUVs"])["selfPenetratingUVs"]
+    assert mce.parseErrors(errors) == ["quads.f[0:1]"]